@@ -3,7 +3,9 @@ Non graphql api endpoints
 """
 
 from . import health
+from . import pollbook
 
 
 def init_app(app):
     health.init_api(app)
+    pollbook.init_api(app)
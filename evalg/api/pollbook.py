@@ -0,0 +1,102 @@
+"""
+Voter export of pollbooks.
+
+The voters of a pollbook are streamed as CSV or newline delimited JSON, with
+one database query. Rows are fetched and sent in chunks, so the size of the
+pollbook does not affect memory use.
+"""
+import csv
+import io
+import json
+import logging
+
+from flask import Blueprint, Response, abort, stream_with_context
+
+from evalg import db
+from evalg.authentication import basic, user
+from evalg.graphql.nodes.utils.permissions import (can_manage_pollbook,
+                                                   check_permission)
+from evalg.models.pollbook import Pollbook
+from evalg.proc.pollbook import get_voter_dump
+
+logger = logging.getLogger(__name__)
+API = Blueprint("pollbook", __name__)
+
+# Number of voters fetched and sent at a time
+CHUNK_SIZE = 1000
+
+FIELDS = ("id_type", "id_value", "has_voted", "verified_status")
+
+MIMETYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _csv_chunks(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FIELDS)
+    for i, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if i % CHUNK_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ndjson_chunks(rows):
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(FIELDS, row))))
+        if len(lines) == CHUNK_SIZE:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+FORMATS = {
+    "csv": _csv_chunks,
+    "ndjson": _ndjson_chunks,
+}
+
+
+def make_voter_export(session, current_user, pollbook_id, export_format):
+    """
+    Make a streaming response with the voters of a pollbook.
+
+    :param export_format: 'csv' or 'ndjson'
+    """
+    pollbook = session.query(Pollbook).get(pollbook_id)
+    if pollbook is None:
+        abort(404)
+    if not check_permission(
+            can_manage_pollbook, session, current_user, pollbook):
+        abort(403)
+    logger.info("Exporting voters of pollbook %s as %s",
+                pollbook_id, export_format)
+    rows = (
+        (id_type, id_value, has_voted, status.value)
+        for id_type, id_value, has_voted, status
+        in get_voter_dump(session, pollbook_id, chunk_size=CHUNK_SIZE))
+    filename = "voters-{}.{}".format(pollbook_id, export_format)
+    return Response(
+        stream_with_context(FORMATS[export_format](rows)),
+        mimetype=MIMETYPES[export_format],
+        headers={
+            "Content-Disposition": 'attachment; filename="{}"'.format(filename)
+        })
+
+
+@API.route("/pollbooks/<uuid:pollbook_id>/voters.<any(csv, ndjson):export_format>")
+@basic.require
+def export_voters(pollbook_id, export_format):
+    """Stream the voters of a pollbook."""
+    return make_voter_export(db.session, user, pollbook_id, export_format)
+
+
+def init_api(app):
+    """Register API blueprint."""
+    app.register_blueprint(API)
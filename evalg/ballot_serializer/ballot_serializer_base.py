@@ -5,7 +5,41 @@ Abstract base of a ballot serializer/deserializer.
 The serialized result must be a bytestring.
 """
 
+import itertools
+import logging
+import time
 from abc import ABC, abstractmethod
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# Serializers of the executor workers used by deserialize_many(), by envelope
+# type. Set by init_deserialize_worker() when a worker is started.
+_worker_serializers: Dict[str, 'BallotSerializerBase'] = {}
+
+
+def init_deserialize_worker(*serializers):
+    """
+    Initialize a worker of an executor used by deserialize_many().
+
+    Used as the ``initializer`` of the executor, with the serializers as
+    ``initargs``, so that the serializers and their keys are sent to every
+    worker once, and not with every chunk of ballots.
+    """
+    for serializer in serializers:
+        _worker_serializers[serializer.envelope_type] = serializer
+
+
+def _deserialize_chunk(envelope_type, serialized_ballots):
+    """
+    Deserialize a chunk of ballots, in a worker of an executor.
+
+    :return: The ballots, and the seconds spent deserializing them
+    """
+    start = time.monotonic()
+    ballots = _worker_serializers[envelope_type].deserialize_chunk(
+        serialized_ballots)
+    return ballots, time.monotonic() - start
 
 
 class BallotSerializerBase(ABC):
@@ -33,6 +67,79 @@ class BallotSerializerBase(ABC):
         """
         pass
 
+    def serialize_many(self, ballots):
+        """
+        Serialize ballots.
+
+        :param ballots: The ballots
+        :type ballots: collections.abc.Iterable
+
+        :return: The serialized ballots, in the same order
+        :rtype: generator
+        """
+        for ballot in ballots:
+            yield self.serialize(ballot)
+
+    def deserialize_chunk(self, serialized_ballots):
+        """
+        Deserialize a list of ballots.
+
+        Serializers should override this to set up decoders and check their
+        keys once per chunk instead of once per ballot.
+
+        :param serialized_ballots: Bytestring representations of ballots
+        :type serialized_ballots: list
+
+        :return: The deserialized ballots, in the same order
+        :rtype: list
+        """
+        return [self.deserialize(data) for data in serialized_ballots]
+
+    def deserialize_many(self, serialized_ballots, executor=None,
+                         chunk_size=1000):
+        """
+        Deserialize ballots.
+
+        The ballots are deserialized in chunks of ``chunk_size``. If an
+        executor is given, the chunks are deserialized by its workers, which
+        must have been initialized by init_deserialize_worker() with a
+        serializer of the same envelope type. Only the chunks are sent to the
+        workers.
+
+        :param serialized_ballots: Bytestring representations of ballots
+        :type serialized_ballots: collections.abc.Iterable
+
+        :param executor: Optional executor to deserialize the chunks in
+        :type executor: concurrent.futures.Executor
+
+        :param chunk_size: Number of ballots per chunk
+        :type chunk_size: int
+
+        :return: The deserialized ballots, in the same order
+        :rtype: generator
+        """
+        serialized_ballots = iter(serialized_ballots)
+        chunk_size = max(int(chunk_size), 1)
+        chunks = iter(
+            lambda: list(itertools.islice(serialized_ballots, chunk_size)),
+            [])
+        if executor is None:
+            for chunk in chunks:
+                yield from self.deserialize_chunk(chunk)
+            return
+        results = executor.map(_deserialize_chunk,
+                               itertools.repeat(self.envelope_type),
+                               chunks)
+        for i, (ballots, elapsed) in enumerate(results):
+            logger.debug(
+                "Deserialized chunk #%d: %d ballots in %.3fs (%.0f/s)",
+                i,
+                len(ballots),
+                elapsed,
+                len(ballots) / elapsed if elapsed else 0,
+            )
+            yield from ballots
+
     @abstractmethod
     def generate_hash(self, ballot):
         pass
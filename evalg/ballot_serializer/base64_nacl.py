@@ -1,8 +1,12 @@
 import json
 import logging
 import random
+import threading
 
 from base64 import b64decode, b64encode
+from collections import OrderedDict
+from typing import Tuple
+
 from nacl.encoding import Base64Encoder
 from nacl.hash import blake2b
 from nacl.public import Box, PublicKey, PrivateKey
@@ -11,6 +15,77 @@ from evalg.ballot_serializer.ballot_serializer_base import BallotSerializerBase
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of boxes kept by get_encryption_box()
+BOX_CACHE_SIZE = 128
+
+_box_cache: 'OrderedDict[Tuple[bytes, bytes], Box]' = OrderedDict()
+_box_cache_lock = threading.Lock()
+
+
+def load_key(key, key_class):
+    """Load a base64 encoded key."""
+    return key_class(key, encoder=Base64Encoder)
+
+
+def get_raw_key(key):
+    """Get the raw bytes of a key, or of a base64 encoded key."""
+    if isinstance(key, (PublicKey, PrivateKey)):
+        return bytes(key)
+    return Base64Encoder.decode(key)
+
+
+def get_encryption_box(backend_private_key, election_public_key):
+    """
+    Get the NaCl box used to encrypt ballots of an election.
+
+    Creating a box computes the shared key of the key pair, so the boxes are
+    cached and shared by all serializers encrypting with the same keys. The
+    cache is keyed on the raw keys, so that a cached box is found without
+    loading the backend private key. Only encryption boxes are cached: the
+    election private keys used for decryption are never kept after a count.
+    A box holds no other state, and can be used by several threads at once.
+
+    :type backend_private_key: str or nacl.public.PrivateKey
+    :type election_public_key: str or nacl.public.PublicKey
+    :rtype: nacl.public.Box
+    """
+    cache_key = (get_raw_key(election_public_key),
+                 get_raw_key(backend_private_key))
+    with _box_cache_lock:
+        try:
+            _box_cache.move_to_end(cache_key)
+            return _box_cache[cache_key]
+        except KeyError:
+            pass
+    if not isinstance(backend_private_key, PrivateKey):
+        backend_private_key = load_key(backend_private_key, PrivateKey)
+    if not isinstance(election_public_key, PublicKey):
+        election_public_key = load_key(election_public_key, PublicKey)
+    box = Box(backend_private_key, election_public_key)
+    with _box_cache_lock:
+        _box_cache[cache_key] = box
+        while len(_box_cache) > BOX_CACHE_SIZE:
+            _box_cache.popitem(last=False)
+    return box
+
+
+def invalidate_boxes(public_key=None):
+    """
+    Remove cached encryption boxes.
+
+    :param public_key: Only remove the boxes of this election public key. All
+                       boxes are removed if not given.
+    :type public_key: str or nacl.public.PublicKey
+    """
+    with _box_cache_lock:
+        if public_key is None:
+            _box_cache.clear()
+            return
+        public_key = get_raw_key(public_key)
+        for cache_key in list(_box_cache):
+            if cache_key[0] == public_key:
+                del _box_cache[cache_key]
+
 
 class Base64NaClSerializer(BallotSerializerBase):
     """
@@ -43,6 +118,7 @@ class Base64NaClSerializer(BallotSerializerBase):
         self._election_public_key = None
         self._backend_private_key = None
         self._backend_public_key = None
+        self._backend_private_key_data = None
         self.election_public_key = election_public_key
         self.election_private_key = election_private_key
         self.backend_public_key = backend_public_key
@@ -80,6 +156,26 @@ class Base64NaClSerializer(BallotSerializerBase):
         ballot = self._remove_padding(deserialized_ballot)
         return ballot
 
+    def deserialize_chunk(self, serialized_ballots):
+        """
+        Deserialize and decrypt a list of ballots.
+
+        :param serialized_ballots: Serialized and encrypted ballots.
+        :return: The deserialized and decrypted ballots.
+        """
+        if not self.election_private_key or not self.backend_public_key:
+            raise ValueError('Can\'t decrypt ballot. Election private key or '
+                             'backend public key missing')
+        decrypt = self._decryption_box.decrypt
+        decode = json.JSONDecoder().decode
+        ballots = []
+        for serialized_ballot in serialized_ballots:
+            ballot = decode(b64decode(
+                decrypt(serialized_ballot, encoder=Base64Encoder)
+            ).decode('utf-8'))
+            ballots.append(self._remove_padding(ballot))
+        return ballots
+
     def generate_hash(self, ballot):
         """Generate a ballot hash."""
         ballot_data = json.dumps(ballot, ensure_ascii=False).encode('utf-8')
@@ -103,8 +199,8 @@ class Base64NaClSerializer(BallotSerializerBase):
 
     def _encrypt(self, data):
         """Encrypt the serialized ballot data."""
-        if not self.election_public_key or not self.backend_private_key:
-            raise ValueError('Can\' encrypt ballot. Election public key or '
+        if self._encryption_box is None:
+            raise ValueError('Can\'t encrypt ballot. Election public key or '
                              'backend private key missing')
         encrypted_ballot = self._encryption_box.encrypt(
             data,
@@ -114,7 +210,7 @@ class Base64NaClSerializer(BallotSerializerBase):
     def _decrypt(self, encrypted_data):
         """Decrypt serialized ballot_data."""
         if not self.election_private_key or not self.backend_public_key:
-            raise ValueError('Can\' decrypt ballot. Election private key or '
+            raise ValueError('Can\'t decrypt ballot. Election private key or '
                              'backend public key missing')
         decrypted_ballot = self._decryption_box.decrypt(
             encrypted_data,
@@ -146,6 +242,21 @@ class Base64NaClSerializer(BallotSerializerBase):
     def envelope_type(self):
         return 'base64-nacl'
 
+    def __getstate__(self):
+        """Pickle the keys, so that the serializer can be sent to workers."""
+        def encode(key):
+            return key.encode(Base64Encoder) if key else None
+        return {
+            'election_public_key': encode(self.election_public_key),
+            'election_private_key': encode(self.election_private_key),
+            'backend_public_key': encode(self.backend_public_key),
+            'backend_private_key': encode(self.backend_private_key),
+            'envelope_padded_len': self._envelope_padded_len,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
     @property
     def election_public_key(self):
         return self._election_public_key
@@ -175,11 +286,17 @@ class Base64NaClSerializer(BallotSerializerBase):
 
     @property
     def backend_private_key(self):
+        # loaded on first use, as the encryption box is found without it
+        if self._backend_private_key is None:
+            self._backend_private_key = self._create_key_instance(
+                self._backend_private_key_data,
+                PrivateKey)
         return self._backend_private_key
 
     @backend_private_key.setter
     def backend_private_key(self, key):
-        self._backend_private_key = self._create_key_instance(key, PrivateKey)
+        self._backend_private_key = None
+        self._backend_private_key_data = key or None
         self._update_boxes()
 
     def _create_key_instance(self, key, key_class):
@@ -189,7 +306,7 @@ class Base64NaClSerializer(BallotSerializerBase):
         elif isinstance(key, key_class):
             return key
         else:
-            return key_class(key, encoder=Base64Encoder)
+            return load_key(key, key_class)
 
     def _update_boxes(self):
         """Create and set the NaCl boxes."""
@@ -200,9 +317,9 @@ class Base64NaClSerializer(BallotSerializerBase):
         else:
             self._decryption_box = None
 
-        if self.election_public_key and self.backend_private_key:
-            self._encryption_box = Box(
-                self.backend_private_key,
+        if self.election_public_key and self._backend_private_key_data:
+            self._encryption_box = get_encryption_box(
+                self._backend_private_key_data,
                 self.election_public_key)
         else:
             self._encryption_box = None
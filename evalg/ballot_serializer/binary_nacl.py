@@ -0,0 +1,276 @@
+"""
+Binary ballot serializer/deserializer.
+
+The ballot is encoded in a compact binary format, padded with zero bytes to
+a fixed length and encrypted with NaCl. The raw nonce and ciphertext are
+stored in the envelope, without any base64 encoding.
+
+Encrypted ballot::
+
+    version (1 byte) | length of encoding (varint) | encoding | zero padding
+
+The encoding is a tagged value, see encode_value(). Strings that are UUIDs
+are stored as 16 bytes, which makes up most of a ballot.
+"""
+import io
+import logging
+import struct
+import uuid
+
+from evalg.ballot_serializer.base64_nacl import Base64NaClSerializer
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 2
+
+TAG_NONE = 0
+TAG_FALSE = 1
+TAG_TRUE = 2
+TAG_INT = 3
+TAG_FLOAT = 4
+TAG_STR = 5
+TAG_UUID = 6
+TAG_LIST = 7
+TAG_DICT = 8
+
+_DOUBLE = struct.Struct('>d')
+
+
+def _write_varint(buffer, value):
+    while value > 0x7f:
+        buffer.write(bytes((value & 0x7f | 0x80, )))
+        value >>= 7
+    buffer.write(bytes((value, )))
+
+
+def _read_varint(buffer):
+    value = 0
+    shift = 0
+    while True:
+        byte = buffer.read(1)
+        if not byte:
+            raise ValueError('Truncated ballot encoding')
+        value |= (byte[0] & 0x7f) << shift
+        if not byte[0] & 0x80:
+            return value
+        shift += 7
+
+
+def _write_str(buffer, value):
+    data = value.encode('utf-8')
+    _write_varint(buffer, len(data))
+    buffer.write(data)
+
+
+def _read_str(buffer):
+    length = _read_varint(buffer)
+    data = buffer.read(length)
+    if len(data) != length:
+        raise ValueError('Truncated ballot encoding')
+    return data.decode('utf-8')
+
+
+def _as_uuid(value):
+    """Get the UUID of a string, if it is a UUID in canonical form."""
+    if len(value) != 36:
+        return None
+    try:
+        value_uuid = uuid.UUID(value)
+    except ValueError:
+        return None
+    if str(value_uuid) != value:
+        return None
+    return value_uuid
+
+
+def encode_value(buffer, value):
+    """
+    Write the binary encoding of a JSON compatible value.
+
+    :param buffer: The buffer to write to
+    :type buffer: io.BytesIO
+
+    :param value: None, a bool, int, float, str, list or dict with str keys
+    """
+    if value is None:
+        buffer.write(bytes((TAG_NONE, )))
+    elif value is True:
+        buffer.write(bytes((TAG_TRUE, )))
+    elif value is False:
+        buffer.write(bytes((TAG_FALSE, )))
+    elif isinstance(value, int):
+        # zigzag, so that small negative numbers stay small
+        buffer.write(bytes((TAG_INT, )))
+        _write_varint(buffer, value << 1 if value >= 0 else (-value << 1) - 1)
+    elif isinstance(value, float):
+        buffer.write(bytes((TAG_FLOAT, )))
+        buffer.write(_DOUBLE.pack(value))
+    elif isinstance(value, str):
+        value_uuid = _as_uuid(value)
+        if value_uuid is None:
+            buffer.write(bytes((TAG_STR, )))
+            _write_str(buffer, value)
+        else:
+            buffer.write(bytes((TAG_UUID, )))
+            buffer.write(value_uuid.bytes)
+    elif isinstance(value, (list, tuple)):
+        buffer.write(bytes((TAG_LIST, )))
+        _write_varint(buffer, len(value))
+        for item in value:
+            encode_value(buffer, item)
+    elif isinstance(value, dict):
+        buffer.write(bytes((TAG_DICT, )))
+        _write_varint(buffer, len(value))
+        for key, item in value.items():
+            _write_str(buffer, key)
+            encode_value(buffer, item)
+    else:
+        raise TypeError(
+            'Can not encode value of type {}'.format(type(value).__name__))
+
+
+def decode_value(buffer):
+    """
+    Read a value written by encode_value().
+
+    :param buffer: The buffer to read from
+    :type buffer: io.BytesIO
+    """
+    tag = buffer.read(1)
+    if not tag:
+        raise ValueError('Truncated ballot encoding')
+    tag = tag[0]
+    if tag == TAG_NONE:
+        return None
+    if tag == TAG_TRUE:
+        return True
+    if tag == TAG_FALSE:
+        return False
+    if tag == TAG_INT:
+        value = _read_varint(buffer)
+        return value >> 1 if not value & 1 else -((value + 1) >> 1)
+    if tag == TAG_FLOAT:
+        return _DOUBLE.unpack(buffer.read(_DOUBLE.size))[0]
+    if tag == TAG_STR:
+        return _read_str(buffer)
+    if tag == TAG_UUID:
+        return str(uuid.UUID(bytes=buffer.read(16)))
+    if tag == TAG_LIST:
+        return [decode_value(buffer) for _ in range(_read_varint(buffer))]
+    if tag == TAG_DICT:
+        value = {}
+        for _ in range(_read_varint(buffer)):
+            key = _read_str(buffer)
+            value[key] = decode_value(buffer)
+        return value
+    raise ValueError('Unknown tag in ballot encoding: {}'.format(tag))
+
+
+class BinaryNaClSerializer(Base64NaClSerializer):
+    """
+    Serializer/deserializer implementation.
+
+    Serialisation:
+    Ballot data is serialized in a compact binary encoding.
+
+    Encryption:
+    NaCl is used for encryption and decryption, with the same keys as
+    Base64NaClSerializer. The serialized ballot is the raw nonce and
+    ciphertext.
+
+    The encoded ballot is padded with zero bytes to a specific length before
+    encryption. A longer ballot is padded to the next multiple of the length.
+
+    Config variables:
+        ENVELOPE_PADDED_LEN: The length of the ballot after padding.
+
+    """
+
+    def serialize(self, ballot):
+        """
+        Serialize and encrypt a ballot dict into a bytestring.
+
+        The election_groups public key and the backends private key is used for
+        encryption.
+
+        :param ballot: ballot data
+        :return: Serialized and encrypted ballot as a bytestring.
+        """
+        return self._encrypt(self._pad(self._encode(ballot)))
+
+    def deserialize(self, serialized_ballot):
+        """
+        Deserialize and decrypts a ballot.
+
+        The election_groups private key and the backends public key is used for
+        decryption.
+
+        :param serialized_ballot: A serialized and encrypted ballot.
+        :return: The deserialized and decrypted ballot.
+        """
+        return self._decode(self._decrypt(serialized_ballot))
+
+    def deserialize_chunk(self, serialized_ballots):
+        """
+        Deserialize and decrypt a list of ballots.
+
+        :param serialized_ballots: Serialized and encrypted ballots.
+        :return: The deserialized and decrypted ballots.
+        """
+        if not self.election_private_key or not self.backend_public_key:
+            raise ValueError('Can\'t decrypt ballot. Election private key or '
+                             'backend public key missing')
+        decrypt = self._decryption_box.decrypt
+        decode = self._decode
+        return [decode(decrypt(bytes(serialized_ballot)))
+                for serialized_ballot in serialized_ballots]
+
+    def _encode(self, ballot):
+        """Encode ballot, with the version and length."""
+        payload = io.BytesIO()
+        encode_value(payload, ballot)
+        payload = payload.getvalue()
+        buffer = io.BytesIO()
+        buffer.write(bytes((FORMAT_VERSION, )))
+        _write_varint(buffer, len(payload))
+        buffer.write(payload)
+        return buffer.getvalue()
+
+    def _decode(self, encoded_ballot):
+        """Decode ballot, ignoring the padding."""
+        buffer = io.BytesIO(encoded_ballot)
+        version = buffer.read(1)
+        if not version or version[0] != FORMAT_VERSION:
+            raise ValueError('Unknown ballot encoding version')
+        length = _read_varint(buffer)
+        return decode_value(io.BytesIO(buffer.read(length)))
+
+    def _pad(self, encoded_ballot):
+        """Add zero padding to the encoded ballot."""
+        padded_len = self._envelope_padded_len
+        if not padded_len:
+            return encoded_ballot
+        if len(encoded_ballot) > padded_len:
+            logger.error('Found ballot that is bigger then the padded '
+                         'total size. We can\'t hide the size of the ballot. '
+                         'Increase ENVELOPE_PADDED_LEN to fix the problem.')
+            padded_len *= -(-len(encoded_ballot) // padded_len)
+        return encoded_ballot + bytes(padded_len - len(encoded_ballot))
+
+    def _encrypt(self, data):
+        """Encrypt the encoded ballot data."""
+        if self._encryption_box is None:
+            raise ValueError('Can\'t encrypt ballot. Election public key or '
+                             'backend private key missing')
+        return bytes(self._encryption_box.encrypt(data))
+
+    def _decrypt(self, encrypted_data):
+        """Decrypt the encrypted ballot data."""
+        if not self.election_private_key or not self.backend_public_key:
+            raise ValueError('Can\'t decrypt ballot. Election private key or '
+                             'backend public key missing')
+        return self._decryption_box.decrypt(bytes(encrypted_data))
+
+    @property
+    def envelope_type(self):
+        return 'binary-nacl'
@@ -0,0 +1,69 @@
+"""
+Ballot serializer factory.
+
+Serializers are looked up by the envelope type stored in
+py:attr:`evalg.models.ballot.Envelope.envelope_type`, so that every envelope
+can be deserialized by the serializer that created it.
+"""
+from evalg.ballot_serializer.base64_nacl import (
+    Base64NaClSerializer,
+    invalidate_boxes,
+)
+from evalg.ballot_serializer.binary_nacl import BinaryNaClSerializer
+
+SERIALIZERS = {
+    'base64-nacl': Base64NaClSerializer,
+    'binary-nacl': BinaryNaClSerializer,
+}
+
+
+class UnknownEnvelopeTypeError(ValueError):
+    """No serializer exists for an envelope type."""
+
+
+def get_serializer_class(envelope_type):
+    """
+    Get the serializer class of an envelope type.
+
+    :param envelope_type: The envelope type, e.g. 'base64-nacl'
+    :type envelope_type: str
+
+    :rtype: type
+    """
+    try:
+        return SERIALIZERS[envelope_type]
+    except KeyError:
+        raise UnknownEnvelopeTypeError(
+            'Unknown envelope type: {!r}'.format(envelope_type))
+
+
+def get_serializer(envelope_type, **kwargs):
+    """
+    Create a serializer for an envelope type.
+
+    The serializers share their encryption boxes, so creating one for every
+    ballot does not redo the key agreement.
+
+    :param envelope_type: The envelope type, e.g. 'base64-nacl'
+    :type envelope_type: str
+
+    :param kwargs: Keys and options for the serializer
+
+    :rtype: evalg.ballot_serializer.ballot_serializer_base.BallotSerializerBase
+    """
+    return get_serializer_class(envelope_type)(**kwargs)
+
+
+def invalidate_public_key(public_key):
+    """
+    Forget the cached state of an election public key.
+
+    Called when the public key of an election group is replaced.
+    """
+    if not public_key:
+        return
+    try:
+        invalidate_boxes(public_key)
+    except (TypeError, ValueError):
+        # not a valid key, so nothing can have been cached for it
+        pass
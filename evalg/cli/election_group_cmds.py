@@ -159,6 +159,38 @@ def list_administrated_groups():
         print(f"{election_group.id}: {election_group.name['nb']}")
 
 
+@click.command('reconcile-vote-counts',
+               short_help='Rebuilds the live vote counts from the votes')
+@click.option('--election-group',
+              'election_group_id',
+              default=None,
+              help='Only rebuild the vote counts of this election group '
+                   '(UUID).')
+@flask.cli.with_appcontext
+def reconcile_vote_counts(election_group_id):
+    """Rebuilds the vote counts of the pollbooks, and lists any corrections"""
+    from evalg.models.election import Election, ElectionGroup
+    from evalg.models.pollbook import Pollbook
+    from evalg.proc.vote import rebuild_vote_counts
+    pollbook_ids = None
+    if election_group_id is not None:
+        election_group = evalg.db.session.query(ElectionGroup).get(
+            election_group_id)
+        if election_group is None:
+            print(f'Could not find election-group with UUID: '
+                  f'{election_group_id}')
+            return
+        pollbook_ids = [
+            pollbook_id for pollbook_id, in evalg.db.session.query(
+                Pollbook.id).join(Election).filter(
+                    Election.group_id == election_group.id)]
+    corrections = rebuild_vote_counts(evalg.db.session, pollbook_ids)
+    evalg.db.session.commit()
+    for pollbook_id, status, old_votes, votes in corrections:
+        print(f'{pollbook_id}: {status} {old_votes} -> {votes}')
+    print(f'Done: {len(corrections)} vote counts corrected', flush=True)
+
+
 @click.command('rename-election-group',
                short_help='Renames the elections in a given election group')
 @flask.cli.with_appcontext
@@ -224,6 +256,7 @@ commands = (add_election_group_admin,
             convert_to_lamu_election,
             delete_election_group,
             list_administrated_groups,
+            reconcile_vote_counts,
             rename_election_group,
             soft_delete_election_group)
 
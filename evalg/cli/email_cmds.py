@@ -24,6 +24,7 @@ logger = logging.getLogger(__name__)
 def send_status_mail(to_addrs, only_active_elections):
     """Send a status mail for the active elections."""
     import evalg.models
+    import evalg.proc.pollbook
 
     election_groups = (
         evalg.db.session.query(evalg.models.election.ElectionGroup)
@@ -71,8 +72,11 @@ def send_status_mail(to_addrs, only_active_elections):
             ) + election_count.get("self_added_rejected", 0)
             votes_not_reviewed = election_count.get("self_added_not_reviewed", 0)
             votes_total = votes_in_census + votes_rejected + votes_not_reviewed
+            pollbook_stats = evalg.proc.pollbook.get_election_pollbook_stats(
+                evalg.db.session, election
+            )
             election_voter_count = sum(
-                [len(x.valid_voters) for x in election.pollbooks]
+                x.verified for x in pollbook_stats.values()
             )
 
             if election_voter_count == 0:
@@ -95,8 +99,9 @@ def send_status_mail(to_addrs, only_active_elections):
             }
 
             for pollbook in election.pollbooks:
-                valid_pollbook_voters = len(pollbook.valid_voters)
-                valid_pollbook_votes = len(pollbook.valid_voters_with_vote)
+                stats = pollbook_stats[pollbook.id]
+                valid_pollbook_voters = stats.verified
+                valid_pollbook_votes = stats.verified_with_vote
 
                 if valid_pollbook_voters == 0:
                     pollbook_turnout = 0.0
@@ -118,13 +118,15 @@ class Round:
         for candidate in self._counter_obj.candidates:
             results[candidate] = decimal.Decimal(0)
             count_result_stats[candidate] = {int(f): 0 for f in factors}
-        for ballot in self._counter_obj.ballots:
+        for ballot in self._counter_obj.ballot_profile:
             if not ballot.candidates:
                 # blank ballot
                 continue
             for idx, candidate in enumerate(ballot.candidates):
-                results[candidate] += divident / factors[idx]
-                count_result_stats[candidate][int(factors[idx])] += 1
+                results[candidate] += (
+                    divident / factors[idx] * ballot.multiplicity)
+                count_result_stats[candidate][
+                    int(factors[idx])] += ballot.multiplicity
         count_results = results.most_common()
         self._perform_count(count_results, count_result_stats)
         # now see if two or more candidates have the same score
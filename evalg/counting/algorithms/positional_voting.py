@@ -168,7 +168,7 @@ def follow_quota_rules(
 
 def get_result(election: Election) -> Tuple[Dict[str, Any], Protocol]:
     ranked_candidates, candidate_vote_number, random_draw = rank_candidates(
-        List(election.candidates), election.ballots
+        list(election.candidates), election.ballots
     )
 
     if election.quotas:
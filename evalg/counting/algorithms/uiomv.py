@@ -116,20 +116,23 @@ class Round:
                 count_result_stats[pollbook][candidate]['total'] = (
                     decimal.Decimal(0))
                 count_result_stats[pollbook][candidate]['amount'] = 0
-        for ballot in self._counter_obj.ballots:
+        for ballot in self._counter_obj.ballot_profile:
             if not ballot.candidates:
                 # blank ballot
                 continue
             candidate_ballots[ballot.candidates[0]].append(ballot)
-            ballot_weights[ballot] = ballot.pollbook.weight_per_pollbook
-            total_score += ballot.pollbook.weight_per_pollbook
+            # the weight of all the identical ballots
+            ballot_weights[ballot] = (
+                ballot.pollbook.weight_per_pollbook * ballot.multiplicity)
+            total_score += ballot_weights[ballot]
         for candidate, ballots in candidate_ballots.items():
             results[candidate] = decimal.Decimal(0)
             for ballot in ballots:
                 results[candidate] += ballot_weights[ballot]
                 count_result_stats[ballot.pollbook][
                     candidate]['total'] += ballot_weights[ballot]
-                count_result_stats[ballot.pollbook][candidate]['amount'] += 1
+                count_result_stats[ballot.pollbook][candidate][
+                    'amount'] += ballot.multiplicity
                 count_result_stats[ballot.pollbook][
                     'total'] += ballot_weights[ballot]
         # set % of total pollbook score - stats
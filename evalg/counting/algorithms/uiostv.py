@@ -6,7 +6,7 @@ import logging
 import math
 import operator
 
-from evalg.counting import base, count
+from evalg.counting import base, count, profile
 
 
 DEFAULT_LOG_FORMAT = "%(levelname)s: %(message)s"
@@ -945,19 +945,19 @@ class RegularRound:
         # Proposition:
         #  * prec >= 2
         #  * prec is at least 2 * math.log(counting-ballots, 10)
-        counting_ballot_pollbook = (
-            [ballot.pollbook.weight_per_pollbook for
-             ballot in self._counter_obj.counting_ballots])
-        if len(counting_ballot_pollbook) < 10:
+        counting_ballot_profile = self._counter_obj.counting_ballot_profile
+        counting_ballots_count = profile.count_ballots(counting_ballot_profile)
+        if counting_ballots_count < 10:
             # avoid log(0) and large epsilon when 1 <= ballots < 10
             prec = 2
         else:
-            prec = 2 * int(math.log(len(counting_ballot_pollbook), 10))
+            prec = 2 * int(math.log(counting_ballots_count, 10))
         # the quotient should not have a greater precision than epsilon
         quotient_precision = decimal.Decimal(10) ** -prec  # §18.3, §33
         epsilon = decimal.Decimal((0, (1, ), -prec))
         weight_counting_ballots = decimal.Decimal(
-            sum(counting_ballot_pollbook))
+            sum([ballot.pollbook.weight_per_pollbook * ballot.multiplicity for
+                 ballot in counting_ballot_profile]))
         quotient = (
             weight_counting_ballots /
             decimal.Decimal(self._counter_obj.election.num_choosable + 1)
@@ -1258,7 +1258,8 @@ class RegularRound:
             # first count.
             for candidate, ballots in candidate_ballots.items():
                 vcount[candidate] = (
-                    sum(map(lambda b: ballot_weights[b], ballots)))
+                    sum(map(lambda b: ballot_weights[b] * b.multiplicity,
+                            ballots)))
             self._transferred_uncounted_ballots.clear()
             return vcount
 
@@ -1268,7 +1269,7 @@ class RegularRound:
             if candidate in candidate_ballots:  # received some ballots
                 vcount[candidate] = (
                     ccount +
-                    sum(map(lambda b: ballot_weights[b],
+                    sum(map(lambda b: ballot_weights[b] * b.multiplicity,
                             candidate_ballots[candidate])))
             else:
                 vcount[candidate] = ccount
@@ -1440,7 +1441,7 @@ class RegularRound:
         transferred_candidate_ballots = collections.defaultdict(list)
         ballot_owner = {}  # ballot: candidate - dict
         ballot_weight = collections.Counter()  # ballot: weight - dict
-        for ballot in self._counter_obj.ballots:
+        for ballot in self._counter_obj.ballot_profile:
             if not ballot.candidates:
                 # blank ballot
                 continue
@@ -1515,13 +1516,17 @@ class RegularRound:
                 from_election_state=False)
             for ballot in tballots:
                 weight_groups[self._ballot_weights[ballot]].append(ballot)
-                group_counter[self._ballot_weights[ballot]] += 1
+                group_counter[self._ballot_weights[ballot]] += (
+                    ballot.multiplicity)
+            tballots_count = profile.count_ballots(tballots)
+            empty_ballots_count = (
+                profile.count_ballots(all_ballots) - tballots_count)
             logger.info("%s has %d ballot(s) in %d group(s) to transfer "
                         "as well as %d blank ballot(s)",
                         excluded_candidate,
-                        len(tballots),
+                        tballots_count,
                         len(group_counter),
-                        len(all_ballots) - len(tballots))
+                        empty_ballots_count)
             # just some debugging
             keys = list(group_counter.keys())
             keys.sort(reverse=True)
@@ -1531,9 +1536,9 @@ class RegularRound:
                             group_counter[key])
             excluded_candidates_data.append({
                 'excluded_candidate': str(excluded_candidate.id),
-                'ballots_count': len(tballots),
+                'ballots_count': tballots_count,
                 'groups_count': len(group_counter),
-                'empty_ballots_count': (len(all_ballots) - len(tballots)),
+                'empty_ballots_count': empty_ballots_count,
                 'groups': [tuple([str(w), group_counter[w]]) for w in keys]})
         group_keys = list(weight_groups.keys())
         if len(group_keys) > 1:
@@ -1578,14 +1583,17 @@ class RegularRound:
         self._transferred_uncounted_ballots.update(new_candidate_ballots)
         transfer_list = []
         for receiver, tballots in new_transferred_candidate_ballots.items():
-            tweight = sum(map(lambda b: new_transferred_ballot_weights[b],
-                              tballots))
+            tweight = sum(
+                map(lambda b: (new_transferred_ballot_weights[b] *
+                               b.multiplicity),
+                    tballots))
+            tballots_count = profile.count_ballots(tballots)
             logger.info("%s received %d ballot(s) with total weight %s",
                         receiver,
-                        len(tballots),
+                        tballots_count,
                         tweight)
             transfer_list.append({'receiver': str(receiver.id),
-                                  'ballot_count': len(tballots),
+                                  'ballot_count': tballots_count,
                                   'total_ballot_weight': str(tweight)})
         self._state.add_event(
             count.CountingEvent(
@@ -1610,12 +1618,14 @@ class RegularRound:
         transferred_ballot_weights = self._get_transferred_ballot_weights(
             candidate)
         total_transferrable_ballot_weight = sum(
-            map(lambda b: transferred_ballot_weights[b],
+            map(lambda b: transferred_ballot_weights[b] * b.multiplicity,
                 transferrable_ballots))
-        len_transferrable_ballots = len(transferrable_ballots)
+        len_transferrable_ballots = profile.count_ballots(
+            transferrable_ballots)
+        len_all_ballots = profile.count_ballots(all_ballots)
         logger.info("Transferrable ballots: %d", len_transferrable_ballots)
         logger.info("Blank ballots: %d",
-                    len(all_ballots) - len_transferrable_ballots)
+                    len_all_ballots - len_transferrable_ballots)
         logger.info("Transferrable ballot weight: %s",
                     total_transferrable_ballot_weight)
         cand_surplus = self._surplus_per_elected_candidate[candidate]
@@ -1658,14 +1668,17 @@ class RegularRound:
         logger.info("Transferring surplus from candidate: %s", candidate)
         transfer_list = []
         for receiver, ballots in new_transferred_candidate_ballots.items():
-            tweight = sum(map(lambda b: new_transferred_ballot_weights[b],
-                              ballots))
+            tweight = sum(
+                map(lambda b: (new_transferred_ballot_weights[b] *
+                               b.multiplicity),
+                    ballots))
+            ballots_count = profile.count_ballots(ballots)
             logger.info("%s received %d ballot(s) with total weight %s",
                         receiver,
-                        len(ballots),
+                        ballots_count,
                         tweight)
             transfer_list.append({'receiver': str(receiver.id),
-                                  'ballot_count': len(ballots),
+                                  'ballot_count': ballots_count,
                                   'total_ballot_weight': str(tweight)})
         self._state.add_event(
             count.CountingEvent(
@@ -1674,7 +1687,7 @@ class RegularRound:
                  'candidate': str(candidate.id),
                  'transferrable_ballots_count': len_transferrable_ballots,
                  'blank_ballots_count': (
-                     len(all_ballots) - len_transferrable_ballots),
+                     len_all_ballots - len_transferrable_ballots),
                  'candidate_surplus': str(cand_surplus),
                  'quotient': str(quotient),
                  'total_transferrable_ballot_weight': str(
@@ -2384,18 +2397,18 @@ class SubstituteRound(RegularRound):
         :return: The election number calculated for this round
         :rtype: decimal.Decimal
         """
-        counting_ballot_pollbook = (
-            [ballot.pollbook.weight_per_pollbook for
-             ballot in self._counter_obj.counting_ballots])
-        if len(counting_ballot_pollbook) < 10:
+        counting_ballot_profile = self._counter_obj.counting_ballot_profile
+        counting_ballots_count = profile.count_ballots(counting_ballot_profile)
+        if counting_ballots_count < 10:
             # avoid log(0) and large epsilon when 1 <= ballots < 10
             prec = 2
         else:
-            prec = 2 * int(math.log(len(counting_ballot_pollbook), 10))
+            prec = 2 * int(math.log(counting_ballots_count, 10))
         quotient_precision = decimal.Decimal(10) ** -prec  # §18.3, §33
         epsilon = decimal.Decimal((0, (1, ), -prec))
         weight_counting_ballots = decimal.Decimal(
-            sum(counting_ballot_pollbook))
+            sum([ballot.pollbook.weight_per_pollbook * ballot.multiplicity for
+                 ballot in counting_ballot_profile]))
         quotient = (weight_counting_ballots /
                     decimal.Decimal(
                         self._counter_obj.election.num_choosable +
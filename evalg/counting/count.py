@@ -12,6 +12,7 @@ import secrets
 
 import pytz
 
+from evalg.counting import profile
 from evalg.counting.algorithms import (
     ntnucv,
     mntv,
@@ -847,6 +848,12 @@ class Counter:
         self._current_election_path = None
         self._counting_ballots = tuple([ballot for ballot in self._ballots if
                                         ballot.candidates])
+        # identical ballots collapsed into weighted profile ballots
+        self._ballot_profile = profile.get_ballot_profile(self._ballots)
+        self._counting_ballot_profile = tuple(
+            [ballot for ballot in self._ballot_profile if ballot.candidates])
+        logger.info("Number of distinct ballots: %d",
+                    len(self._ballot_profile))
         logger.info("Total number of ballots: %d",
                     self._election_obj.total_amount_ballots)
         logger.debug("Total number of ballots (debug): %d",
@@ -890,11 +897,21 @@ class Counter:
         """ballots-property"""
         return self._ballots
 
+    @property
+    def ballot_profile(self):
+        """ballot_profile-property"""
+        return self._ballot_profile
+
     @property
     def candidates(self):
         """candidates-property"""
         return self._election_obj.candidates
 
+    @property
+    def counting_ballot_profile(self):
+        """counting_ballot_profile-property"""
+        return self._counting_ballot_profile
+
     @property
     def counting_ballots(self):
         """counting_ballots-property"""
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Ballot profiles for the counting package
+
+A ballot profile collapses identical ballots, that is ballots from the same
+pollbook with the same ranking of candidates, into a single weighted ballot
+with a multiplicity. The counting algorithms iterate the profile instead of
+the individual ballots, so the cost of a count scales with the number of
+distinct rankings rather than with the turnout.
+"""
+import collections
+
+
+class ProfileBallot:
+    """
+    The ProfileBallot class
+
+    Represents `multiplicity` identical ballots. It exposes the same
+    `pollbook`, `candidates` and `raw_string` interface as the ballots it
+    represents, so that it can be used everywhere a ballot is expected.
+    """
+
+    __slots__ = ('_pollbook', '_candidates', '_multiplicity')
+
+    def __init__(self, pollbook, candidates, multiplicity=1):
+        """
+        :param pollbook: The pollbook the ballots belong to
+        :type pollbook: object
+
+        :param candidates: The (ordered) sequence of candidates
+        :type candidates: collections.abc.Sequence
+
+        :param multiplicity: The number of identical ballots
+        :type multiplicity: int
+        """
+        self._pollbook = pollbook
+        self._candidates = tuple(candidates)
+        self._multiplicity = multiplicity
+
+    @property
+    def candidates(self):
+        """candidates-property"""
+        return self._candidates
+
+    @property
+    def multiplicity(self):
+        """multiplicity-property"""
+        return self._multiplicity
+
+    @property
+    def pollbook(self):
+        """pollbook-property"""
+        return self._pollbook
+
+    @property
+    def raw_string(self):
+        """
+        A string based on pollbook id and candidates
+        to be used for sorting / raw representation ballots
+        """
+        return ' '.join(
+            [str(self._pollbook.id)] +
+            [str(candidate.id) for candidate in self._candidates])
+
+    def __str__(self):
+        return '{multiplicity} x {pollbook}: {votes}'.format(
+            multiplicity=self._multiplicity,
+            pollbook=self._pollbook,
+            votes=' -> '.join([str(cand) for cand in self._candidates]))
+
+
+def get_ballot_count(ballot):
+    """
+    :return: The number of ballots represented by `ballot`
+    :rtype: int
+    """
+    if isinstance(ballot, ProfileBallot):
+        return ballot.multiplicity
+    return 1
+
+
+def get_ballot_profile(ballots):
+    """
+    Collapses identical ballots into profile ballots
+
+    The profile keeps the order in which each distinct ballot was first seen.
+    Ballots that already are profile ballots are merged by their
+    multiplicity.
+
+    :param ballots: The ballots
+    :type ballots: collections.abc.Iterable
+
+    :return: The profile ballots
+    :rtype: tuple
+    """
+    counts = collections.OrderedDict()
+    for ballot in ballots:
+        key = (ballot.pollbook, tuple(ballot.candidates))
+        counts[key] = counts.get(key, 0) + get_ballot_count(ballot)
+    return tuple(ProfileBallot(pollbook, candidates, ballot_count)
+                 for (pollbook, candidates), ballot_count in counts.items())
+
+
+def count_ballots(ballots):
+    """
+    :return: The total number of ballots in a sequence of (profile) ballots
+    :rtype: int
+    """
+    return sum(get_ballot_count(ballot) for ballot in ballots)
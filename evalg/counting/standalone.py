@@ -248,6 +248,8 @@ class Quota:
 class Ballot:
     """The ballot-class"""
 
+    __slots__ = ('_pollbook_obj', '_candidates')
+
     def __init__(self, pollbook, candidates_list):
         """
         :param pollbook: The pollbook the ballot bellongs to
@@ -260,16 +262,15 @@ class Ballot:
             raise TypeError(
                 'candidates_list must be if the type collections.abc.Sequence')
         self._pollbook_obj = pollbook
-        self._candidates_list = list(candidates_list)
-        self._raw_string = None
+        self._candidates = tuple(candidates_list)
         self._pollbook_obj.ballots_count += 1
-        if not self._candidates_list:  # empty ballot
+        if not self._candidates:  # empty ballot
             self._pollbook_obj.empty_ballots_count += 1
 
     @property
     def candidates(self):
         """candidates-property"""
-        return self._candidates_list
+        return self._candidates
 
     @property
     def raw_string(self):
@@ -277,12 +278,9 @@ class Ballot:
         A string based on voters_lists_id and candidates
         to be used for sorting / raw representation ballots
         """
-        if self._raw_string is None:
-            self._raw_string = ' '.join(
-                [self._pollbook_obj.pollbook_id] +
-                [candidate.candidate_id for candidate in
-                 self._candidates_list])
-        return self._raw_string
+        return ' '.join(
+            [self._pollbook_obj.pollbook_id] +
+            [candidate.candidate_id for candidate in self._candidates])
 
     @property
     def pollbook(self):
@@ -292,16 +290,20 @@ class Ballot:
     def __str__(self):
         return '{pollbook}: {votes}'.format(
             pollbook=self._pollbook_obj,
-            votes=' -> '.join([str(cand) for cand in self._candidates_list]))
+            votes=' -> '.join([str(cand) for cand in self._candidates]))
 
 
 class Election:
     """The election-class"""
 
-    def __init__(self, election_file):
+    def __init__(self, election_file, json_dict=None):
         """
         :param election_file: The election / ballot (.json) file
         :type election_file: str
+
+        :param json_dict: The election / ballot data, used instead of
+                          reading `election_file`
+        :type json_dict: dict
         """
         self._election_id = None
         self._name = 'Standalone election'
@@ -318,11 +320,14 @@ class Election:
         self._start = None
         self._oslomet_quotas = False
 
-        with io.open(election_file, 'r', encoding='utf-8') as json_file:
-            try:
-                self._json_dict = json.load(json_file)
-            except json.JSONDecodeError:
-                raise InvalidFileException
+        if json_dict is not None:
+            self._json_dict = json_dict
+        else:
+            with io.open(election_file, 'r', encoding='utf-8') as json_file:
+                try:
+                    self._json_dict = json.load(json_file)
+                except json.JSONDecodeError:
+                    raise InvalidFileException
         if 'meta' in self._json_dict:
             self._election_id = self._json_dict['meta'].get('electionId',
                                                             'electionId')
@@ -355,8 +360,13 @@ class Election:
             candidate = Candidate(candidate_id, name)
             self._candidates_list.append(candidate)
             logger.info("Adding candidate: %s", candidate)
+        # optional, the pollbooks are weighted equally by default
+        pollbook_weights = self._json_dict.get('pollbookWeights', {})
         for pollbook_id, name in self._json_dict['pollbookNames'].items():
-            pollbook = Pollbook(pollbook_id, name['en'], decimal.Decimal(1))
+            pollbook = Pollbook(
+                pollbook_id,
+                name['en'],
+                decimal.Decimal(pollbook_weights.get(pollbook_id, 1)))
             self._pollbook_dict[pollbook_id] = pollbook
             logger.info("Adding pollbook: %s", pollbook)
         if 'quotas' in self._json_dict:
@@ -385,11 +395,13 @@ class Election:
                               min_value_substitutes)
                 self._quota_list.append(quota)
                 logger.info("Adding quota group: %s", quota)
+        rankings = {}  # equal rankings share one tuple
         for ballot_dict in self._json_dict['ballots']:
             try:
-                ballot = Ballot(self._pollbook_dict[ballot_dict['pollbookId']],
-                                [self._get_candidate_by_id(c_id) for c_id in
+                ranking = tuple([self._get_candidate_by_id(c_id) for c_id in
                                  ballot_dict['rankedCandidateIds']])
+                ballot = Ballot(self._pollbook_dict[ballot_dict['pollbookId']],
+                                rankings.setdefault(ranking, ranking))
             except KeyError:
                 raise InvalidBallotException
             self._ballot_list.append(ballot)
@@ -491,6 +503,11 @@ class Election:
         """
         return tuple(self._quota_list)
 
+    @property
+    def quota_names(self):
+        """quota_names-property"""
+        return self._json_dict.get('meta', {}).get('affirmativeAction', [])
+
     @property
     def start(self):
         """start-property"""
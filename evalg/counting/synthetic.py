@@ -0,0 +1,430 @@
+# -*- coding: utf-8 -*-
+"""
+Synthetic elections for benchmarking the counting algorithms
+
+Preferential elections are generated in the evalg 3 count (.json) format
+read by evalg.counting.standalone, so that a generated election can be
+dumped and counted with ``python -m evalg.counting --count``. List
+elections (sainte_lague) are generated as objects with the interface used by
+evalg.counting.algorithms.party_list.
+
+The voters' preferences follow a Plackett-Luce model: candidate `i` has
+popularity ``1 / (i + 1) ** skew``, and each ballot ranks candidates drawn
+without replacement with probability proportional to their popularity.
+"""
+import datetime
+import itertools
+import random
+import uuid
+
+from evalg.counting import standalone
+from evalg.proc.count import BallotIndex, ListBallot
+
+PREFERENTIAL_ELECTION_TYPES = (
+    'uio_stv',
+    'uit_stv',
+    'uio_mv',
+    'mntv',
+    'ntnu_cv',
+    'poll',
+    'positional_voting',
+)
+LIST_ELECTION_TYPES = (
+    'sainte_lague',
+)
+ELECTION_TYPES = PREFERENTIAL_ELECTION_TYPES + LIST_ELECTION_TYPES
+
+# End of the synthetic elections, fixed to keep the output reproducible
+ELECTION_END = datetime.datetime(2020, 1, 1, 12, 0)
+
+BALLOT_LENGTHS = (
+    'full',
+    'uniform',
+    'short',
+    'single',
+)
+""" Distributions of the number of candidates ranked on a ballot:
+
+full: every candidate
+uniform: uniformly distributed between 1 and the number of candidates
+short: 1 + a geometric distribution with mean 1, i.e. mostly short ballots
+single: one candidate
+"""
+
+
+def get_uuid(rnd):
+    """
+    :return: A random UUID, reproducible through `rnd`
+    :rtype: str
+    """
+    return str(uuid.UUID(int=rnd.getrandbits(128), version=4))
+
+
+def get_ballot_length(rnd, ballot_length, nr_of_candidates):
+    """
+    :return: The number of candidates to rank on a ballot
+    :rtype: int
+    """
+    if ballot_length == 'full':
+        return nr_of_candidates
+    if ballot_length == 'uniform':
+        return rnd.randint(1, nr_of_candidates)
+    if ballot_length == 'short':
+        length = 1
+        while length < nr_of_candidates and rnd.random() < .5:
+            length += 1
+        return length
+    if ballot_length == 'single':
+        return min(1, nr_of_candidates)
+    raise ValueError('Unknown ballot length: {}'.format(ballot_length))
+
+
+def get_ranking(rnd, candidates, popularity, length):
+    """
+    Draws a Plackett-Luce ranking of `length` candidates
+
+    Uses the Efraimidis-Spirakis keys: sorting by ``u ** (1 / weight)``
+    is equivalent to drawing without replacement by weight.
+    """
+    keys = [rnd.random() ** (1 / weight) for weight in popularity]
+    order = sorted(range(len(candidates)), key=keys.__getitem__, reverse=True)
+    return [candidates[i] for i in order[:length]]
+
+
+class RankingGenerator:
+    """
+    Generator of random rankings
+
+    With `distinct_rankings` set, the rankings are drawn from a pool of that
+    many rankings, with Zipf distributed frequencies, to mimic the repeated
+    rankings of real elections.
+    """
+
+    def __init__(self,
+                 rnd,
+                 candidates,
+                 ballot_length='uniform',
+                 skew=1.0,
+                 blank_ratio=0.0,
+                 distinct_rankings=None):
+        self._rnd = rnd
+        self._candidates = list(candidates)
+        self._ballot_length = ballot_length
+        self._blank_ratio = blank_ratio
+        self._popularity = [1 / (i + 1) ** skew
+                            for i in range(len(self._candidates))]
+        self._pool = None
+        if distinct_rankings:
+            self._pool = [self._get_ranking() for _ in
+                          range(distinct_rankings)]
+            self._pool_weights = list(itertools.accumulate(
+                [1 / (i + 1) for i in range(distinct_rankings)]))
+
+    def _get_ranking(self):
+        length = get_ballot_length(self._rnd,
+                                   self._ballot_length,
+                                   len(self._candidates))
+        return get_ranking(self._rnd,
+                           self._candidates,
+                           self._popularity,
+                           length)
+
+    def __call__(self):
+        """
+        :return: A ranking, or an empty list for a blank ballot
+        :rtype: list
+        """
+        if self._rnd.random() < self._blank_ratio:
+            return []
+        if self._pool is None:
+            return self._get_ranking()
+        return self._rnd.choices(self._pool,
+                                 cum_weights=self._pool_weights)[0]
+
+
+def get_election_dict(election_type='uio_stv',
+                      nr_of_ballots=1000,
+                      nr_of_candidates=10,
+                      nr_of_seats=2,
+                      nr_of_substitutes=0,
+                      quotas=False,
+                      pollbook_weights=(1, ),
+                      ballot_length='uniform',
+                      skew=1.0,
+                      blank_ratio=0.02,
+                      distinct_rankings=None,
+                      seed=0):
+    """
+    Generates a preferential election in the standalone (.json) format
+
+    :param election_type: One of the PREFERENTIAL_ELECTION_TYPES
+    :type election_type: str
+
+    :param nr_of_ballots: Number of ballots
+    :type nr_of_ballots: int
+
+    :param nr_of_candidates: Number of candidates
+    :type nr_of_candidates: int
+
+    :param nr_of_seats: Number of regular candidates to elect
+    :type nr_of_seats: int
+
+    :param nr_of_substitutes: Number of substitutes to elect
+    :type nr_of_substitutes: int
+
+    :param quotas: Split the candidates in two (gender) quota groups
+    :type quotas: bool
+
+    :param pollbook_weights: The weight of each pollbook
+    :type pollbook_weights: collections.abc.Sequence
+
+    :param ballot_length: One of the BALLOT_LENGTHS
+    :type ballot_length: str
+
+    :param skew: How much more popular the first candidates are
+    :type skew: float
+
+    :param blank_ratio: The share of blank ballots
+    :type blank_ratio: float
+
+    :param distinct_rankings: If set, the number of distinct rankings
+    :type distinct_rankings: int
+
+    :param seed: Random seed
+    :type seed: int
+
+    :return: The election
+    :rtype: dict
+    """
+    if election_type not in PREFERENTIAL_ELECTION_TYPES:
+        raise ValueError(
+            'Not a preferential election type: {}'.format(election_type))
+    rnd = random.Random(seed)
+    candidate_ids = [get_uuid(rnd) for _ in range(nr_of_candidates)]
+    pollbook_ids = [get_uuid(rnd) for _ in pollbook_weights]
+    get_next_ranking = RankingGenerator(rnd,
+                                        candidate_ids,
+                                        ballot_length=ballot_length,
+                                        skew=skew,
+                                        blank_ratio=blank_ratio,
+                                        distinct_rankings=distinct_rankings)
+    # pollbooks with a larger weight get fewer voters, as in real elections
+    voters_weights = [1 / float(weight) for weight in pollbook_weights]
+    ballots = [
+        {'pollbookId': pollbook_id, 'rankedCandidateIds': get_next_ranking()}
+        for pollbook_id in rnd.choices(pollbook_ids,
+                                       weights=voters_weights,
+                                       k=nr_of_ballots)]
+    election_dict = {
+        'meta': {
+            'electionId': get_uuid(rnd),
+            'electionName': 'Synthetic {} election'.format(election_type),
+            'electionType': election_type,
+            'numRegular': nr_of_seats,
+            'numSubstitutes': nr_of_substitutes,
+            'start': (ELECTION_END - datetime.timedelta(days=1)).isoformat(),
+            'end': ELECTION_END.isoformat(),
+        },
+        'candidateNames': {
+            candidate_id: 'Candidate {}'.format(i + 1)
+            for i, candidate_id in enumerate(candidate_ids)},
+        'pollbookNames': {
+            pollbook_id: {'en': 'Pollbook {}'.format(i + 1)}
+            for i, pollbook_id in enumerate(pollbook_ids)},
+        'pollbookWeights': {
+            pollbook_id: str(weight)
+            for pollbook_id, weight in zip(pollbook_ids, pollbook_weights)},
+        'ballots': ballots,
+    }
+    if quotas:
+        # every other candidate, so that both groups have popular candidates
+        election_dict['meta']['affirmativeAction'] = ['gender_40']
+        election_dict['quotas'] = [
+            {'name': 'Kvinner', 'members': candidate_ids[0::2]},
+            {'name': 'Menn', 'members': candidate_ids[1::2]},
+        ]
+    return election_dict
+
+
+def get_election(election_type='uio_stv', **kwargs):
+    """
+    Generates an election, see get_election_dict() and
+    get_list_election() for the arguments
+
+    :return: The election
+    :rtype: evalg.counting.standalone.Election or ListElection
+    """
+    if election_type in LIST_ELECTION_TYPES:
+        return get_list_election(election_type, **kwargs)
+    return standalone.Election(
+        None,
+        json_dict=get_election_dict(election_type, **kwargs))
+
+
+class ElectionList:
+    """A list in a list election"""
+
+    __slots__ = ('id', 'name', 'candidates')
+
+    def __init__(self, list_id, name, candidates):
+        self.id = list_id
+        self.name = name
+        self.candidates = candidates
+
+
+class ListCandidate:
+    """A candidate on a list in a list election"""
+
+    __slots__ = ('id', 'name', 'priority', 'pre_cumulated')
+
+    def __init__(self, candidate_id, name, priority, pre_cumulated=False):
+        self.id = candidate_id
+        self.name = name
+        self.priority = priority
+        self.pre_cumulated = pre_cumulated
+
+
+class ListElection:
+    """
+    A list election
+
+    Has the attributes of evalg.models.election.Election used by
+    evalg.counting.algorithms.party_list, and ballots like the ones made by
+    evalg.proc.count.
+    """
+
+    def __init__(self, election_id, election_type, lists, pollbooks, ballots,
+                 nr_of_seats):
+        end = ELECTION_END.replace(tzinfo=datetime.timezone.utc)
+        self.id = uuid.UUID(election_id)
+        self.name = 'Synthetic {} election'.format(election_type)
+        self.type_str = election_type
+        self.start = end - datetime.timedelta(days=1)
+        self.end = end
+        self.lists = lists
+        self.pollbooks = pollbooks
+        self.ballots = ballots
+        self.num_choosable = nr_of_seats
+        self.num_substitutes = 0
+        self.quotas = ()
+        self.meta = {
+            'candidate_rules': {'seats': nr_of_seats},
+            'counting_rules': {
+                'method': election_type,
+                'first_divisor': 1,
+                'precumulate': 1,
+                'list_votes': 'seats',
+                'other_list_candidate_votes': True,
+            },
+        }
+        self.total_amount_ballots = len(ballots)
+        self.total_amount_empty_ballots = len(
+            [ballot for ballot in ballots if not ballot.candidates])
+        self.total_amount_counting_ballots = (
+            self.total_amount_ballots - self.total_amount_empty_ballots)
+
+    @property
+    def candidates(self):
+        return [candidate for election_list in self.lists
+                for candidate in election_list.candidates]
+
+
+def get_list_election(election_type='sainte_lague',
+                      nr_of_ballots=1000,
+                      nr_of_candidates=10,
+                      nr_of_seats=2,
+                      nr_of_lists=4,
+                      pollbook_weights=(1, ),
+                      ballot_length='uniform',
+                      skew=1.0,
+                      blank_ratio=0.02,
+                      other_list_ratio=0.2,
+                      cumulate_ratio=0.1,
+                      seed=0,
+                      **kwargs):
+    """
+    Generates a list election
+
+    Every list has `nr_of_candidates` candidates, and the ballots give
+    personal votes to candidates on the chosen list as ranked by
+    `ballot_length`. Arguments only used for preferential elections, like
+    `quotas`, are ignored.
+
+    :param nr_of_lists: Number of lists
+    :type nr_of_lists: int
+
+    :param other_list_ratio: The share of ballots with a personal vote for
+                             a candidate on another list
+    :type other_list_ratio: float
+
+    :param cumulate_ratio: The share of personal votes that are cumulated
+    :type cumulate_ratio: float
+
+    :return: The election
+    :rtype: ListElection
+    """
+    if election_type not in LIST_ELECTION_TYPES:
+        raise ValueError(
+            'Not a list election type: {}'.format(election_type))
+    rnd = random.Random(seed)
+    lists = []
+    for list_nr in range(nr_of_lists):
+        candidates = [
+            ListCandidate(get_uuid(rnd),
+                          'Candidate {}.{}'.format(list_nr + 1, i + 1),
+                          i,
+                          pre_cumulated=(i == 0))
+            for i in range(nr_of_candidates)]
+        lists.append(ElectionList(get_uuid(rnd),
+                                  'List {}'.format(list_nr + 1),
+                                  candidates))
+    pollbooks = []
+    for i, weight in enumerate(pollbook_weights):
+        pollbooks.append(standalone.Pollbook(get_uuid(rnd),
+                                             'Pollbook {}'.format(i + 1),
+                                             weight))
+    index = BallotIndex(
+        {pollbook.id: pollbook for pollbook in pollbooks},
+        {candidate.id: candidate for election_list in lists
+         for candidate in election_list.candidates},
+        {election_list.id: election_list for election_list in lists})
+    list_popularity = [1 / (i + 1) ** skew for i in range(nr_of_lists)]
+    get_next_rankings = [
+        RankingGenerator(rnd,
+                         [candidate.id for candidate in
+                          election_list.candidates],
+                         ballot_length=ballot_length,
+                         skew=skew)
+        for election_list in lists]
+
+    ballots = []
+    for pollbook in rnd.choices(pollbooks, k=nr_of_ballots):
+        ballot_data = {
+            'voteType': 'SPListElecVote',
+            'chosenListId': '',
+            'isBlankVote': True,
+            'personalVotesOtherParty': [],
+            'personalVotesSameParty': [],
+            'pollbookId': pollbook.id,
+        }
+        if rnd.random() >= blank_ratio:
+            list_nr = rnd.choices(range(nr_of_lists),
+                                  weights=list_popularity)[0]
+            ballot_data['chosenListId'] = lists[list_nr].id
+            ballot_data['isBlankVote'] = False
+            ballot_data['personalVotesSameParty'] = [
+                {'candidate': candidate_id,
+                 'cumulated': rnd.random() < cumulate_ratio}
+                for candidate_id in get_next_rankings[list_nr]()]
+            if nr_of_lists > 1 and rnd.random() < other_list_ratio:
+                other_list = rnd.choice(
+                    lists[:list_nr] + lists[list_nr + 1:])
+                ballot_data['personalVotesOtherParty'] = [
+                    {'candidate': rnd.choice(other_list.candidates).id,
+                     'list': other_list.id}]
+        pollbook.ballots_count += 1
+        if ballot_data['isBlankVote']:
+            pollbook.empty_ballots_count += 1
+        ballots.append(ListBallot.from_ballot_data(ballot_data, index))
+    return ListElection(get_uuid(rnd), election_type, lists, pollbooks,
+                        ballots, nr_of_seats)
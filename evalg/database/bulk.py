@@ -0,0 +1,50 @@
+"""
+Bulk inserts of versioned models.
+
+Objects added through the ORM are versioned by sqlalchemy-continuum when the
+session is flushed. Rows inserted with core statements bypass the unit of
+work, so :py:func:`insert_versioned` writes their version rows itself, in the
+continuum transaction of the session.
+"""
+from sqlalchemy_continuum import version_class
+from sqlalchemy_continuum.operation import Operation
+
+from evalg.models.base import versioning_manager
+
+MOD_SUFFIX = '_mod'
+
+
+def get_transaction(session):
+    """Get the continuum transaction of a session, creating it if needed."""
+    uow = versioning_manager.unit_of_work(session)
+    return uow.current_transaction or uow.create_transaction(session)
+
+
+def insert_versioned(session, model, rows):
+    """
+    Insert new rows of a versioned model, with one multi-row INSERT.
+
+    :param model: A versioned model
+    :param rows: Values of every column of the rows, including primary keys
+    :type rows: list of dicts
+    """
+    if not rows:
+        return
+    table = model.__table__
+    session.execute(table.insert().values(rows))
+
+    version_table = version_class(model).__table__
+    version_values = {
+        'transaction_id': get_transaction(session).id,
+        'end_transaction_id': None,
+        'operation_type': Operation.INSERT,
+    }
+    for column in table.c:
+        if not column.primary_key:
+            version_values[column.key + MOD_SUFFIX] = True
+    version_values = {k: v for k, v in version_values.items()
+                      if k in version_table.c}
+    session.execute(version_table.insert().values([
+        dict(version_values, **{c.key: row[c.key] for c in table.c})
+        for row in rows
+    ]))
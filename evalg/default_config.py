@@ -129,6 +129,9 @@ PERMISSIONS = {
         "finished_at": "can_access_election_group_count",
         "audit": "can_access_election_group_count",
         "status": "can_access_election_group_count",
+        "phase": "can_access_election_group_count",
+        "progress": "can_access_election_group_count",
+        "metrics": "can_access_election_group_count",
     },
     "ElectionResult": {
         "election_id": "can_access_election_result",
@@ -224,6 +227,9 @@ PERMISSIONS = {
         "file_name": "can_manage_census_file_upload",
         "mime_type": "can_manage_census_file_upload",
         "import_results": "can_manage_census_file_upload",
+        "processed_nr": "can_manage_census_file_upload",
+        "added_nr": "can_manage_census_file_upload",
+        "already_in_pollbook_nr": "can_manage_census_file_upload",
         "initiated_at": "can_manage_census_file_upload",
         "finished_at": "can_manage_census_file_upload",
         "status": "can_manage_census_file_upload",
@@ -247,16 +253,59 @@ FEIDE_ENTITLEMENT_MAPPING: Dict = {
     "global_admin": [],
 }
 
+#
+# Authorization cache, see evalg.proc.role_cache
+#
+# Seconds a process may use the cached principals of a person, 0 to disable.
+# Changes made in the process drop the cached principals at once, but a role
+# granted or revoked by another process (or directly in the database) is only
+# seen when the cached principals expire. A few seconds still covers the
+# burst of requests made by one page load; a longer TTL saves more queries,
+# but keeps revoked roles usable for longer.
+ROLE_CACHE_TTL = 5
+# Max number of persons with cached principals per process.
+ROLE_CACHE_SIZE = 1024
+
 #
 # Ballot encryption/serialization
 #
+# Envelope type of new ballots, see evalg.ballot_serializer.factory.
+# Ballots of the other envelope types can still be counted.
+# "binary-nacl" makes smaller envelopes that are faster to decrypt, and is
+# opt-in: only switch once every backend and worker can read it.
 ENVELOPE_TYPE = "base64-nacl"
 ENVELOPE_PADDED_LEN = 1000
+# Seconds a process may use its cached ballot validation data (candidates,
+# lists and ballot rules) of an election before reloading it.
+BALLOT_VALIDATION_CONTEXT_TTL = 60
+
+#
+# Counting
+#
+# Run counts as a Celery task. The count mutation then returns immediately,
+# and the progress can be followed on the ElectionGroupCount.
+COUNT_ASYNC = False
+# Number of worker processes used to decrypt ballots during a count.
+# 0 disables the worker pool and decrypts serially in the request process.
+# Daemonic processes, like Celery workers, always decrypt serially.
+COUNT_DECRYPT_PROCESSES = 0
+# Number of envelopes handed to a decryption worker at a time.
+COUNT_DECRYPT_CHUNK_SIZE = 1000
+# Number of envelopes read per batch through a server side cursor when
+# counting. 0 reads all envelopes of a pollbook at once.
+COUNT_ENVELOPE_BATCH_SIZE = 0
+# Number of worker processes used to count the elections of an election group
+# in parallel. Each worker decrypts and counts one election at a time.
+# 0 counts the elections one by one in the count process. Daemonic
+# processes, like Celery workers, can't start workers and always use 0.
+COUNT_ELECTION_PROCESSES = 0
 
 #
 # Pollbook file import
 #
 FEIDE_POSTFIX = "uio.no"
+# Number of census file entries inserted and committed at a time.
+CENSUS_IMPORT_CHUNK_SIZE = 1000
 
 #
 # Sentry config
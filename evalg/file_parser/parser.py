@@ -2,43 +2,110 @@
 import abc
 import csv
 import io
+import itertools
 import re
 
 
+# Number of ids used to find the id type of a file
+SAMPLE_SIZE = 100
+
+POSIX_UID_PATTERN = re.compile(
+    '^[a-z_]([a-z0-9_-]{0,31}|[a-z0-9_-]{0,30}\\$)$')
+
+
+def read_csv_fields(lines):
+    """Get the first column of the rows of a CSV file."""
+    for row in csv.reader(lines):
+        if row and row[0]:
+            yield row[0]
+
+
 class CensusFileParser(metaclass=abc.ABCMeta):
-    """Abstract parser class."""
+    """
+    Abstract parser class.
+
+    The file is read one line at a time. The id type is found from the first
+    SAMPLE_SIZE ids, and every id is checked against it by validate() and
+    while parsing.
+    """
 
     def __init__(self, census_file, feide_postfix='uio.no'):
         self.census_file = census_file
         self._id_type = None
         self._convert_to_feide = False
-        self.fields = None
         self.feide_postfix = feide_postfix
+        self.has_fs_header = False
+        self.id_type = self.find_identifier_type(
+            list(itertools.islice(self.read_ids(), SAMPLE_SIZE)))
+
+    def open(self):
+        """Open the census file as text."""
+        if isinstance(self.census_file, (bytes, bytearray, memoryview)):
+            census_file = io.BytesIO(self.census_file)
+        else:
+            census_file = self.census_file
+            census_file.seek(0)
+        return io.TextIOWrapper(census_file, encoding='utf-8', newline='')
 
-    def parse(self):
-        """Parse the current file and create a generator."""
+    @abc.abstractmethod
+    def read_fields(self):
+        """Get the ids of the file, as they are written in it."""
+
+    def read_ids(self):
+        """Get the ids of the file, without whitespace and empty lines."""
+        for field in self.read_fields():
+            field = field.strip()
+            if field:
+                yield field
+
+    def normalize(self, field):
+        """
+        Normalize an id of the file.
+
+        :raises ValueError: If the id is not a valid id of the file's type.
+        """
+        id_value = field.lower()
+        if self._convert_to_feide:
+            if not POSIX_UID_PATTERN.match(id_value):
+                raise ValueError(
+                    'Invalid ids, {!r} in file of uids'.format(field))
+            return "{}@{}".format(id_value, self.feide_postfix)
+        if '@' not in id_value:
+            raise ValueError(
+                'Invalid ids, {!r} in file of feide ids'.format(field))
+        return id_value
+
+    def validate(self):
+        """
+        Check that every id of the file is of the file's id type.
 
-        # Remove duplicate values
-        self.fields = list(set(self.fields))
+        The file is read one line at a time, and no ids are kept.
 
-        if not self.id_type:
+        :raises ValueError: At the first id of another type.
+        """
+        if self.id_type != 'feide_id':
             return
+        for field in self.read_ids():
+            self.normalize(field)
 
-        if self.id_type == 'feide_id':
-            for field in self.fields:
+    def parse(self):
+        """
+        Parse the current file and create a generator.
 
-                # Remove whitespaces
-                field = field.strip()
-                if len(field) == 0:
-                    continue
+        Every id is generated once.
 
-                if self._convert_to_feide:
-                    yield "{}@{}".format(field.lower(), self.feide_postfix)
-                else:
-                    yield field.lower()
-        else:
+        :raises ValueError: At the first id that is not of the file's id type.
+        """
+        if self.id_type != 'feide_id':
             return
 
+        seen = set()
+        for field in self.read_ids():
+            id_value = self.normalize(field)
+            if id_value not in seen:
+                seen.add(id_value)
+                yield id_value
+
     @classmethod
     @abc.abstractmethod
     def get_mime_types(cls):
@@ -74,19 +141,17 @@ class CensusFileParser(metaclass=abc.ABCMeta):
             raise ValueError('No ids given')
 
         # Remove empty lines or lines with only whitespaces
-        ids = [x.strip() for x in ids if len(x.strip()) > 0]
+        ids = [x for x in (x.strip() for x in ids) if x]
 
-        if all(['@' in x for x in ids]):
+        with_at = sum('@' in x for x in ids)
+        if with_at == len(ids):
             return 'feide_id'
 
-        if any(['@' in x for x in ids]):
+        if with_at:
             # Probably a feide id or email mixed in with usernames
             raise ValueError('Invalid ids, mix of feide and other ids')
 
-        if all([cls.is_posix_uid(x) for x in ids]):
-            return 'uid'
-
-        if all([cls.is_posix_uid(x.lower()) for x in ids]):
+        if all(cls.is_posix_uid(x.lower()) for x in ids):
             return 'uid'
 
         raise ValueError('No supported id type found in file')
@@ -94,9 +159,7 @@ class CensusFileParser(metaclass=abc.ABCMeta):
     @classmethod
     def is_posix_uid(cls, uid):
         """Test if uid is a valid posix uid."""
-        valid_posix_uid = '^[a-z_]([a-z0-9_-]{0,31}|[a-z0-9_-]{0,30}\\$)$'
-        res = re.search(valid_posix_uid, uid)
-        return bool(res)
+        return bool(POSIX_UID_PATTERN.match(uid))
 
     @classmethod
     def is_fs_header(cls, header):
@@ -113,8 +176,14 @@ class CensusFileParser(metaclass=abc.ABCMeta):
         return supported_mime_typs
 
     @classmethod
-    def factory(cls, census_file, mime_type, feide_postfix='uio.no'):
-        """Return the correct file parser if supported."""
+    def factory(cls, census_file, mime_type, feide_postfix='uio.no',
+                validate=True):
+        """
+        Return the correct file parser if supported.
+
+        :param validate: Check every id of the file, not only the ids used to
+                         find the id type.
+        """
 
         supported_mime_types = {}
 
@@ -134,6 +203,8 @@ class CensusFileParser(metaclass=abc.ABCMeta):
                     'Content in file not valid for file type {}'.format(
                         census_file.mimetype
                     ))
+            if validate:
+                parser.validate()
             return parser
         raise ValueError('No parser for filetype {}'.format(
             mime_type))
@@ -142,20 +213,17 @@ class CensusFileParser(metaclass=abc.ABCMeta):
 class PlainTextParser(CensusFileParser):
     """A parser for plain text file files."""
 
-    def __init__(self, census_file, feide_postfix):
-        super().__init__(census_file, feide_postfix)
-        content = self.census_file.decode('utf-8')
-        self.fields = content.splitlines()
-
-        if len(self.fields) > 0 and self.is_fs_header(self.fields[0]):
+    def read_fields(self):
+        lines = self.open()
+        first_line = next(lines, '')
+        if self.is_fs_header(first_line):
             # TODO: Remove this..?
             # File is a csv file erroneously save as .txt.
-            parser = CsvParser(self.census_file, feide_postfix=feide_postfix)
-            self.fields = [x for x in parser.parse()]
             self.has_fs_header = True
+            yield from read_csv_fields(lines)
         else:
-            self.has_fs_header = False
-        self.id_type = self.find_identifier_type(self.fields)
+            yield first_line
+            yield from lines
 
     @classmethod
     def get_mime_types(cls):
@@ -166,18 +234,14 @@ class PlainTextParser(CensusFileParser):
 class CsvParser(CensusFileParser):
     """A parser for CSV files."""
 
-    def __init__(self, census_file, feide_postfix):
-        super().__init__(census_file, feide_postfix)
-        csvfile = io.StringIO(self.census_file.decode('utf-8'))
-
-        first_line = csvfile.readline()
-        self.has_fs_header = self.is_fs_header(first_line)
+    def read_fields(self):
+        lines = self.open()
+        first_line = next(lines, '')
+        self.has_fs_header = bool(self.is_fs_header(first_line))
         if not self.has_fs_header:
-            # No fs header, move back to file start
-            csvfile.seek(0)
-
-        self.fields = [x[0] for x in csv.reader(csvfile) if x and x[0]]
-        self.id_type = self.find_identifier_type(self.fields)
+            # No fs header, keep the first line
+            lines = itertools.chain([first_line], lines)
+        yield from read_csv_fields(lines)
 
     @classmethod
     def get_mime_types(cls):
@@ -69,6 +69,9 @@ def get_test_context(db_session):
 
 def init_app(app):
     from evalg.graphql import middleware
+    from evalg.graphql.nodes.utils import permissions
+
+    permissions.init_app(app)
 
     mw = [
         middleware.logging_middleware,
@@ -7,6 +7,7 @@ well as queries and mutations for this object.
 import graphene
 import graphene_sqlalchemy
 
+from flask import current_app
 from graphene.types.generic import GenericScalar
 from graphql import GraphQLError
 from sqlalchemy.sql import or_
@@ -672,17 +673,21 @@ class CountElectionGroup(graphene.Mutation):
 
         # Creating an election_group_count entry in the db
         count = election_group_counter.log_start_count()
-        election_group_counter.deserialize_ballots()
-        election_group_counter.process_for_count()
+        counted_by = getattr(user.person, "display_name", None)
 
-        if info.context["user"].person:
-            election_group_counter.generate_results(
-                count, getattr(info.context["user"].person, "display_name", None)
+        if current_app.config.get("COUNT_ASYNC"):
+            from evalg.tasks.celery_worker import count_election_group_task
+
+            count_election_group_task.delay(
+                str(count.id),
+                evalg.proc.count.seal_election_key(
+                    election_key, current_app.config.get("BACKEND_PUBLIC_KEY")
+                ),
+                counted_by,
+                election_group_counter.test_mode,
             )
         else:
-            election_group_counter.generate_results(count)
-
-        count = election_group_counter.log_finalize_count(count)
+            count = election_group_counter.count(count, counted_by)
 
         return CountElectionGroupResponse(
             success=True, election_group_count_id=count.id
@@ -25,6 +25,12 @@ from evalg.graphql.nodes.utils.base import (
     MutationResponse,
 )
 from evalg.graphql.nodes.person import Person
+from evalg.graphql.nodes.utils.dataloaders import (
+    get_loader,
+    PollbookStatsLoader,
+    VoterHasVotedLoader,
+    VoterPersonLoader,
+)
 from evalg.graphql.nodes.utils.permissions import (
     permission_controlled_default_resolver,
     permission_controller,
@@ -51,14 +57,11 @@ class Voter(graphene_sqlalchemy.SQLAlchemyObjectType):
 
     @permission_controller
     def resolve_person(self, info):
-        voter_id = self.id
-        session = get_session(info)
-        voter = session.query(evalg.models.voter.Voter).get(voter_id)
-        return evalg.proc.pollbook.get_person_for_voter(session, voter)
+        return get_loader(info, VoterPersonLoader).load(self.id)
 
     @permission_controller
     def resolve_has_voted(self, info):
-        return len(self.votes) > 0
+        return get_loader(info, VoterHasVotedLoader).load(self.id)
 
 
 @permission_controller.control_object_type
@@ -74,11 +77,14 @@ class Pollbook(graphene_sqlalchemy.SQLAlchemyObjectType):
     voters_with_vote = graphene.List(lambda: Voter)
     voters_without_vote = graphene.List(lambda: Voter)
     nr_of_voters = graphene.types.Int()
-    voter_dump = graphene.Field(GenericScalar)
+    voter_dump = graphene.Field(
+        GenericScalar,
+        deprecation_reason='Use /pollbooks/<id>/voters.csv or .ndjson')
 
     @permission_controller
     def resolve_nr_of_voters(self, info):
-        return len(self.voters)
+        return get_loader(info, PollbookStatsLoader).load(self.id).then(
+            lambda stats: stats.voters)
 
     @permission_controller
     def resolve_self_added_voters(self, info):
@@ -90,11 +96,13 @@ class Pollbook(graphene_sqlalchemy.SQLAlchemyObjectType):
 
     @permission_controller
     def resolve_verified_voters_count(self, info):
-        return len(self.valid_voters)
+        return get_loader(info, PollbookStatsLoader).load(self.id).then(
+            lambda stats: stats.verified)
 
     @permission_controller
     def resolve_verified_voters_with_votes_count(self, info):
-        return len(self.valid_voters_with_vote)
+        return get_loader(info, PollbookStatsLoader).load(self.id).then(
+            lambda stats: stats.verified_with_vote)
 
     @permission_controller
     def resolve_voters_with_vote(self, info):
@@ -106,9 +114,11 @@ class Pollbook(graphene_sqlalchemy.SQLAlchemyObjectType):
 
     @permission_controller
     def resolve_voter_dump(self, info):
+        session = get_session(info)
         return [
-            [x.id_type, x.id_value, x.has_voted, x.verified_status.value]
-            for x in self.voters
+            [id_type, id_value, has_voted, status.value]
+            for id_type, id_value, has_voted, status
+            in evalg.proc.pollbook.get_voter_dump(session, self.id)
         ]
 
 
@@ -471,7 +481,7 @@ class UploadCensusFile(graphene.Mutation):
 
         from evalg.tasks.celery_worker import import_census_file_task
 
-        import_census_file_task.delay(pollbook_id, file_import.id)
+        import_census_file_task.delay(file_import.id)
 
         logger.info("Started file import as celery job")
 
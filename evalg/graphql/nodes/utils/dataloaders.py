@@ -0,0 +1,69 @@
+"""
+DataLoaders for batching database lookups of GraphQL fields.
+
+A field that is resolved for every object in a list, e.g. for every voter of
+a pollbook, can load its data through a DataLoader. The loads of one level of
+the query are collected and done in one query.
+
+The loaders are shared by the resolvers of a request, and do not cache any
+results, so that a field resolved after a mutation sees its changes.
+"""
+from flask import g
+from promise import Promise
+from promise.dataloader import DataLoader
+
+from evalg.graphql.nodes.utils.base import get_session
+from evalg.proc.pollbook import (get_persons_for_voters,
+                                 get_pollbook_stats,
+                                 get_voters_with_votes)
+
+# Max number of keys in one query
+MAX_BATCH_SIZE = 500
+
+
+class SessionDataLoader(DataLoader):
+    """DataLoader that looks up its keys in a database session."""
+
+    def __init__(self, session):
+        super().__init__(cache=False, max_batch_size=MAX_BATCH_SIZE)
+        self.session = session
+
+
+class VoterHasVotedLoader(SessionDataLoader):
+    """Loads whether voters have voted, by voter id."""
+
+    def batch_load_fn(self, voter_ids):
+        voted = get_voters_with_votes(self.session, voter_ids)
+        return Promise.resolve([voter_id in voted for voter_id in voter_ids])
+
+
+class VoterPersonLoader(SessionDataLoader):
+    """Loads the persons of voters, by voter id."""
+
+    def batch_load_fn(self, voter_ids):
+        persons = get_persons_for_voters(self.session, voter_ids)
+        return Promise.resolve([persons.get(voter_id)
+                                for voter_id in voter_ids])
+
+
+class PollbookStatsLoader(SessionDataLoader):
+    """Loads the voter counts of pollbooks, by pollbook id."""
+
+    def batch_load_fn(self, pollbook_ids):
+        stats = get_pollbook_stats(self.session, pollbook_ids)
+        return Promise.resolve([stats[pollbook_id]
+                                for pollbook_id in pollbook_ids])
+
+
+def get_loader(info, loader_class):
+    """
+    Get the DataLoader of the current request.
+
+    :param loader_class: A SessionDataLoader subclass
+    """
+    session = get_session(info)
+    loaders = g.setdefault('_dataloaders', {})
+    key = (loader_class, id(session))
+    if key not in loaders:
+        loaders[key] = loader_class(session)
+    return loaders[key]
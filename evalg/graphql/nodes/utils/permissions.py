@@ -5,14 +5,16 @@ fields and mutations.
 import logging
 import functools
 
-from flask import current_app
+import sqlalchemy.event
+from flask import current_app, g, has_app_context
+from sqlalchemy.orm import Session
 
 from graphene.types.resolver import get_default_resolver
 from flask_sqlalchemy.model import camel_to_snake_case
 from flask_allows import Permission
 
 from evalg.proc.pollbook import get_voters_for_person
-from evalg.utils import Name2Callable
+from evalg.utils import Name2Callable, memoize_key, underscore_to_camel
 from evalg.models.election_list import ElectionList
 from evalg.models.election import ElectionGroup
 from evalg.graphql.nodes.utils.base import (get_session,
@@ -179,9 +181,90 @@ def can_view_vote(session, user, vote, **kwargs):
     return Permission(IsVoter(session, vote.voter), identity=user)
 
 
-@functools.lru_cache(maxsize=1)
-def permissions_config():
-    return current_app.config.get('PERMISSIONS')
+class FieldPermissions(dict):
+    """
+    Permission checkers of the fields of an ObjectType, by GraphQL field name.
+
+    Fields that are not in the PERMISSIONS config are denied.
+    """
+
+    def __init__(self, checkers):
+        """
+        :param checkers: Permission checkers by snake_case field name
+        :type checkers: dict
+        """
+        super().__init__()
+        self.checkers = checkers
+        for field_name, checker in checkers.items():
+            self[underscore_to_camel(field_name)] = checker
+
+    def __missing__(self, field_name):
+        checker = self.checkers.get(camel_to_snake_case(field_name), deny)
+        self[field_name] = checker
+        return checker
+
+
+def compile_permissions(permissions):
+    """
+    Compile the PERMISSIONS config into permission checkers.
+
+    :param permissions: Permission names by field name, by ObjectType name
+    :type permissions: dict
+
+    :return: FieldPermissions by ObjectType name
+    :rtype: dict
+    """
+    return {
+        type_name: FieldPermissions({
+            field_name: all_permissions.get(permission_name, deny)
+            for field_name, permission_name in (fields or {}).items()
+        })
+        for type_name, fields in permissions.items()
+    }
+
+
+def init_app(app):
+    """Compile the PERMISSIONS config of the app."""
+    app.extensions['evalg_permissions'] = compile_permissions(
+        app.config.get('PERMISSIONS') or {})
+
+
+def get_field_permissions(type_name):
+    """Get the compiled permissions of an ObjectType, or None."""
+    if 'evalg_permissions' not in current_app.extensions:
+        init_app(current_app)
+    return current_app.extensions['evalg_permissions'].get(type_name)
+
+
+def check_permission(checker, session, user, source, **kwargs):
+    """
+    Run a permission checker, memoized for the rest of the request.
+
+    Results are memoized by checker, user, database object and field
+    arguments, and forgotten when a session is committed. Checks of other
+    sources are not memoized.
+    """
+    state = getattr(source, '_sa_instance_state', None)
+    if state is None or state.key is None or not has_app_context():
+        return bool(checker(session, user, source, **kwargs))
+    arguments = {k: v for k, v in kwargs.items() if k != 'path'}
+    key = (checker,
+           memoize_key(getattr(user, 'person', None)),
+           state.key,
+           memoize_key(arguments) if arguments else None)
+    checks = g.setdefault('_permission_checks', {})
+    try:
+        return checks[key]
+    except KeyError:
+        result = checks[key] = bool(
+            checker(session, user, source, **kwargs))
+        return result
+
+
+@sqlalchemy.event.listens_for(Session, 'after_commit')
+def _forget_permission_checks(session):
+    if has_app_context():
+        g.pop('_permission_checks', None)
 
 
 def can_access_field(source, info, **kwargs):
@@ -189,17 +272,20 @@ def can_access_field(source, info, **kwargs):
 
     :type info: graphql.execution.base.ResolveInfo
     """
-    session = get_session(info)
-    user = get_current_user(info)
-    permissions = permissions_config().get(str(info.parent_type))
+    permissions = get_field_permissions(info.parent_type.name)
     if permissions is None:
         return False
-    field_name = camel_to_snake_case(info.field_name)
-    permission = permissions.get(field_name)
-    if all_permissions.get(permission, deny)(session, user, source,
-                                             path=info.path, **kwargs):
+    checker = permissions[info.field_name]
+    if checker is deny:
+        return False
+    if checker is allow:
         return True
-    return False
+    return check_permission(checker,
+                            get_session(info),
+                            get_current_user(info),
+                            source,
+                            path=info.path,
+                            **kwargs)
 
 
 class PermissionController(object):
@@ -19,6 +19,7 @@ from . import person
 from . import pollbook
 from . import privkeys_backup
 from . import voter
+from . import vote_count
 from . import votes
 
 __all__ = [
@@ -37,5 +38,6 @@ __all__ = [
     'pollbook',
     'privkeys_backup',
     'voter',
+    'vote_count',
     'votes',
 ]
@@ -52,6 +52,28 @@ class CensusFileImport(ModelBase):
         doc='Results for the census file import',
     )
 
+    # Import progress, updated as voters are committed
+    processed_nr = schema.Column(
+        sqltypes.Integer,
+        default=0,
+        doc='number of census file entries imported',
+        nullable=False,
+    )
+
+    added_nr = schema.Column(
+        sqltypes.Integer,
+        default=0,
+        doc='number of voters added to the pollbook',
+        nullable=False,
+    )
+
+    already_in_pollbook_nr = schema.Column(
+        sqltypes.Integer,
+        default=0,
+        doc='number of entries already in the pollbook',
+        nullable=False,
+    )
+
     initiated_at = schema.Column(evalg.database.types.UtcDateTime)
     finished_at = schema.Column(evalg.database.types.UtcDateTime)
 
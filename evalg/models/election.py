@@ -6,6 +6,7 @@ import math
 from typing import Dict
 import uuid
 
+import sqlalchemy.event
 from sqlalchemy.dialects.postgresql import INTERVAL
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.sql import select, func, case, and_
@@ -14,6 +15,7 @@ from sqlalchemy.sql.functions import concat
 
 import evalg.database.types
 from evalg import db
+from evalg.ballot_serializer.factory import invalidate_public_key
 from evalg.utils import utcnow
 from .base import ModelBase
 
@@ -613,3 +615,12 @@ class Election(AbstractElection):
     def type_str(self):
         """type_str-property"""
         return self.meta["counting_rules"]["method"]
+
+
+def _invalidate_public_key(target, value, oldvalue, initiator):
+    """Drop the cached encryption state of a replaced public key."""
+    if value != oldvalue and isinstance(oldvalue, str):
+        invalidate_public_key(oldvalue)
+
+
+sqlalchemy.event.listen(ElectionGroup.public_key, "set", _invalidate_public_key)
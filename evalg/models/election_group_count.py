@@ -38,14 +38,52 @@ class ElectionGroupCount(ModelBase):
 
     audit = db.Column(evalg.database.types.MutableJson)
 
+    phase = db.Column(
+        db.UnicodeText,
+        doc='current phase of the count, see COUNT_PHASES')
+
+    progress = db.Column(
+        db.Integer,
+        doc='progress of the count in percent')
+
+    metrics = db.Column(
+        evalg.database.types.MutableJson,
+        doc='time spent in each phase, ballot counts and memory growth, '
+            'in total and per election, see COUNT_METRIC_PHASES')
+
     @hybrid_property
     def status(self):
         if self.finished_at:
             return 'finished'
+        if self.phase == 'failed':
+            return 'failed'
         return 'ongoing'
 
     @status.expression # type: ignore
     def status(cls):
         return case(
-            [(cls.finished_at.isnot(None), 'finished')],
+            [(cls.finished_at.isnot(None), 'finished'),
+             (cls.phase == 'failed', 'failed')],
             else_='ongoing')
+
+
+COUNT_PHASES = (
+    'queued',
+    'decrypt',
+    'tally',
+    'protocol',
+    'persist',
+    'finished',
+    'failed',
+)
+""" The phases of a count, in order """
+
+COUNT_METRIC_PHASES = (
+    'fetch',
+    'decrypt',
+    'build',
+    'tally',
+    'protocol',
+    'persist',
+)
+""" The phases timed in ElectionGroupCount.metrics, in order """
@@ -72,27 +72,27 @@ class Pollbook(ModelBase):
     @property
     def self_added_voters(self):
         """List of all selv added voters."""
-        return [x for x in self.voters if x.self_added]
+        return self.voter_objects.filter(Voter.self_added).all()
 
     @property
     def valid_voters(self):
         """List of all valid voters."""
-        return [x for x in self.voters if x.is_valid_voter()]
+        # only the valid statuses can be verified
+        return self.voter_objects.filter(Voter.verified).all()
 
     @property
     def voters_admin_added(self):
         """List of all voters added by the admins."""
-        return [x for x in self.voters if not x.self_added]
+        return self.voter_objects.filter(Voter.self_added.is_(False)).all()
 
     @property
     def valid_voters_with_vote(self):
         """List of all valid voters with a vote."""
-        voters = [x for x in self.voters if x.is_valid_voter() and
-                  len(x.votes) > 0]
-        return voters
+        return self.voter_objects.filter(Voter.verified,
+                                         Voter.votes.any()).all()
 
     @property
     def valid_voters_without_vote(self):
         """List of all valid voters without a vote."""
-        voters = [x for x in self.voters if x.is_valid_voter() and not x.votes]
-        return voters
+        return self.voter_objects.filter(Voter.verified,
+                                         ~Voter.votes.any()).all()
@@ -0,0 +1,148 @@
+"""
+Database model for live vote counts.
+
+The number of voters with a vote is counted per poll book and voter
+``verified_status``, so that the turnout of an election can be shown without
+scanning its voters and votes.
+
+The counters are kept up to date by mapper events, in the same transaction
+as the change:
+
+- a row for every status is created along with a new poll book, and by the
+  migration for existing poll books, so counting a vote is a single UPDATE
+- a new vote adds one to the status of its voter, a deleted vote subtracts it
+- a voter with a vote that changes status (is reviewed) or poll book moves
+  its vote to the new counter
+
+Changes that bypass the ORM, e.g. bulk query deletes, are not counted.
+``evalg.proc.vote.rebuild_vote_counts`` rebuilds the counters from the votes.
+"""
+import logging
+
+import sqlalchemy.event
+from sqlalchemy import inspect
+from sqlalchemy.orm import object_session
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy.sql import select
+
+from evalg import db
+from evalg.database.types import UuidType
+
+from .base import ModelBase
+from .pollbook import Pollbook
+from .voter import Voter, VerifiedStatus, VERIFIED_STATUS_MAP
+from .votes import Vote
+
+logger = logging.getLogger(__name__)
+
+VOTE_COUNT_STATUSES = tuple(status.name.lower() for status in VerifiedStatus)
+
+
+class PollbookVoteCount(ModelBase):
+    """Number of votes in a poll book, for one voter verified status."""
+
+    __tablename__ = 'pollbook_vote_count'
+
+    pollbook_id = db.Column(
+        UuidType,
+        db.ForeignKey('pollbook_meta.id', ondelete='CASCADE'),
+        primary_key=True)
+
+    verified_status = db.Column(
+        db.UnicodeText,
+        doc='verified status of the voters, see VOTE_COUNT_STATUSES',
+        primary_key=True)
+
+    votes = db.Column(
+        db.Integer,
+        doc='number of voters with a vote',
+        nullable=False,
+        default=0)
+
+
+def get_status_name(self_added, reviewed, verified):
+    """Get the counter name of a voter status."""
+    return VERIFIED_STATUS_MAP[(self_added, reviewed, verified)].name.lower()
+
+
+def add_to_vote_count(connection, pollbook_id, verified_status, votes):
+    """
+    Add to a vote counter.
+
+    The counters are created with their poll book, so they are only updated
+    here. Inserting a missing counter would race with concurrent votes.
+    """
+    table = PollbookVoteCount.__table__
+    result = connection.execute(
+        table.update().where(
+            (table.c.pollbook_id == pollbook_id) &
+            (table.c.verified_status == verified_status)
+        ).values(votes=table.c.votes + votes))
+    if not result.rowcount:
+        logger.warning('Missing vote counter %s of pollbook %s, rebuild the '
+                       'vote counts', verified_status, pollbook_id)
+
+
+def _get_voter_status(connection, vote):
+    """Get the poll book and status of the voter of a vote."""
+    session = object_session(vote)
+    voter = session.identity_map.get(identity_key(Voter, vote.voter_id))
+    if voter is not None:
+        return voter.pollbook_id, get_status_name(
+            voter.self_added, voter.reviewed, voter.verified)
+    row = connection.execute(
+        select([Voter.pollbook_id,
+                Voter.self_added,
+                Voter.reviewed,
+                Voter.verified]).where(Voter.id == vote.voter_id)).first()
+    if row is None:
+        return None, None
+    return row[0], get_status_name(*row[1:])
+
+
+def _create_vote_counts(mapper, connection, target):
+    connection.execute(
+        PollbookVoteCount.__table__.insert(),
+        [{'pollbook_id': target.id, 'verified_status': status, 'votes': 0}
+         for status in VOTE_COUNT_STATUSES])
+
+
+def _count_vote(mapper, connection, target):
+    pollbook_id, status = _get_voter_status(connection, target)
+    if pollbook_id is not None:
+        add_to_vote_count(connection, pollbook_id, status, 1)
+
+
+def _uncount_vote(mapper, connection, target):
+    pollbook_id, status = _get_voter_status(connection, target)
+    if pollbook_id is not None:
+        add_to_vote_count(connection, pollbook_id, status, -1)
+
+
+def _move_vote(mapper, connection, target):
+    state = inspect(target)
+    old_values = {}
+    for attr in ('pollbook_id', 'self_added', 'reviewed', 'verified'):
+        history = state.attrs[attr].history
+        old_values[attr] = (history.deleted[0] if history.deleted
+                            else getattr(target, attr))
+    old_pollbook_id = old_values['pollbook_id']
+    old_status = get_status_name(old_values['self_added'],
+                                 old_values['reviewed'],
+                                 old_values['verified'])
+    new_status = get_status_name(target.self_added,
+                                 target.reviewed,
+                                 target.verified)
+    if (old_pollbook_id, old_status) == (target.pollbook_id, new_status):
+        return
+    has_vote = connection.execute(
+        select([Vote.voter_id]).where(Vote.voter_id == target.id)).first()
+    if has_vote:
+        add_to_vote_count(connection, old_pollbook_id, old_status, -1)
+        add_to_vote_count(connection, target.pollbook_id, new_status, 1)
+
+
+sqlalchemy.event.listen(Pollbook, 'after_insert', _create_vote_counts)
+sqlalchemy.event.listen(Vote, 'after_insert', _count_vote)
+sqlalchemy.event.listen(Vote, 'after_delete', _uncount_vote)
+sqlalchemy.event.listen(Voter, 'after_update', _move_vote)
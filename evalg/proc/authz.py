@@ -14,6 +14,7 @@ from evalg.models.authorization import (ElectionGroupRole,
 from evalg.models.person import PersonExternalId
 from evalg.models.authorization import PersonIdentifierPrincipal
 from evalg.proc.group import get_user_groups
+from evalg.proc.role_cache import get_cached_principals
 from evalg.utils import flask_request_memoize
 
 
@@ -50,8 +51,8 @@ def get_principals_for_group(session, group):
         GroupPrincipal.group_id == group.id).all()
 
 
-@flask_request_memoize
-def get_principals_for_person(session, person):
+def find_principals_for_person(session, person):
+    """Find the principals of a person, without using the cache."""
     principals = []
     if person.principal:
         principals.append(person.principal)
@@ -67,6 +68,12 @@ def get_principals_for_person(session, person):
     return [x for x in principals if x is not None]
 
 
+@flask_request_memoize
+def get_principals_for_person(session, person):
+    """Get the principals of a person, see evalg.proc.role_cache."""
+    return get_cached_principals(session, person, find_principals_for_person)
+
+
 def get_roles_for_person(session, person):
     principals = get_principals_for_person(session, person)
     roles = []
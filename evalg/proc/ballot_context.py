@@ -0,0 +1,128 @@
+"""
+Ballot validation contexts.
+
+A validation context holds what is needed to validate a ballot for an
+election: the candidate ids, the candidates of every list and the ballot
+rules. The contexts are cached per process, so that validating a ballot
+does not need any database queries.
+
+The cached context of an election is dropped when its candidates, lists or
+meta are changed in this process. Changes made by other processes are picked
+up when the context expires, after BALLOT_VALIDATION_CONTEXT_TTL seconds.
+"""
+import copy
+import logging
+import threading
+import time
+
+import sqlalchemy.event
+from flask import current_app
+
+from evalg.models.candidate import Candidate
+from evalg.models.election import Election
+from evalg.models.election_list import ElectionList
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 60
+
+
+class BallotValidationContext:
+    """Precomputed ballot validation data of an election."""
+
+    __slots__ = (
+        "election_id",
+        "ballot_rules",
+        "candidate_rules",
+        "list_candidates",
+        "candidate_ids",
+        "created_at",
+    )
+
+    def __init__(self, election):
+        """
+        :param election: The election
+        :type election: evalg.models.election.Election
+        """
+        meta = election.meta or {}
+        self.election_id = election.id
+        self.ballot_rules = copy.deepcopy(meta.get("ballot_rules", {}))
+        self.candidate_rules = copy.deepcopy(meta.get("candidate_rules", {}))
+        self.list_candidates = {
+            str(election_list.id): frozenset(
+                str(candidate.id) for candidate in election_list.candidates
+            )
+            for election_list in election.lists
+        }
+        self.candidate_ids = frozenset().union(*self.list_candidates.values())
+        self.created_at = time.monotonic()
+
+
+class BallotValidationContextCache:
+    """Process wide cache of ballot validation contexts, by election id."""
+
+    def __init__(self):
+        self._contexts = {}
+        self._lock = threading.Lock()
+
+    def get(self, session, election_id, ttl=DEFAULT_TTL):
+        """
+        Get the validation context of an election, building it if needed.
+
+        :param session: Session used to load the election on a cache miss
+        :param election_id: The election id
+        :param ttl: Maximum age of a cached context, in seconds
+
+        :rtype: BallotValidationContext
+        """
+        context = self._contexts.get(str(election_id))
+        if context is not None and time.monotonic() - context.created_at < ttl:
+            return context
+        election = session.query(Election).get(election_id)
+        if election is None:
+            return None
+        context = BallotValidationContext(election)
+        with self._lock:
+            self._contexts[str(election_id)] = context
+        logger.debug("Built ballot validation context for election %s", election_id)
+        return context
+
+    def invalidate(self, election_id=None):
+        """
+        Drop cached contexts.
+
+        :param election_id: Only drop the context of this election
+        """
+        with self._lock:
+            if election_id is None:
+                self._contexts.clear()
+            else:
+                self._contexts.pop(str(election_id), None)
+
+
+validation_contexts = BallotValidationContextCache()
+
+
+def get_validation_context(session, election_id):
+    """Get the cached validation context of an election."""
+    ttl = current_app.config.get("BALLOT_VALIDATION_CONTEXT_TTL", DEFAULT_TTL)
+    return validation_contexts.get(session, election_id, ttl=ttl)
+
+
+def _invalidate_election(mapper, connection, target):
+    validation_contexts.invalidate(target.id)
+
+
+def _invalidate_list(mapper, connection, target):
+    validation_contexts.invalidate(target.election_id)
+
+
+def _invalidate_all(mapper, connection, target):
+    # the election of a candidate is not known without loading its list
+    validation_contexts.invalidate()
+
+
+for _event in ("after_insert", "after_update", "after_delete"):
+    sqlalchemy.event.listen(Election, _event, _invalidate_election)
+    sqlalchemy.event.listen(ElectionList, _event, _invalidate_list)
+    sqlalchemy.event.listen(Candidate, _event, _invalidate_all)
@@ -6,6 +6,7 @@ from flask_allows import wants_request
 
 from evalg.models.voter import Voter
 from evalg.models.election_list import ElectionList
+from evalg.proc.ballot_context import get_validation_context, validation_contexts
 
 
 logger = logging.getLogger(__name__)
@@ -40,6 +41,7 @@ class AbstractBallotVerifier(ABC):
         self.session = session
         self.voter = voter
         self.election = voter.pollbook.election
+        self.context = get_validation_context(session, voter.pollbook.election_id)
 
     @abstractmethod
     def validate_ballot(self, ballot_data: dict):
@@ -54,9 +56,9 @@ class ListBallotVerifier(AbstractBallotVerifier):
                 logger.info("Found blank vote!")
                 self.validate_blank_vote(ballot_data)
             else:
-                selected_list = self.validate_selected_list(ballot_data)
-                self.validate_selected_list_candidates(ballot_data, selected_list)
-                self.validate_other_candidates(ballot_data, selected_list)
+                selected_list_id = self.validate_selected_list(ballot_data)
+                self.validate_selected_list_candidates(ballot_data, selected_list_id)
+                self.validate_other_candidates(ballot_data, selected_list_id)
         except BallotVerificationException as e:
             logger.warning(
                 "Ballot verification failed, possible suspect ballot. "
@@ -129,29 +131,35 @@ class ListBallotVerifier(AbstractBallotVerifier):
                 "Blank ballot contains votes for selected list"
             )
 
-    def validate_selected_list(self, ballot_data: dict) -> ElectionList:
+    def validate_selected_list(self, ballot_data: dict) -> str:
         """
         Validates the selected list, check that is exists and that it belong
         to the current election.
+
+        Returns the id of the selected list.
         """
-        if not ballot_data["chosenListId"]:
+        selected_list_id = ballot_data["chosenListId"]
+        if not selected_list_id:
             raise BallotVerificationException("No election list selected in list")
-        selected_list: ElectionList = ElectionList.query.get(
-            ballot_data["chosenListId"]
-        )
+        if selected_list_id in self.context.list_candidates:
+            return str(selected_list_id)
+
+        # Only invalid ballots, or a stale context, get here
+        selected_list: ElectionList = ElectionList.query.get(selected_list_id)
         if not selected_list:
             raise BallotVerificationException(
-                f"Selected list does not exist. selected_list: {ballot_data['chosenListId']}",
+                f"Selected list does not exist. selected_list: {selected_list_id}",
             )
         if selected_list.election.id != self.election.id:
             raise SuspiciousBallotException(
-                f"Selected list belongs to another election. selected_list: {ballot_data['chosenListId']}",
+                f"Selected list belongs to another election. selected_list: {selected_list_id}",
             )
-
-        return selected_list
+        validation_contexts.invalidate(self.election.id)
+        self.context = get_validation_context(self.session, self.election.id)
+        return str(selected_list_id)
 
     def validate_selected_list_candidates(
-        self, ballot_data: dict, selected_list: ElectionList
+        self, ballot_data: dict, selected_list_id: str
     ):
         """
         Validates the selected list and candidates from it.
@@ -170,14 +178,14 @@ class ListBallotVerifier(AbstractBallotVerifier):
             )
 
         # Check that all candidates are from the selected list
-        candidates_ids = [str(x.id) for x in selected_list.candidates]
+        candidates_ids = self.context.list_candidates[selected_list_id]
         for candidate in ballot_data["personalVotesSameParty"]:
             if candidate["candidate"] not in candidates_ids:
                 raise SuspiciousBallotException(
                     f"Personal party candidate not in election list, {candidate['candidate']}"
                 )
 
-    def validate_other_candidates(self, ballot_data, selected_list: ElectionList):
+    def validate_other_candidates(self, ballot_data, selected_list_id: str):
         """
         Validates the other lists candidates.
 
@@ -196,12 +204,8 @@ class ListBallotVerifier(AbstractBallotVerifier):
                 f"Ballot contain duplicate votes in personalVotesOtherParty"
             )
 
-        selected_list_candidates_ids = [str(x.id) for x in selected_list.candidates]
-        valid_other_list_candidates = {
-            str(x.id): [str(y.id) for y in x.candidates]
-            for x in self.election.lists
-            if x != selected_list
-        }
+        list_candidates = self.context.list_candidates
+        selected_list_candidates_ids = list_candidates[selected_list_id]
 
         for candidate in ballot_data["personalVotesOtherParty"]:
             if candidate["candidate"] in selected_list_candidates_ids:
@@ -209,16 +213,16 @@ class ListBallotVerifier(AbstractBallotVerifier):
                     f"Candidate from selected list in other candidates, {candidate['candidate']}"
                 )
 
-            if candidate["list"] not in valid_other_list_candidates.keys():
+            if (
+                candidate["list"] == selected_list_id
+                or candidate["list"] not in list_candidates
+            ):
                 raise SuspiciousBallotException(
                     "Other candidate list does not exist in election, "
                     f"list: {candidate['list']} candidate: {candidate['candidate']}"
                 )
 
-            if (
-                candidate["candidate"]
-                not in valid_other_list_candidates[candidate["list"]]
-            ):
+            if candidate["candidate"] not in list_candidates[candidate["list"]]:
                 raise SuspiciousBallotException(
                     f"Other candidate does not exist in election, candidate:{candidate['candidate']}"
                 )
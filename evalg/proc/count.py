@@ -1,9 +1,21 @@
 """Module for pre processing data and initiating count"""
+import collections
+import concurrent.futures
+import contextlib
 import logging
 import datetime
 import decimal
+import itertools
+import multiprocessing
+import pickle
+import resource
+import time
+import types
+from typing import Any, Dict
 
 import nacl.exceptions
+import nacl.public
+from nacl.encoding import Base64Encoder
 
 from flask import current_app
 
@@ -15,75 +27,250 @@ import evalg.database.query
 from evalg.models.ballot import Envelope
 from evalg.models.votes import Vote
 from evalg.models.election_result import ElectionResult
-from evalg.models.election_group_count import ElectionGroupCount
+from evalg.models.election_group_count import (
+    COUNT_METRIC_PHASES,
+    ElectionGroupCount,
+)
 from evalg.models.voter import Voter
-from evalg.proc.pollbook import get_verified_voters_count
-from evalg.ballot_serializer.base64_nacl import Base64NaClSerializer
+from evalg.proc.pollbook import get_verified_voters_counts
+from evalg.ballot_serializer.ballot_serializer_base import (
+    init_deserialize_worker,
+)
+from evalg.ballot_serializer.factory import SERIALIZERS, get_serializer
 from evalg.counting.algorithms import party_list, uitstv, positional_voting
 from evalg.counting.count import Counter
 
 logger = logging.getLogger(__name__)
 
 
-class ListBallot:
-    def __init__(self, ballot_data, id2pollbook, id2list, id2candidate):
-        self.ballot_data = ballot_data
-        self.pollbook = id2pollbook[ballot_data["pollbookId"]]
+class BallotIndex:
+    """
+    Index of the pollbooks, candidates and lists ballots can refer to
+
+    Ballots store positions in this index instead of references to the
+    database objects, and share equal rankings and ballot layouts through
+    it.
+    """
+
+    def __init__(self, id2pollbook, id2candidate, id2list=None):
+        """
+        :param id2pollbook: Pollbooks by their id string
+        :type id2pollbook: dict
+
+        :param id2candidate: Candidates by their id string
+        :type id2candidate: dict
+
+        :param id2list: Election lists by their id string
+        :type id2list: dict
+        """
+        id2list = id2list or {}
+        self.pollbook_ids = tuple(id2pollbook)
+        self.pollbooks = tuple(id2pollbook.values())
+        self.candidate_ids = tuple(id2candidate)
+        self.candidates = tuple(id2candidate.values())
+        self.list_ids = tuple(id2list)
+        self.lists = tuple(id2list.values())
+        self.pollbook_index = {id_: i for i, id_ in enumerate(self.pollbook_ids)}
+        self.candidate_index = {id_: i for i, id_ in enumerate(self.candidate_ids)}
+        self.list_index = {id_: i for i, id_ in enumerate(self.list_ids)}
+        self._rankings = {}
+        self._layouts = {}
+
+    def get_ranking(self, candidate_ids):
+        """Get the shared tuple of candidate indices for a ranking."""
+        ranking = tuple(self.candidate_index[id_] for id_ in candidate_ids)
+        return self._rankings.setdefault(ranking, ranking)
+
+    def get_layout(self, ballot_data, fields):
+        """
+        Get the shared layout of a ballot.
+
+        The layout is the ballot data as (key, value) pairs, with the values
+        of `fields` left out. These are stored as indices by the ballot.
+        """
+        layout = tuple(
+            (key, None if key in fields else value)
+            for key, value in ballot_data.items()
+        )
+        try:
+            # True == 1, so the value types must be part of the key
+            key = (layout, tuple(type(value) for _, value in layout))
+            return self._layouts.setdefault(key, layout)
+        except TypeError:
+            # unhashable values, e.g. lists, cannot be shared
+            return layout
+
+
+class ListBallot(tuple):
+    """
+    An immutable list election ballot
+
+    A tuple of the ballot index, the pollbook index, the chosen list index,
+    the personal votes for candidates on the chosen list as (candidate
+    index, cumulated) pairs, the personal votes for candidates on other
+    lists as (candidate index, list index) pairs, and the ballot layout.
+    """
+
+    __slots__ = ()
+
+    _fields = ("pollbookId", "personalVotesSameParty", "personalVotesOtherParty")
+
+    def __new__(cls, index, pollbook, chosen_list, votes_same, votes_other, layout):
+        return tuple.__new__(
+            cls, (index, pollbook, chosen_list, votes_same, votes_other, layout)
+        )
+
+    @classmethod
+    def from_ballot_data(cls, ballot_data, index):
+        fields = cls._fields
+        chosen_list = None
         if ballot_data["chosenListId"]:
-            self.chosen_list = id2list[ballot_data["chosenListId"]]
-        else:
-            self.chosen_list = None
+            chosen_list = index.list_index[ballot_data["chosenListId"]]
+            fields += ("chosenListId",)
+        return cls(
+            index,
+            index.pollbook_index[ballot_data["pollbookId"]],
+            chosen_list,
+            tuple(
+                (index.candidate_index[vote["candidate"]], vote["cumulated"])
+                for vote in ballot_data["personalVotesSameParty"]
+            ),
+            tuple(
+                (index.candidate_index[vote["candidate"]], index.list_index[vote["list"]])
+                for vote in ballot_data["personalVotesOtherParty"]
+            ),
+            index.get_layout(ballot_data, fields),
+        )
 
-        self.personal_votes_same = [
-            {
-                "candidate": id2candidate[vote["candidate"]],
-                "cumulated": vote["cumulated"],
-            }
-            for vote in ballot_data["personalVotesSameParty"]
+    @property
+    def pollbook(self):
+        return self[0].pollbooks[self[1]]
+
+    @property
+    def chosen_list(self):
+        if self[2] is None:
+            return None
+        return self[0].lists[self[2]]
+
+    @property
+    def personal_votes_same(self):
+        candidates = self[0].candidates
+        return [
+            {"candidate": candidates[candidate], "cumulated": cumulated}
+            for candidate, cumulated in self[3]
+        ]
+
+    @property
+    def personal_votes_other(self):
+        candidates = self[0].candidates
+        lists = self[0].lists
+        return [
+            {"candidate": candidates[candidate], "list": lists[election_list]}
+            for candidate, election_list in self[4]
         ]
 
-        self.personal_votes_other = [
+    @property
+    def candidates(self):
+        """
+        Non-empty for ballots with a chosen list.
+
+        get_counting_ballots() and get_empty_ballots() tell blank ballots
+        by their candidates.
+        """
+        return (1,) if self[2] is not None else ()
+
+    @property
+    def ballot_data(self):
+        """The decrypted ballot data, as stored in the election result."""
+        index, pollbook, chosen_list, votes_same, votes_other, layout = self
+        ballot_data = dict(layout)
+        ballot_data["pollbookId"] = index.pollbook_ids[pollbook]
+        if chosen_list is not None:
+            ballot_data["chosenListId"] = index.list_ids[chosen_list]
+        ballot_data["personalVotesSameParty"] = [
+            {"candidate": index.candidate_ids[candidate], "cumulated": cumulated}
+            for candidate, cumulated in votes_same
+        ]
+        ballot_data["personalVotesOtherParty"] = [
             {
-                "candidate": id2candidate[vote["candidate"]],
-                "list": id2list[vote["list"]],
+                "candidate": index.candidate_ids[candidate],
+                "list": index.list_ids[election_list],
             }
-            for vote in ballot_data["personalVotesOtherParty"]
+            for candidate, election_list in votes_other
         ]
-
-        # TODO dette er en hack for å få get_counting_ballots til åfunke
-        self.candidates = [1] if self.chosen_list else []
+        return ballot_data
 
     @property
     def raw_string(self):
+        index = self[0]
         return " ".join(
-            [str(self.pollbook.id)]
-            + [str(self.chosen_list.id)]
-            + [str(candidate["id"]) for candidate in self.personal_votes_same]
+            [index.pollbook_ids[self[1]]]
+            + ([index.list_ids[self[2]]] if self[2] is not None else [])
+            + [index.candidate_ids[candidate] for candidate, _ in self[3]]
             + ["other list:"]
-            + [str(candidate["id"]) for candidate in self.personal_votes_other]
+            + [index.candidate_ids[candidate] for candidate, _ in self[4]]
+        )
+
+
+class Ballot(tuple):
+    """
+    An immutable preferential ballot
+
+    A tuple of the ballot index, the pollbook index, the ranked candidate
+    indices and the ballot layout.
+    """
+
+    __slots__ = ()
+
+    _fields = ("pollbookId", "rankedCandidateIds")
+
+    def __new__(cls, index, pollbook, ranking, layout):
+        return tuple.__new__(cls, (index, pollbook, ranking, layout))
+
+    @classmethod
+    def from_ballot_data(cls, ballot_data, index):
+        return cls(
+            index,
+            index.pollbook_index[ballot_data["pollbookId"]],
+            index.get_ranking(ballot_data["rankedCandidateIds"]),
+            index.get_layout(ballot_data, cls._fields),
         )
 
+    @property
+    def pollbook(self):
+        return self[0].pollbooks[self[1]]
+
+    @property
+    def candidates(self):
+        candidates = self[0].candidates
+        return tuple(candidates[candidate] for candidate in self[2])
 
-class Ballot:
-    def __init__(self, ballot_data, id2pollbook, id2candidate):
-        self.ballot_data = ballot_data
-        self.pollbook = id2pollbook[ballot_data["pollbookId"]]
-        self.candidates = [id2candidate[id] for id in ballot_data["rankedCandidateIds"]]
+    @property
+    def ballot_data(self):
+        """The decrypted ballot data, as stored in the election result."""
+        index, pollbook, ranking, layout = self
+        ballot_data = dict(layout)
+        ballot_data["pollbookId"] = index.pollbook_ids[pollbook]
+        ballot_data["rankedCandidateIds"] = [
+            index.candidate_ids[candidate] for candidate in ranking
+        ]
+        return ballot_data
 
     @property
     def raw_string(self):
+        index = self[0]
         return " ".join(
-            [str(self.pollbook.id)]
-            + [str(candidate.id) for candidate in self.candidates]
+            [index.pollbook_ids[self[1]]]
+            + [index.candidate_ids[candidate] for candidate in self[2]]
         )
 
 
 def get_counting_ballots(ballots):
-    return list(filter(lambda ballot: ballot.candidates != [], ballots))
+    return [ballot for ballot in ballots if ballot.candidates]
 
 
 def get_empty_ballots(ballots):
-    return list(filter(lambda ballot: ballot.candidates == [], ballots))
+    return [ballot for ballot in ballots if not ballot.candidates]
 
 
 def get_weight_per_vote(pollbook):
@@ -119,6 +306,287 @@ def set_weight_per_pollbooks(pollbooks):
         pollbook.scale_factor = decimal.Decimal(1) / min_wpv
 
 
+def seal_election_key(election_key, backend_public_key):
+    """
+    Encrypt an election key so that only the backend can read it.
+
+    Used to avoid passing the election private key in clear text through the
+    task queue when counting asynchronously.
+    """
+    box = nacl.public.SealedBox(
+        nacl.public.PublicKey(backend_public_key, encoder=Base64Encoder)
+    )
+    return box.encrypt(election_key.encode("utf-8"), encoder=Base64Encoder).decode(
+        "ascii"
+    )
+
+
+def unseal_election_key(sealed_election_key, backend_private_key):
+    """Decrypt an election key encrypted by seal_election_key()."""
+    box = nacl.public.SealedBox(
+        nacl.public.PrivateKey(backend_private_key, encoder=Base64Encoder)
+    )
+    return box.decrypt(
+        sealed_election_key.encode("ascii"), encoder=Base64Encoder
+    ).decode("utf-8")
+
+
+def _init_decrypt_worker(serializer_args):
+    """Create the serializers of a ballot decryption worker."""
+    init_deserialize_worker(
+        *(
+            get_serializer(envelope_type, **serializer_args)
+            for envelope_type in SERIALIZERS
+        )
+    )
+
+
+class BallotDecrypter:
+    """
+    Decrypts and deserializes envelope data, optionally in a worker pool.
+
+    With ``processes`` set to 0 or 1 all ballots are decrypted serially using
+    the given serializer. Otherwise the envelope data is split into chunks of
+    ``chunk_size`` and decrypted by a pool of worker processes. The workers
+    create their serializers from ``serializer_args`` when they are started,
+    so that only the envelope data is sent with every chunk. The order of
+    the returned ballots always matches the order of the envelope data.
+
+    Envelope data of other envelope types than the one of the given
+    serializer are deserialized by serializers from the serializer factory.
+
+    The decrypter should be used as a context manager, so that the worker
+    pool is shut down when the count is done.
+    """
+
+    def __init__(self, ballot_serializer, serializer_args,
+                 processes=0, chunk_size=1000):
+        """
+        :param ballot_serializer: Serializer of the configured envelope type
+        :type ballot_serializer: BallotSerializerBase
+
+        :param serializer_args: Arguments used to create serializers for
+                                other envelope types
+        :type serializer_args: dict
+
+        :param processes: Number of worker processes
+        :type processes: int
+
+        :param chunk_size: Number of envelopes per worker job
+        :type chunk_size: int
+        """
+        self.ballot_serializer = ballot_serializer
+        self.serializer_args = serializer_args
+        self._serializers = {ballot_serializer.envelope_type: ballot_serializer}
+        self.processes = int(processes or 0)
+        self.chunk_size = max(int(chunk_size or 1), 1)
+        self._executor = None
+
+    def __enter__(self):
+        if self.processes > 1 and multiprocessing.current_process().daemon:
+            # e.g. a Celery worker, which may not start child processes
+            logger.info("Decrypting ballots serially in a daemonic process")
+        elif self.processes > 1:
+            try:
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    initializer=_init_decrypt_worker,
+                    initargs=(self.serializer_args,),
+                )
+            except (OSError, ValueError) as e:
+                logger.warning(
+                    "Unable to start ballot decryption pool, "
+                    "falling back to serial decryption: %s",
+                    e,
+                )
+                self._executor = None
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._executor:
+            self._executor.shutdown()
+            self._executor = None
+
+    def get_serializer(self, envelope_type):
+        """Get the serializer of an envelope type."""
+        if envelope_type not in self._serializers:
+            self._serializers[envelope_type] = get_serializer(
+                envelope_type, **self.serializer_args
+            )
+        return self._serializers[envelope_type]
+
+    def decrypt_serial(self, envelope_data, envelope_type=None):
+        serializer = self.ballot_serializer
+        if envelope_type is not None:
+            serializer = self.get_serializer(envelope_type)
+        return list(serializer.deserialize_many(envelope_data,
+                                                chunk_size=self.chunk_size))
+
+    def decrypt(self, envelope_data, envelope_type=None):
+        """
+        Decrypt and deserialize a list of envelope data.
+
+        :param envelope_data: The serialized ballots
+        :type envelope_data: list
+
+        :param envelope_type: The envelope type of the serialized ballots,
+                              if not the one of the ballot serializer
+        :type envelope_type: str
+
+        :return: The deserialized ballots, in the same order
+        :rtype: list
+        """
+        envelope_data = [bytes(data) for data in envelope_data]
+        if not self._executor or len(envelope_data) <= self.chunk_size:
+            return self.decrypt_serial(envelope_data, envelope_type)
+
+        serializer = self.ballot_serializer
+        if envelope_type is not None:
+            serializer = self.get_serializer(envelope_type)
+        start = time.monotonic()
+        try:
+            ballots = list(serializer.deserialize_many(
+                envelope_data,
+                executor=self._executor,
+                chunk_size=self.chunk_size,
+            ))
+        except concurrent.futures.process.BrokenProcessPool as e:
+            logger.warning(
+                "Ballot decryption pool failed, "
+                "falling back to serial decryption: %s",
+                e,
+            )
+            self._executor = None
+            return self.decrypt_serial(envelope_data, envelope_type)
+        logger.debug(
+            "Decrypted %d ballots in worker pool in %.3fs",
+            len(ballots),
+            time.monotonic() - start,
+        )
+        return ballots
+
+    def decrypt_envelopes(self, envelopes):
+        """
+        Decrypt and deserialize envelopes of any envelope type.
+
+        :param envelopes: (envelope_type, ballot_data) pairs
+        :type envelopes: list
+
+        :return: The deserialized ballots, in the same order
+        :rtype: list
+        """
+        positions = collections.defaultdict(list)
+        for i, (envelope_type, _) in enumerate(envelopes):
+            positions[envelope_type].append(i)
+        ballots = [None] * len(envelopes)
+        for envelope_type, indexes in positions.items():
+            envelope_data = [envelopes[i][1] for i in indexes]
+            for i, ballot in zip(indexes,
+                                 self.decrypt(envelope_data, envelope_type)):
+                ballots[i] = ballot
+        return ballots
+
+
+def get_memory_usage():
+    """
+    Get the current memory usage of this process.
+
+    Unlike the peak usage (ru_maxrss), which never goes down in a long-lived
+    worker, the current usage can be compared before and after a phase.
+
+    :return: Resident set size in KiB, or None if unknown
+    :rtype: int
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * resource.getpagesize() // 1024
+
+
+class CountMetrics:
+    """
+    Timing, ballot counts and memory growth of a count, per election
+
+    The time spent in each of the COUNT_METRIC_PHASES is summed up per
+    election, in seconds. The memory growth of an election is the growth of
+    the process' resident set size from fetching its first ballots until its
+    protocol is made, in KiB. to_dict() gives the totals for the count, as
+    stored in ElectionGroupCount.metrics.
+    """
+
+    def __init__(self):
+        self.elections = {}
+        self._memory_usage = {}
+
+    def get_election(self, election_id):
+        """Get the metrics of an election."""
+        return self.elections.setdefault(
+            str(election_id),
+            {"phases": {}, "ballots_count": 0, "memory_growth_kib": None},
+        )
+
+    def set_election(self, election_id, metrics):
+        """Set the metrics of an election, e.g. from a worker process."""
+        self.elections[str(election_id)] = metrics
+
+    @contextlib.contextmanager
+    def timer(self, election_id, phase):
+        """Time a phase of an election count, adding to previous runs."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            phases = self.get_election(election_id)["phases"]
+            phases[phase] = phases.get(phase, 0) + time.monotonic() - start
+
+    def set_ballots_count(self, election_id, ballots_count):
+        self.get_election(election_id)["ballots_count"] = ballots_count
+
+    def start_memory_growth(self, election_id):
+        """Record the memory usage before counting an election."""
+        self._memory_usage[str(election_id)] = get_memory_usage()
+
+    def set_memory_growth(self, election_id):
+        """Record the memory growth after counting an election."""
+        start = self._memory_usage.pop(str(election_id), None)
+        end = get_memory_usage()
+        if start is not None and end is not None:
+            self.get_election(election_id)["memory_growth_kib"] = end - start
+
+    def to_dict(self):
+        phases = collections.Counter()
+        for metrics in self.elections.values():
+            phases.update(metrics["phases"])
+        memory_growth = [
+            metrics["memory_growth_kib"]
+            for metrics in self.elections.values()
+            if metrics["memory_growth_kib"] is not None
+        ]
+        return {
+            "phases": {
+                phase: round(phases[phase], 3)
+                for phase in COUNT_METRIC_PHASES
+                if phase in phases
+            },
+            "ballots_count": sum(
+                metrics["ballots_count"] for metrics in self.elections.values()
+            ),
+            "memory_growth_kib": sum(memory_growth) if memory_growth else None,
+            "elections": {
+                election_id: dict(
+                    metrics,
+                    phases={
+                        phase: round(seconds, 3)
+                        for phase, seconds in metrics["phases"].items()
+                    },
+                )
+                for election_id, metrics in self.elections.items()
+            },
+        }
+
+
 class ElectionGroupCounter:
     """The election-group counter class"""
 
@@ -142,10 +610,21 @@ class ElectionGroupCounter:
         self.group_id = group_id
         self.test_mode = test_mode
         self.group = session.query(evalg.models.election.ElectionGroup).get(group_id)
-        self.ballot_serializer = self._init_ballot_serializer(election_key)
+        self.serializer_args = dict(
+            election_private_key=election_key,
+            election_public_key=self.group.public_key,
+            backend_private_key=self.app_config.get("BACKEND_PRIVATE_KEY"),
+            backend_public_key=self.app_config.get("BACKEND_PUBLIC_KEY"),
+            envelope_padded_len=self.app_config.get("ENVELOPE_PADDED_LEN"),
+        )
+        self.ballot_serializer = self._init_ballot_serializer()
         self.id2candidate = self._init_id2candidate()
         self.id2pollbook = self._init_id2pollbook()
         self.id2list = self._init_id2list()
+        self.ballot_index = BallotIndex(
+            self.id2pollbook, self.id2candidate, self.id2list
+        )
+        self.metrics = CountMetrics()
 
     def _init_id2candidate(self):
         id2candidate = {}
@@ -168,14 +647,10 @@ class ElectionGroupCounter:
                 id2list[str(election_list.id)] = election_list
         return id2list
 
-    def _init_ballot_serializer(self, election_key):
+    def _init_ballot_serializer(self):
         try:
-            ballot_serializer = Base64NaClSerializer(
-                election_private_key=election_key,
-                election_public_key=self.group.public_key,
-                backend_private_key=self.app_config.get("BACKEND_PRIVATE_KEY"),
-                backend_public_key=self.app_config.get("BACKEND_PUBLIC_KEY"),
-                envelope_padded_len=self.app_config.get("ENVELOPE_PADDED_LEN"),
+            ballot_serializer = get_serializer(
+                self.app_config.get("ENVELOPE_TYPE"), **self.serializer_args
             )
         except Exception as e:
             logger.error(e)
@@ -199,116 +674,465 @@ class ElectionGroupCounter:
         db_row = ElectionGroupCount(
             group_id=self.group_id,
             initiated_at=utc_now,
+            phase="queued",
+            progress=0,
         )
         self.session.add(db_row)
         self.session.commit()
         return db_row
 
+    def log_count_phase(self, db_row, phase, progress=None):
+        """
+        Record the current phase and progress of a count.
+
+        :param db_row: The election group count
+        :type db_row: evalg.models.election_group_count.ElectionGroupCount
+
+        :param phase: One of the COUNT_PHASES
+        :type phase: str
+
+        :param progress: Progress in percent, if changed
+        :type progress: int
+        """
+        db_row.phase = phase
+        if progress is not None:
+            db_row.progress = progress
+        db_row.metrics = self.metrics.to_dict()
+        self.session.add(db_row)
+        self.session.commit()
+        return db_row
+
     def log_finalize_count(self, db_row):
         utc_now = datetime.datetime.now(datetime.timezone.utc)
         db_row.finished_at = utc_now
+        db_row.phase = "finished"
+        db_row.progress = 100
+        db_row.metrics = self.metrics.to_dict()
 
         self.session.add(db_row)
         self.session.commit()
         return db_row
 
-    def get_ballots_query(self, pollbook_id):
+    def count(self, db_row, counted_by=None):
+        """
+        Run all phases of a count, and store the results.
+
+        If the count fails, it is marked as failed before the exception is
+        re-raised.
+
+        :param db_row: The election group count, from log_start_count()
+        :type db_row: evalg.models.election_group_count.ElectionGroupCount
+
+        :param counted_by: Name of the one who triggered the count
+        :type counted_by: str
+        """
+        processes = int(self.app_config.get("COUNT_ELECTION_PROCESSES") or 0)
+        if multiprocessing.current_process().daemon:
+            # e.g. a Celery worker, which may not start child processes
+            processes = 0
+        try:
+            if processes > 1 and len(self.get_closed_elections()) > 1:
+                self.generate_results_parallel(db_row, processes, counted_by)
+            else:
+                self.log_count_phase(db_row, "decrypt", 0)
+                self.deserialize_ballots()
+                self.process_for_count()
+                self.generate_results(db_row, counted_by)
+        except Exception:
+            self.session.rollback()
+            self.log_count_phase(db_row, "failed")
+            raise
+        return self.log_finalize_count(db_row)
+
+    def get_ballot_decrypter(self):
+        """
+        Get a ballot decrypter, configured by the app config.
+
+        COUNT_DECRYPT_PROCESSES decides the number of decryption worker
+        processes. If not set, the ballots are decrypted serially.
+        """
+        return BallotDecrypter(
+            self.ballot_serializer,
+            self.serializer_args,
+            processes=self.app_config.get("COUNT_DECRYPT_PROCESSES", 0),
+            chunk_size=self.app_config.get("COUNT_DECRYPT_CHUNK_SIZE", 1000),
+        )
+
+    def get_closed_elections(self):
+        return [
+            election
+            for election in self.group.elections
+            if election.status == "closed"
+        ]
+
+    def deserialize_ballots(self, elections=None):
+        """
+        Decrypt the ballots of the closed elections in the group.
+
+        :param elections: Only decrypt ballots for these elections
+        :type elections: list
+        """
+        if elections is None:
+            elections = self.get_closed_elections()
+        with self.get_ballot_decrypter() as decrypter:
+            self._deserialize_ballots(decrypter, elections)
+
+    def get_election_ballots_query(self, election):
+        """
+        Get the verified envelopes of all pollbooks in an election.
+
+        The query returns (pollbook_id, envelope_type, ballot_data) rows, so
+        that the ballots of every pollbook can be fetched in a single query.
+        """
         query = (
-            self.session.query(Envelope)
+            self.session.query(
+                Voter.pollbook_id, Envelope.envelope_type, Envelope.ballot_data
+            )
             .join(Vote, and_(Vote.ballot_id == Envelope.id))
             .join(Voter, and_(Voter.id == Vote.voter_id))
-            .filter(Voter.pollbook_id == pollbook_id, Voter.verified == True)
+            .filter(
+                Voter.pollbook_id.in_([pollbook.id for pollbook in election.pollbooks]),
+                Voter.verified == True,
+            )
         )
         return query
 
-    def deserialize_ballots(self):
-        for election in self.group.elections:
-            if election.status == "closed":
-                election.ballots = []
-                for pollbook in election.pollbooks:
-                    pollbook.ballots = []
-                    envelopes = self.get_ballots_query(pollbook.id).all()
-                    for envelope in envelopes:
-                        ballot_data = self.ballot_serializer.deserialize(
-                            envelope.ballot_data
-                        )
-                        if election.type_str in ("sainte_lague", "uio_sainte_lague"):
-                            ballot = ListBallot(
-                                ballot_data,
-                                self.id2pollbook,
-                                self.id2list,
-                                self.id2candidate,
-                            )
-                        else:
-                            ballot = Ballot(
-                                ballot_data, self.id2pollbook, self.id2candidate
-                            )
-                        pollbook.ballots.append(ballot)
-
-    def process_for_count(self):
-        for election in self.group.elections:
-            if election.status == "closed":
-                for pollbook in election.pollbooks:
-                    set_pollbook_stats(pollbook)
-                set_weight_per_pollbooks(election.pollbooks)
-
-                election.ballots = []
-                election.total_amount_ballots = 0
-                election.total_amount_empty_ballots = 0
-                election.total_amount_counting_ballots = 0
-
-                for pollbook in election.pollbooks:
-                    election.total_amount_ballots += pollbook.ballots_count
-                    election.total_amount_empty_ballots += pollbook.empty_ballots_count
-                    election.total_amount_counting_ballots += (
-                        pollbook.counting_ballots_count
+    def get_ballot_data_batches(self, election, batch_size=0):
+        """
+        Get the envelope data of the verified ballots in an election.
+
+        If a batch size is given, the envelopes are read through a server
+        side cursor and yielded in lists of at most ``batch_size`` elements,
+        so that only one batch of ciphertext is kept in memory at a time.
+        Otherwise all envelopes are read and yielded as a single list.
+
+        :param election: The election
+        :type election: evalg.models.election.Election
+
+        :param batch_size: Number of envelopes per batch
+        :type batch_size: int
+
+        :return: Lists of (pollbook_id, envelope_type, ballot_data) tuples
+        :rtype: generator
+        """
+        query = self.get_election_ballots_query(election)
+        if not batch_size:
+            yield [tuple(row) for row in query]
+            return
+
+        rows = iter(query.yield_per(batch_size))
+        while True:
+            batch = [tuple(row) for row in itertools.islice(rows, batch_size)]
+            if not batch:
+                return
+            yield batch
+
+    def _make_ballot(self, election, ballot_data):
+        if election.type_str in ("sainte_lague", "uio_sainte_lague"):
+            return ListBallot.from_ballot_data(ballot_data, self.ballot_index)
+        return Ballot.from_ballot_data(ballot_data, self.ballot_index)
+
+    def _deserialize_ballots(self, decrypter, elections):
+        batch_size = self.app_config.get("COUNT_ENVELOPE_BATCH_SIZE", 0)
+        for election in elections:
+            election.ballots = []
+            for pollbook in election.pollbooks:
+                pollbook.ballots = []
+            start = time.monotonic()
+            self.metrics.start_memory_growth(election.id)
+            nr_of_ballots = 0
+            batches = self.get_ballot_data_batches(election, batch_size)
+            while True:
+                with self.metrics.timer(election.id, "fetch"):
+                    batch = next(batches, None)
+                if batch is None:
+                    break
+                with self.metrics.timer(election.id, "decrypt"):
+                    ballots_data = decrypter.decrypt_envelopes(
+                        [(envelope_type, data) for _, envelope_type, data in batch]
                     )
-                    election.ballots.extend(pollbook.ballots)
+                with self.metrics.timer(election.id, "build"):
+                    for (pollbook_id, *_), ballot_data in zip(batch, ballots_data):
+                        pollbook = self.id2pollbook[str(pollbook_id)]
+                        pollbook.ballots.append(
+                            self._make_ballot(election, ballot_data)
+                        )
+                nr_of_ballots += len(ballots_data)
+            self.metrics.set_ballots_count(election.id, nr_of_ballots)
+            logger.info(
+                "Decrypted %d ballots for election %s in %.3fs",
+                nr_of_ballots,
+                election.id,
+                time.monotonic() - start,
+            )
 
-    def generate_results(self, count, counted_by=None):
-        for election in self.group.elections:
-            if election.status == "closed":
-                if election.type_str in ("sainte_lague", "uio_sainte_lague"):
-                    result, protocol = party_list.get_result(election)
-                    election_protocol_dict = protocol.to_dict()
-                elif election.type_str == "uit_stv":
-                    result, protocol = uitstv.get_result(election)
-                    election_protocol_dict = protocol.to_dict()
-                elif election.type_str == "positional_voting":
-                    result, protocol = positional_voting.get_result(election)
-                    election_protocol_dict = protocol.to_dict()
-                else:
-                    counter = Counter(
-                        election, election.ballots, test_mode=self.test_mode
+    def process_for_count(self, elections=None):
+        """
+        Set the ballot and weight statistics needed to count the elections.
+
+        :param elections: Only process these elections
+        :type elections: list
+        """
+        if elections is None:
+            elections = self.get_closed_elections()
+        for election in elections:
+            with self.metrics.timer(election.id, "build"):
+                self._process_election_for_count(election)
+
+    def _process_election_for_count(self, election):
+        for pollbook in election.pollbooks:
+            set_pollbook_stats(pollbook)
+        set_weight_per_pollbooks(election.pollbooks)
+
+        election.ballots = []
+        election.total_amount_ballots = 0
+        election.total_amount_empty_ballots = 0
+        election.total_amount_counting_ballots = 0
+
+        for pollbook in election.pollbooks:
+            election.total_amount_ballots += pollbook.ballots_count
+            election.total_amount_empty_ballots += pollbook.empty_ballots_count
+            election.total_amount_counting_ballots += (
+                pollbook.counting_ballots_count
+            )
+            election.ballots.extend(pollbook.ballots)
+
+    def tally_election(self, election):
+        """
+        Run the counting algorithm of an election.
+
+        :return: The result as a dict, and the protocol
+        """
+        if election.type_str in ("sainte_lague", "uio_sainte_lague"):
+            return party_list.get_result(election)
+        if election.type_str == "uit_stv":
+            return uitstv.get_result(election)
+        if election.type_str == "positional_voting":
+            return positional_voting.get_result(election)
+
+        counter = Counter(election, election.ballots, test_mode=self.test_mode)
+        election_count_tree = counter.count()
+        election_path = election_count_tree.default_path
+        return election_path.get_result().to_dict(), election_path.get_protocol()
+
+    def get_pollbook_stats(self, election):
+        verified_voters_counts = get_verified_voters_counts(
+            self.session, [pollbook.id for pollbook in election.pollbooks]
+        )
+        pollbook_stats = {}
+        for pollbook in election.pollbooks:
+            pollbook_stats[str(pollbook.id)] = {
+                "verified_voters_count": verified_voters_counts.get(pollbook.id, 0),
+                "ballots_count": pollbook.ballots_count,
+                "counting_ballots_count": pollbook.counting_ballots_count,
+                "empty_ballots_count": pollbook.empty_ballots_count,
+            }
+        return pollbook_stats
+
+    def count_election(self, election, count=None, progress=None):
+        """
+        Count a processed election.
+
+        :param election: The election, with ballots from process_for_count()
+        :type election: evalg.models.election.Election
+
+        :param count: If given, the count phases are logged to this count
+        :type count: evalg.models.election_group_count.ElectionGroupCount
+
+        :param progress: The count progress when starting on this election
+        :type progress: int
+
+        :return: The values of the election result
+        :rtype: dict
+        """
+        if count:
+            self.log_count_phase(count, "tally", progress)
+        with self.metrics.timer(election.id, "tally"):
+            result, protocol = self.tally_election(election)
+
+        if count:
+            self.log_count_phase(count, "protocol")
+        with self.metrics.timer(election.id, "protocol"):
+            election_protocol_dict = protocol.to_dict()
+            ballots = [ballot.ballot_data for ballot in election.ballots]
+        self.metrics.set_memory_growth(election.id)
+
+        return {
+            "ballots": ballots,
+            "result": result,
+            "election_protocol": election_protocol_dict,
+            "pollbook_stats": self.get_pollbook_stats(election),
+        }
+
+    def store_election_result(self, count, election_id, values, counted_by=None):
+        """Store the values from count_election() as an ElectionResult."""
+        # insert the name of the one who triggered the counting
+        values["election_protocol"]["meta"]["counted_by"] = counted_by
+
+        with self.metrics.timer(election_id, "persist"):
+            db_row = ElectionResult(
+                election_id=election_id,
+                election_group_count_id=count.id,
+                ballots=values["ballots"],
+                result=values["result"],
+                election_protocol=values["election_protocol"],
+                pollbook_stats=values["pollbook_stats"],
+            )
+            self.session.add(db_row)
+            self.session.commit()
+        return db_row
+
+    def generate_results(self, count, counted_by=None, elections=None):
+        if elections is None:
+            elections = self.get_closed_elections()
+        for i, election in enumerate(elections):
+            values = self.count_election(
+                election, count, int(100 * i / len(elections))
+            )
+            self.log_count_phase(count, "persist")
+            self.store_election_result(count, election.id, values, counted_by)
+
+    def get_election_worker_config(self):
+        """Get the app config for election count worker processes."""
+        config = {
+            key: value for key, value in self.app_config.items() if key.isupper()
+        }
+        config.update(
+            COUNT_DECRYPT_PROCESSES=0,
+            COUNT_ELECTION_PROCESSES=0,
+        )
+        return types.SimpleNamespace(**config)
+
+    def generate_results_parallel(self, count, processes, counted_by=None):
+        """
+        Count the closed elections of the group in separate processes.
+
+        Each worker process decrypts and counts one election at a time with
+        its own database session, and returns the election result values.
+        The results are stored by this process as they come in. An election
+        that fails in a worker is counted again in this process, without
+        affecting the results of the other elections.
+
+        :param count: The election group count
+        :type count: evalg.models.election_group_count.ElectionGroupCount
+
+        :param processes: Number of worker processes
+        :type processes: int
+        """
+        elections = self.get_closed_elections()
+        election_ids = [election.id for election in elections]
+        counted = []
+        self.log_count_phase(count, "tally", 0)
+
+        executor = None
+        futures = {}
+        try:
+            executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=min(processes, len(election_ids)),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_count_worker,
+                initargs=(
+                    self.get_election_worker_config(),
+                    self.group_id,
+                    self.serializer_args["election_private_key"],
+                    self.test_mode,
+                ),
+            )
+            for election_id in election_ids:
+                future = executor.submit(_count_election_in_worker, election_id)
+                futures[future] = election_id
+        except (AssertionError, OSError, TypeError, pickle.PicklingError) as e:
+            logger.warning("Unable to start election count workers: %s", e)
+
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                election_id = futures[future]
+                try:
+                    values, metrics = future.result()
+                except Exception as e:
+                    logger.warning(
+                        "Counting election %s in worker process failed: %s",
+                        election_id,
+                        e,
                     )
-                    election_count_tree = counter.count()
-                    election_path = election_count_tree.default_path
-
-                    result = election_path.get_result().to_dict()
-                    election_protocol_dict = election_path.get_protocol().to_dict()
-
-                # insert the name of the one who triggered the counting
-                election_protocol_dict["meta"]["counted_by"] = counted_by
-                ballots = [ballot.ballot_data for ballot in election.ballots]
-
-                pollbook_stats = {}
-                for pollbook in election.pollbooks:
-                    pollbook_stats[str(pollbook.id)] = {
-                        "verified_voters_count": get_verified_voters_count(
-                            self.session, pollbook.id
-                        ),
-                        "ballots_count": pollbook.ballots_count,
-                        "counting_ballots_count": pollbook.counting_ballots_count,
-                        "empty_ballots_count": pollbook.empty_ballots_count,
-                    }
-
-                db_row = ElectionResult(
-                    election_id=election.id,
-                    election_group_count_id=count.id,
-                    ballots=ballots,
-                    result=result,
-                    election_protocol=election_protocol_dict,
-                    pollbook_stats=pollbook_stats,
+                    capture_exception(e)
+                    continue
+                self.metrics.set_election(election_id, metrics)
+                self.store_election_result(count, election_id, values, counted_by)
+                counted.append(election_id)
+                self.log_count_phase(
+                    count, "tally", int(100 * len(counted) / len(election_ids))
                 )
-                self.session.add(db_row)
-                self.session.commit()
+        finally:
+            if executor:
+                executor.shutdown()
+
+        failed = [
+            election_id for election_id in election_ids if election_id not in counted
+        ]
+        if failed:
+            logger.info("Recounting %d election(s) in-process", len(failed))
+            retry = [
+                election for election in elections if election.id in failed
+            ]
+            self.deserialize_ballots(retry)
+            self.process_for_count(retry)
+            self.generate_results(count, counted_by, retry)
+
+
+# App context and counter arguments of an election count worker process, set
+# by _init_count_worker() when a worker is started.
+_count_worker: Dict[str, Any] = {}
+
+
+def _init_count_worker(config, group_id, election_key, test_mode):
+    from evalg import create_app
+
+    app = create_app(config=config)
+    app.app_context().push()
+    _count_worker.update(
+        app=app,
+        group_id=group_id,
+        election_key=election_key,
+        test_mode=test_mode,
+    )
+
+
+def _count_election(session, election_id):
+    """
+    Decrypt and count a single election, with the counter arguments of the
+    election count worker.
+
+    :return: The values of the election result, and the election metrics
+    :rtype: tuple
+    """
+    counter = ElectionGroupCounter(
+        session,
+        _count_worker["group_id"],
+        _count_worker["election_key"],
+        test_mode=_count_worker["test_mode"],
+    )
+    election = next(
+        election
+        for election in counter.group.elections
+        if election.id == election_id
+    )
+    counter.deserialize_ballots([election])
+    counter.process_for_count([election])
+    values = counter.count_election(election)
+    return values, counter.metrics.get_election(election.id)
+
+
+def _count_election_in_worker(election_id):
+    """
+    Decrypt and count a single election in an election count worker.
+
+    :return: The values of the election result, and the election metrics
+    :rtype: tuple
+    """
+    from evalg import db
+
+    try:
+        return _count_election(db.session, election_id)
+    finally:
+        db.session.remove()
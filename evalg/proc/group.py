@@ -62,9 +62,9 @@ def remove_person_from_group(session, group, person):
 
 def get_user_groups(session, person):
     """Get the groups a user is a member of."""
-    memberships = session.query(GroupMembership).filter(
+    return session.query(Group).join(
+        GroupMembership, GroupMembership.group_id == Group.id).filter(
         GroupMembership.person_id == person.id).all()
-    return [get_group_by_id(session, x.group_id) for x in memberships]
 
 
 def get_election_key_meta(session, election_group_id):
@@ -7,21 +7,30 @@ This includes:
 - Querying the database for information about a pollbook and voters
 
 """
+import collections
+import itertools
 import logging
+import uuid
+from dataclasses import dataclass
 
 from flask import current_app
 from sqlalchemy import and_, func
 
 import evalg.database.query
+from evalg.database.bulk import insert_versioned
+from evalg.models.census_file_import import CensusFileImport
 from evalg.models.election import Election, ElectionGroup
-from evalg.models.person import Person, PersonExternalId
+from evalg.models.person import Person, PersonExternalId, PersonIdType
 from evalg.models.pollbook import Pollbook
 from evalg.utils import flask_request_memoize
 from evalg.models.votes import Vote
-from evalg.models.voter import Voter
+from evalg.models.voter import VERIFIED_STATUS_MAP, Voter
 
 logger = logging.getLogger(__name__)
 
+# Number of census file entries imported at a time
+CENSUS_CHUNK_SIZE = 1000
+
 
 def get_voters_for_person(session, person, election=None):
     """
@@ -119,14 +128,35 @@ class CachedPollbookVoterPolicy(object):
 
     def _create_voter_cache(self):
         """Simple cache of all voter ids in the pollbook"""
-        voters = self.session.query(Voter).filter(
+        voters = self.session.query(
+            Voter.id_type,
+            Voter.id_value
+        ).filter(
             Voter.pollbook_id == self.pollbook.id
-        ).all()
+        )
+        self.cache = collections.defaultdict(set)
+        for id_type, id_value in voters:
+            self.cache[id_type].add(id_value)
+        self.id_types = list(self.cache)
+
+    def add_ids(self, id_type, id_values):
+        """
+        Sort out the ids that are not in the pollbook, and cache them.
+
+        An id that occurs more than once is only new the first time.
 
-        self.id_types = list({x.id_type for x in voters})
-        self.cache = {x: {} for x in self.id_types}
-        for voter in voters:
-            self.cache[voter.id_type][voter.id_value] = voter
+        :return: A tuple of the new ids and the ids already in the pollbook
+        """
+        cached = self.cache[id_type]
+        new = []
+        existing = []
+        for id_value in id_values:
+            if id_value in cached:
+                existing.append(id_value)
+            else:
+                cached.add(id_value)
+                new.append(id_value)
+        return new, existing
 
     def create_voter(self, id_type, id_value, self_added=True, reason=None):
         """
@@ -135,7 +165,7 @@ class CachedPollbookVoterPolicy(object):
         The Voter object is not added to the session/committed etc.
         Returns None if the id exists in the pollbook.
         """
-        if id_type in self.id_types and id_value in self.cache[id_type]:
+        if id_value in self.cache.get(id_type, ()):
             return None
         return Voter(
             pollbook_id=self.pollbook.id,
@@ -148,6 +178,117 @@ class CachedPollbookVoterPolicy(object):
         )
 
 
+def add_census_voters(session, voter_policy, id_type, id_values,
+                      chunk_size=CENSUS_CHUNK_SIZE, start=0, on_chunk=None):
+    """
+    Add the ids of a census file as voters in a pollbook.
+
+    The ids are checked against the voter cache of the policy, and the new
+    voters are inserted ``chunk_size`` at a time.
+
+    :param voter_policy: Policy of the pollbook to add voters to
+    :type voter_policy: CachedPollbookVoterPolicy
+    :param id_values: The ids of the census file
+    :param start: Number of entries of the file that are already imported
+    :param on_chunk: Called with the number of entries, added voters and
+        existing voters after each chunk is inserted
+    :type on_chunk: callable
+
+    :return: The number of added voters, and the ids already in the pollbook
+    :rtype: dict
+    """
+    id_type = PersonIdType(id_type).value
+    pollbook_id = voter_policy.pollbook.id
+    results = {
+        "added_nr": 0,
+        "already_in_pollbook_nr": 0,
+        "already_in_pollbook": [],
+    }
+    id_values = iter(id_values)
+    processed = start
+    while True:
+        chunk = list(itertools.islice(id_values, chunk_size))
+        if not chunk:
+            break
+        new, existing = voter_policy.add_ids(id_type, chunk)
+        insert_versioned(session, Voter, [
+            {
+                'id': uuid.uuid4(),
+                'pollbook_id': pollbook_id,
+                'id_type': id_type,
+                'id_value': id_value,
+                'self_added': False,
+                'reviewed': False,
+                'verified': True,
+                'reason': None,
+            }
+            for id_value in new
+        ])
+        results["added_nr"] += len(new)
+        results["already_in_pollbook_nr"] += len(existing)
+        results["already_in_pollbook"].extend(existing)
+        logger.info(
+            "Entries #%d-#%d: Added %d voters to pollbook %s, %d exist",
+            processed + 1, processed + len(chunk), len(new), pollbook_id,
+            len(existing))
+        processed += len(chunk)
+        if on_chunk is not None:
+            on_chunk(len(chunk), len(new), len(existing))
+    return results
+
+
+def import_census_file(session, census_file_import, parser,
+                       chunk_size=CENSUS_CHUNK_SIZE):
+    """
+    Import a census file into its pollbook.
+
+    The voters are committed ``chunk_size`` entries at a time, along with the
+    progress of the import. An import that was interrupted continues after
+    the last committed chunk.
+
+    :type census_file_import: CensusFileImport
+    :param parser: Parser of the census file
+
+    :return: The results of the import
+    :rtype: dict
+    """
+    import_id = census_file_import.id
+    progress = {
+        'processed_nr': census_file_import.processed_nr or 0,
+        'added_nr': census_file_import.added_nr or 0,
+        'already_in_pollbook_nr':
+            census_file_import.already_in_pollbook_nr or 0,
+    }
+    start = progress['processed_nr']
+    if start:
+        logger.info("Resuming census file import %s after entry #%d",
+                    import_id, start)
+    voter_policy = CachedPollbookVoterPolicy(session,
+                                             census_file_import.pollbook)
+
+    def commit_chunk(processed, added, existing):
+        progress['processed_nr'] += processed
+        progress['added_nr'] += added
+        progress['already_in_pollbook_nr'] += existing
+        # Update the columns directly, so that the census file is not
+        # reloaded after every commit
+        session.query(CensusFileImport).filter(
+            CensusFileImport.id == import_id
+        ).update(dict(progress), synchronize_session=False)
+        session.commit()
+
+    results = add_census_voters(
+        session,
+        voter_policy,
+        parser.id_type,
+        itertools.islice(parser.parse(), start, None),
+        chunk_size=chunk_size,
+        start=start,
+        on_chunk=commit_chunk)
+    results.update(progress)
+    return results
+
+
 class ElectionVoterPolicy(object):
     def __init__(self, session):
         self.session = session
@@ -245,6 +386,48 @@ def get_person_for_voter(session, voter):
     return query
 
 
+def get_persons_for_voters(session, voter_ids):
+    """
+    Get the persons of several voters in one query.
+
+    :return: A mapping from voter id to person. Voters without a person are
+             left out.
+    :rtype: dict
+    """
+    query = session.query(
+        Voter.id,
+        Person
+    ).select_from(
+        Person
+    ).join(
+        PersonExternalId,
+        Person.id == PersonExternalId.person_id
+    ).join(
+        Voter,
+        and_(
+            Voter.id_type == PersonExternalId.id_type,
+            Voter.id_value == PersonExternalId.id_value
+        )
+    ).filter(
+        Voter.id.in_(voter_ids)
+    )
+    persons = {}
+    for voter_id, person in query:
+        persons.setdefault(voter_id, person)
+    return persons
+
+
+def get_voters_with_votes(session, voter_ids):
+    """
+    Find which of several voters have voted, in one query.
+
+    :return: The ids of the voters with a vote
+    :rtype: set
+    """
+    query = session.query(Vote.voter_id).filter(Vote.voter_id.in_(voter_ids))
+    return set(voter_id for voter_id, in query)
+
+
 def get_voters_in_election_group(
         session,
         election_group_id,
@@ -307,6 +490,30 @@ def get_verified_voters_count(session, pollbook_id):
     ).scalar()
 
 
+def get_verified_voters_counts(session, pollbook_ids):
+    """
+    Count the verified voters of several pollbooks in one query.
+
+    :param pollbook_ids: The pollbooks to count voters in
+    :type pollbook_ids: list
+
+    :return: A mapping from pollbook id to number of verified voters.
+             Pollbooks without verified voters are left out.
+    :rtype: dict
+    """
+    if not pollbook_ids:
+        return {}
+    return dict(session.query(
+        Voter.pollbook_id,
+        func.count(Voter.id)
+    ).filter(
+        Voter.pollbook_id.in_(pollbook_ids),
+        Voter.verified,
+    ).group_by(
+        Voter.pollbook_id
+    ).all())
+
+
 def get_verified_voters_with_votes_count(session, pollbook_id):
     return session.query(
         func.count(Voter.id)
@@ -317,6 +524,117 @@ def get_verified_voters_with_votes_count(session, pollbook_id):
     ).scalar()
 
 
+@dataclass
+class PollbookStats:
+    """Voter counts of a pollbook."""
+    voters: int = 0
+    self_added: int = 0
+    verified: int = 0
+    verified_with_vote: int = 0
+
+    @property
+    def admin_added(self):
+        return self.voters - self.self_added
+
+    @property
+    def verified_without_vote(self):
+        return self.verified - self.verified_with_vote
+
+
+def _get_pollbook_stats(query, pollbook_ids):
+    stats = {pollbook_id: PollbookStats() for pollbook_id in pollbook_ids}
+    query = query.outerjoin(
+        Vote,
+        Vote.voter_id == Voter.id
+    ).group_by(
+        Voter.pollbook_id,
+        Voter.self_added,
+        Voter.verified,
+    )
+    for pollbook_id, self_added, verified, voters, votes in query:
+        pollbook_stats = stats.setdefault(pollbook_id, PollbookStats())
+        pollbook_stats.voters += voters
+        if self_added:
+            pollbook_stats.self_added += voters
+        if verified:
+            pollbook_stats.verified += voters
+            pollbook_stats.verified_with_vote += votes
+    return stats
+
+
+def _stats_columns(session):
+    return session.query(
+        Voter.pollbook_id,
+        Voter.self_added,
+        Voter.verified,
+        func.count(Voter.id),
+        func.count(Vote.voter_id),
+    )
+
+
+def get_pollbook_stats(session, pollbook_ids):
+    """
+    Count the voters and votes of several pollbooks in one query.
+
+    :param pollbook_ids: The pollbooks to count voters in
+    :type pollbook_ids: list
+
+    :return: A mapping from pollbook id to the pollbook's counts
+    :rtype: dict
+    """
+    if not pollbook_ids:
+        return {}
+    query = _stats_columns(session).filter(
+        Voter.pollbook_id.in_(pollbook_ids))
+    return _get_pollbook_stats(query, pollbook_ids)
+
+
+def get_election_pollbook_stats(session, election):
+    """
+    Count the voters and votes of every pollbook in an election, in one query.
+
+    :return: A mapping from pollbook id to the pollbook's counts
+    :rtype: dict
+    """
+    query = _stats_columns(session).join(
+        Pollbook,
+        Voter.pollbook_id == Pollbook.id
+    ).filter(
+        Pollbook.election_id == election.id
+    )
+    return _get_pollbook_stats(query, [x.id for x in election.pollbooks])
+
+
+def get_voter_dump(session, pollbook_id, chunk_size=1000):
+    """
+    Get the voters of a pollbook, and whether they have voted.
+
+    The voters are read with one query, and fetched from the database
+    ``chunk_size`` rows at a time.
+
+    :return: A generator of (id_type, id_value, has_voted, verified_status)
+    """
+    query = session.query(
+        Voter.id_type,
+        Voter.id_value,
+        Vote.voter_id.isnot(None),
+        Voter.self_added,
+        Voter.reviewed,
+        Voter.verified,
+    ).outerjoin(
+        Vote,
+        Vote.voter_id == Voter.id
+    ).filter(
+        Voter.pollbook_id == pollbook_id
+    ).order_by(
+        Voter.id_type,
+        Voter.id_value,
+    ).yield_per(chunk_size)
+    for id_type, id_value, has_voted, self_added, reviewed, verified in query:
+        status = VERIFIED_STATUS_MAP[(self_added, reviewed, verified)]
+        yield id_type, id_value, bool(has_voted), status
+
+
 def get_persons_with_multiple_verified_voters(session, election_group_id):
     """
     Get persons who have more than one verified voter.
@@ -0,0 +1,149 @@
+"""
+Cache of the principals of persons.
+
+Finding the principals of a person needs the person's principal, identifier
+principals and group memberships, and the principals of every group. The ids
+of the principals are cached per process by person, so that later requests
+only load the principals and their roles by id.
+
+The cache is bounded by ROLE_CACHE_SIZE persons, and an entry is used for at
+most ROLE_CACHE_TTL seconds. Entries are dropped when principals, roles,
+group memberships or person identifiers are changed in this process, both
+when the change is flushed and when it is committed or rolled back. Changes
+made by other processes are picked up when the entry expires.
+"""
+import collections
+import logging
+import threading
+import time
+
+import sqlalchemy.event
+from flask import current_app
+from sqlalchemy.orm import Session, object_session, selectinload, with_polymorphic
+
+from evalg.models.authorization import Principal, Role
+from evalg.models.group import GroupMembership
+from evalg.models.person import PersonExternalId
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZE = 1024
+DEFAULT_TTL = 5
+
+# Session.info key of the persons to drop from the cache on commit
+_PENDING_KEY = "role_cache_invalidate"
+# Drop every person
+ALL = object()
+
+
+class PrincipalCache:
+    """Process wide LRU cache of principal ids, by person id."""
+
+    def __init__(self, size=DEFAULT_SIZE):
+        self.size = size
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, person_id, ttl=DEFAULT_TTL):
+        """
+        Get the cached principal ids of a person.
+
+        :return: A tuple of principal ids, or None if not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(person_id)
+            if entry is None or time.monotonic() - entry[0] >= ttl:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(person_id)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, person_id, principal_ids):
+        """Cache the principal ids of a person."""
+        with self._lock:
+            self._entries[person_id] = (time.monotonic(), tuple(principal_ids))
+            self._entries.move_to_end(person_id)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, person_id=ALL):
+        """
+        Drop cached principals.
+
+        :param person_id: Only drop the principals of this person
+        """
+        with self._lock:
+            if person_id is ALL:
+                self._entries.clear()
+            else:
+                self._entries.pop(person_id, None)
+
+
+principal_cache = PrincipalCache()
+
+
+def get_cached_principals(session, person, load_principals):
+    """
+    Get the principals of a person, using the principal cache.
+
+    :param load_principals: Callable that finds the principals of the person
+        when they are not cached.
+    :type load_principals: callable
+    """
+    config = current_app.config
+    ttl = config.get("ROLE_CACHE_TTL", DEFAULT_TTL)
+    if not ttl:
+        return load_principals(session, person)
+    principal_cache.size = config.get("ROLE_CACHE_SIZE", DEFAULT_SIZE)
+    principal_ids = principal_cache.get(person.id, ttl=ttl)
+    if principal_ids is None:
+        principals = load_principals(session, person)
+        principal_cache.set(person.id, (x.id for x in principals))
+        return principals
+    if not principal_ids:
+        return []
+    principal_class = with_polymorphic(Principal, "*")
+    by_id = {
+        principal.id: principal
+        for principal in session.query(principal_class)
+        .filter(principal_class.id.in_(principal_ids))
+        .options(selectinload(principal_class.roles))
+    }
+    if len(by_id) < len(principal_ids):
+        # deleted by another process
+        principal_cache.invalidate(person.id)
+    return [by_id[x] for x in principal_ids if x in by_id]
+
+
+def _invalidate(target, person_id):
+    principal_cache.invalidate(person_id)
+    session = object_session(target)
+    if session is None:
+        return
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    pending.add(person_id)
+
+
+def _invalidate_all(mapper, connection, target):
+    _invalidate(target, ALL)
+
+
+def _invalidate_person(mapper, connection, target):
+    _invalidate(target, target.person_id)
+
+
+def _invalidate_pending(session):
+    for person_id in session.info.pop(_PENDING_KEY, ()):
+        principal_cache.invalidate(person_id)
+
+
+for _event in ("after_insert", "after_update", "after_delete"):
+    sqlalchemy.event.listen(Principal, _event, _invalidate_all, propagate=True)
+    sqlalchemy.event.listen(Role, _event, _invalidate_all, propagate=True)
+    sqlalchemy.event.listen(GroupMembership, _event, _invalidate_person)
+    sqlalchemy.event.listen(PersonExternalId, _event, _invalidate_person)
+sqlalchemy.event.listen(Session, "after_commit", _invalidate_pending)
+sqlalchemy.event.listen(Session, "after_rollback", _invalidate_pending)
@@ -1,19 +1,26 @@
 """This module implements interfaces for voting and getting vote statistics."""
 import collections
 import logging
+import uuid
 
+import sqlalchemy
 from flask import current_app
-from sqlalchemy.sql import and_, select, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql import and_, func
 
 import evalg.database.query
-from evalg.ballot_serializer.base64_nacl import Base64NaClSerializer
+from evalg.ballot_serializer.factory import get_serializer
 from evalg.models.ballot import Envelope
 from evalg.models.pollbook import Pollbook
-from evalg.models.voter import Voter, VERIFIED_STATUS_MAP
+from evalg.models.voter import Voter
+from evalg.models.vote_count import (
+    PollbookVoteCount,
+    VOTE_COUNT_STATUSES,
+    get_status_name,
+)
 from evalg.models.votes import Vote
-from evalg.models.candidate import Candidate
-from evalg.models.election_list import ElectionList
 from evalg.models.person import PersonExternalId
+from evalg.proc.ballot_context import get_validation_context
 from evalg.proc.ballot_verification import (
     BallotVerificationException,
     ListBallotVerifier,
@@ -55,17 +62,11 @@ class ElectionVotePolicy(object):
 
     def verify_candidates_exist(self, ranked_candidate_ids, election_id):
         if ranked_candidate_ids:
-            query = (
-                self.session.query(func.count(Candidate.id))
-                .join(ElectionList, and_(ElectionList.id == Candidate.list_id))
-                .filter(
-                    Candidate.id.in_(ranked_candidate_ids),
-                    ElectionList.election_id == election_id,
-                )
-            )
-            number_of_candidates = query.first()[0]
-
-            if number_of_candidates < len(ranked_candidate_ids):
+            context = get_validation_context(self.session, election_id)
+            candidate_ids = context.candidate_ids if context else frozenset()
+            if len(candidate_ids.intersection(ranked_candidate_ids)) < len(
+                ranked_candidate_ids
+            ):
                 return False
         return True
 
@@ -75,9 +76,13 @@ class ElectionVotePolicy(object):
 
     def verify_nr_of_votes_in_ballot(self, candidate_ids):
         """Check that a ballot contains a correct nr of votes."""
-        meta = self.voter.pollbook.election.meta
-        ballot_rules = meta["ballot_rules"]
-        candidate_rules = meta["candidate_rules"]
+        context = get_validation_context(
+            self.session, self.voter.pollbook.election_id
+        )
+        if context is None:
+            return False
+        ballot_rules = context.ballot_rules
+        candidate_rules = context.candidate_rules
         if ballot_rules["votes"] == "nr_of_seats" and candidate_rules["seats"] < len(
             candidate_ids
         ):
@@ -129,35 +134,65 @@ class ElectionVotePolicy(object):
     def envelope_type(self):
         """
         Envelope type in use to serialize ballots.
-
-        Currently not used.
         """
         return self._envelope_type
 
     def make_ballot(self, ballot_data, election_public_key):
         """Create a envelope object with containing the serialized ballot."""
-        # Future work: create serializer factory.
-        serializer = Base64NaClSerializer(
+        serializer = get_serializer(
+            self.envelope_type,
             backend_private_key=self._backend_private_key,
             election_public_key=election_public_key,
             envelope_padded_len=self._envelope_padded_len,
         )
+        # The id is set here, so that the vote can refer to the envelope
+        # before it is flushed.
         ballot = Envelope(
+            id=uuid.uuid4(),
             envelope_type=self.envelope_type,
             ballot_data=serializer.serialize(ballot_data),
         )
         return ballot
 
     def make_vote(self, envelope):
-        """Create a Vote object mapping a envelope to a voter."""
-        vote = evalg.database.query.get_or_create(
-            self.session, Vote, voter_id=self.voter.id
-        )
+        """Create or update the Vote object mapping a envelope to a voter."""
+        vote = self.session.query(Vote).get(self.voter.id)
+        if vote is None:
+            vote = Vote(voter_id=self.voter.id)
         vote.ballot_id = envelope.id
         return vote
 
+    def add_first_vote(self, envelope, vote):
+        """
+        Store the first vote of the voter.
+
+        Another request from the voter may store a vote between the lookup in
+        make_vote() and the flush. The vote is therefore inserted in a
+        savepoint, and the other vote is updated if the insert fails.
+        """
+        try:
+            with self.session.begin_nested():
+                self.session.add(envelope)
+                self.session.add(vote)
+        except IntegrityError:
+            logger.warning(
+                "Voter %r voted concurrently, updating the stored vote",
+                self.voter.id,
+            )
+            # the rollback expunged the envelope
+            vote = self.make_vote(envelope)
+            self.session.add(envelope)
+            self.session.add(vote)
+            self.session.flush()
+        return vote
+
     def add_vote(self, ballot_data):
-        """Add a vote to a given election."""
+        """
+        Add a vote to a given election.
+
+        The envelope, vote and vote record are stored in a single flush. The
+        first vote of a voter is flushed in a savepoint, see add_first_vote().
+        """
         logger.info(
             "Adding vote in election/pollbook %r/%r",
             self.voter.pollbook.election,
@@ -169,83 +204,133 @@ class ElectionVotePolicy(object):
             raise Exception("Election key is missing.")
 
         envelope = self.make_ballot(ballot_data, election_public_key)
-        self.session.add(envelope)
-        self.session.flush()
-        logger.info("Stored ballot %r", envelope)
-
+        # look up any previous vote before adding the envelope, so that the
+        # query does not autoflush it
         vote = self.make_vote(envelope)
-        self.session.add(vote)
-        self.session.flush()
+        if sqlalchemy.inspect(vote).persistent:
+            self.session.add(envelope)
+            self.session.flush()
+        else:
+            vote = self.add_first_vote(envelope, vote)
+        logger.info("Stored ballot %r", envelope)
         logger.info("Stored vote %r", vote)
         return vote
 
 
+def _get_vote_counts(query):
+    """Make a dict of vote counts from (verified_status, votes) rows."""
+    count = collections.Counter()
+    for status, votes in query:
+        if votes:
+            count[status] += votes
+    count["total"] = sum(count.values())
+    return count
+
+
 def get_election_vote_counts(session, election):
     """
     Get a dict of vote counts for the election.
 
-    The votes are grouped by the voters' ``verified_status``
+    The votes are grouped by the voters' ``verified_status``, and read from
+    the live vote counters of the election's pollbooks.
     """
-    voters_subq = select([Voter.id]).where(
-        Voter.pollbook_id.in_(
-            select([Pollbook.id]).where(Pollbook.election_id == election.id)
-        )
-    )
     query = (
         session.query(
-            Voter.self_added, Voter.reviewed, Voter.verified, func.count(Vote.ballot_id)
-        )
-        .join(Vote)
-        .filter(Voter.id.in_(voters_subq))
-        .group_by(
-            Voter.self_added,
-            Voter.reviewed,
-            Voter.verified,
+            PollbookVoteCount.verified_status, func.sum(PollbookVoteCount.votes)
         )
+        .join(Pollbook)
+        .filter(Pollbook.election_id == election.id)
+        .group_by(PollbookVoteCount.verified_status)
     )
-
-    count = collections.Counter()
-    for self_added, reviewed, verified, votes in query.all():
-        name = VERIFIED_STATUS_MAP[(self_added, reviewed, verified)].name
-        count[name.lower()] += votes
-    total = 0
-    for votes in count.values():
-        total += votes
-    count["total"] = total
-    return count
+    return _get_vote_counts(query.all())
 
 
 def get_pollbook_vote_counts(session, pollbook):
     """
     Get a dict of vote counts for the pollbook.
 
-    The votes are grouped by the voters' ``verified_status``
+    The votes are grouped by the voters' ``verified_status``, and read from
+    the live vote counters of the pollbook.
+    """
+    query = session.query(
+        PollbookVoteCount.verified_status, PollbookVoteCount.votes
+    ).filter(PollbookVoteCount.pollbook_id == pollbook.id)
+    return _get_vote_counts(query.all())
+
+
+def count_pollbook_votes(session, pollbook_id):
+    """
+    Count the votes in a pollbook from its voters and votes.
+
+    :return: Number of votes by ``verified_status``
+    :rtype: collections.Counter
     """
-    voters_subq = select([Voter.id]).where(Voter.pollbook_id == pollbook.id)
     query = (
         session.query(
             Voter.self_added, Voter.reviewed, Voter.verified, func.count(Vote.ballot_id)
         )
         .join(Vote)
-        .filter(Voter.id.in_(voters_subq))
+        .filter(Voter.pollbook_id == pollbook_id)
         .group_by(
             Voter.self_added,
             Voter.reviewed,
             Voter.verified,
         )
     )
-
     count = collections.Counter()
     for self_added, reviewed, verified, votes in query.all():
-        name = VERIFIED_STATUS_MAP[(self_added, reviewed, verified)].name
-        count[name.lower()] += votes
-    total = 0
-    for votes in count.values():
-        total += votes
-    count["total"] = total
+        count[get_status_name(self_added, reviewed, verified)] += votes
     return count
 
 
+def rebuild_vote_counts(session, pollbook_ids=None):
+    """
+    Rebuild the live vote counters from the voters and votes.
+
+    The counters of a pollbook are locked while it is counted, so that votes
+    stored at the same time are not lost.
+
+    :param pollbook_ids: Only rebuild the counters of these pollbooks
+    :return: (pollbook_id, verified_status, old votes, votes) of the counters
+        that were wrong
+    :rtype: list
+    """
+    if pollbook_ids is None:
+        pollbook_ids = [pollbook_id for pollbook_id, in session.query(Pollbook.id)]
+    corrections = []
+    for pollbook_id in pollbook_ids:
+        counters = {
+            counter.verified_status: counter
+            for counter in session.query(PollbookVoteCount)
+            .filter(PollbookVoteCount.pollbook_id == pollbook_id)
+            .with_for_update()
+            .populate_existing()
+        }
+        count = count_pollbook_votes(session, pollbook_id)
+        for status in VOTE_COUNT_STATUSES:
+            counter = counters.get(status)
+            if counter is None:
+                counter = PollbookVoteCount(
+                    pollbook_id=pollbook_id, verified_status=status, votes=0
+                )
+                session.add(counter)
+            if counter.votes != count[status]:
+                corrections.append(
+                    (pollbook_id, status, counter.votes, count[status])
+                )
+                counter.votes = count[status]
+    session.flush()
+    for pollbook_id, status, old_votes, votes in corrections:
+        logger.warning(
+            "Corrected vote count of pollbook %s, %s: %d -> %d",
+            pollbook_id,
+            status,
+            old_votes,
+            votes,
+        )
+    return corrections
+
+
 def get_votes_for_person(session, person):
     """
     Get all voters for a person, in prioritized order.
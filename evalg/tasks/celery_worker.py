@@ -3,12 +3,14 @@ import datetime
 import json
 import logging
 
+import sqlalchemy.exc
 from flask import current_app
 from werkzeug.local import LocalProxy
 
 from sentry_sdk import capture_exception
 
 import evalg.mail.mailer
+import evalg.proc.count
 import evalg.proc.pollbook
 from evalg import create_app, db
 from evalg.tasks.flask_celery import make_celery
@@ -19,58 +21,75 @@ app = create_app()
 celery = LocalProxy(lambda: make_celery(app))
 
 
-@celery.task(bind=True)
-def import_census_file_task(self, pollbook_id, census_file_id):
-    """Import census-file functionality"""
+@celery.task(
+    bind=True,
+    acks_late=True,
+    autoretry_for=(sqlalchemy.exc.OperationalError,),
+    retry_backoff=True,
+    retry_kwargs={"max_retries": 5},
+)
+def import_census_file_task(self, census_file_id):
+    """
+    Import census-file functionality
+
+    Voters are committed in chunks, and a retried import continues after the
+    last committed chunk. An import that stops at an invalid id is finished
+    as failed, with the error in the import results. The voters of the
+    chunks committed before the invalid id are kept.
+    """
+    census_file = db.session.query(
+        evalg.models.census_file_import.CensusFileImport
+    ).get(census_file_id)
+    if census_file is None:
+        logger.error("Census file %s does not exist", census_file_id)
+        return
+    if census_file.finished_at:
+        logger.info("Census file %s is already imported", census_file_id)
+        return
+    pollbook_id = census_file.pollbook_id
     logger.info(
         "Starting to import census file %s into pollbook %s (%s)",
-        pollbook_id,
         census_file_id,
+        pollbook_id,
         self.request.id,
     )
-    census_file = db.session.query(
-        evalg.models.census_file_import.CensusFileImport
-    ).get(census_file_id)
 
-    pollbook = db.session.query(evalg.models.pollbook.Pollbook).get(pollbook_id)
     feide_postfix = current_app.config.get("FEIDE_POSTFIX", "uio.no")
-    parser = CensusFileParser.factory(
-        census_file.census_file, census_file.mime_type, feide_postfix=feide_postfix
-    )
-
-    id_type = parser.id_type
-    voter_policy = evalg.proc.pollbook.CachedPollbookVoterPolicy(db.session, pollbook)
-
-    logger.debug("Loading file using parser %r (id_type=%r)", type(parser), id_type)
-    results = {
-        "added_nr": 0,
-        "already_in_pollbook_nr": 0,
-        "already_in_pollbook": [],
-        "error_nr": 0,
-        "error": [],
-    }
-    voters = []
-    for i, id_value in enumerate(parser.parse(), 1):
-        try:
-            voter = voter_policy.create_voter(id_type, id_value, self_added=False)
-            if voter and voter not in voters:
-                results["added_nr"] += 1
-                logger.info("Entry #%d: Added voter to pollbook: %s", i, pollbook_id)
-                voters.append(voter)
-            else:
-                logger.info("Entry #%d: Voter exists in pollbook: %s", i, pollbook_id)
-                results["already_in_pollbook_nr"] += 1
-                results["already_in_pollbook"].append(id_value)
-
-        except Exception as e:
-            capture_exception(e)  # overkill?
-            logger.warning("Entry #%d: unable to add voter: %s", i, e, exc_info=True)
-            results["error_nr"] += 1
-            results["error"].append(id_value)
-            continue
-
-    db.session.add_all(voters)
-    db.session.commit()
+    try:
+        # the file was validated on upload, and parse() still stops at
+        # invalid ids
+        parser = CensusFileParser.factory(
+            census_file.census_file,
+            census_file.mime_type,
+            feide_postfix=feide_postfix,
+            validate=False,
+        )
+        logger.debug(
+            "Loading file using parser %r (id_type=%r)", type(parser), parser.id_type
+        )
+        results = evalg.proc.pollbook.import_census_file(
+            db.session,
+            census_file,
+            parser,
+            chunk_size=current_app.config.get("CENSUS_IMPORT_CHUNK_SIZE", 1000),
+        )
+        results["status"] = "finished"
+    except ValueError as e:
+        logger.warning(
+            "Unable to import census file %s into pollbook %s: %s",
+            census_file_id,
+            pollbook_id,
+            e,
+        )
+        # the invalid id is found before its chunk is inserted, so nothing
+        # but the committed chunks is in the session
+        results = {
+            "status": "failed",
+            "error": str(e),
+            "processed_nr": census_file.processed_nr,
+            "added_nr": census_file.added_nr,
+            "already_in_pollbook_nr": census_file.already_in_pollbook_nr,
+        }
 
     census_file.finished_at = datetime.datetime.now(datetime.timezone.utc)
     census_file.import_results = json.dumps(results)
@@ -78,8 +97,57 @@ def import_census_file_task(self, pollbook_id, census_file_id):
     db.session.commit()
     logger.info(
         "Finished importing census file %s into pollbook %s (%s)",
-        pollbook_id,
         census_file_id,
+        pollbook_id,
+        self.request.id,
+    )
+
+
+@celery.task(bind=True)
+def count_election_group_task(
+    self, election_group_count_id, sealed_election_key, counted_by=None,
+    test_mode=False
+):
+    """Count an election group, updating the count progress as we go."""
+    logger.info(
+        "Starting election group count %s (%s)",
+        election_group_count_id,
+        self.request.id,
+    )
+    count = db.session.query(
+        evalg.models.election_group_count.ElectionGroupCount
+    ).get(election_group_count_id)
+    if count is None:
+        logger.error(
+            "Election group count %s does not exist", election_group_count_id
+        )
+        return
+    try:
+        election_key = evalg.proc.count.unseal_election_key(
+            sealed_election_key, current_app.config.get("BACKEND_PRIVATE_KEY")
+        )
+        counter = evalg.proc.count.ElectionGroupCounter(
+            db.session, count.group_id, election_key, test_mode=test_mode
+        )
+        counter.count(count, counted_by)
+    except Exception as e:
+        capture_exception(e)
+        logger.error(
+            "Election group count %s failed: %s",
+            election_group_count_id,
+            e,
+            exc_info=True,
+        )
+        if count.phase != "failed":
+            # failed before the counter could mark the count as failed
+            db.session.rollback()
+            count.phase = "failed"
+            db.session.add(count)
+            db.session.commit()
+        raise
+    logger.info(
+        "Finished election group count %s (%s)",
+        election_group_count_id,
         self.request.id,
     )
 
@@ -4,9 +4,10 @@ import re
 
 
 from collections.abc import Iterable, Mapping
-from flask import g
+from flask import g, has_app_context
 from functools import wraps
 from types import DynamicClassAttribute
+from typing import Dict
 
 under_pat = re.compile(r'_([a-z])')
 
@@ -125,20 +126,87 @@ class Name2Callable(Mapping):
         return callable_
 
 
+class MemoizeStats(object):
+    """Hit and miss counters of a memoized function."""
+
+    __slots__ = ('hits', 'misses')
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return '<MemoizeStats hits={} misses={}>'.format(self.hits,
+                                                         self.misses)
+
+
+# Memoize stats by qualified function name, for all requests in the process
+memoize_stats: Dict[str, MemoizeStats] = {}
+
+
+def memoize_key(value):
+    """
+    Get a hashable key for a memoized function argument.
+
+    Database objects are identified by their class and primary key, lists,
+    tuples and dicts by the keys of their contents, and any other object by
+    itself if it is hashable, or by its id if not.
+    """
+    state = getattr(value, '_sa_instance_state', None)
+    if state is not None:
+        if state.key is not None:
+            return state.key
+        return (type(value), id(value))
+    if isinstance(value, (list, tuple)):
+        return (type(value), tuple(memoize_key(item) for item in value))
+    if isinstance(value, dict):
+        return (dict, tuple((k, memoize_key(v)) for k, v in value.items()))
+    try:
+        hash(value)
+    except TypeError:
+        return (type(value), id(value))
+    return value
+
+
 def flask_request_memoize(f):
     """
     Flask memoize wrapper for a callable.
 
-    TODO: If we need to memoize class functions, we would need to add the
-    class name to the arg_string as well.
+    The results are cached in flask.g for the rest of the request, by the
+    memoize_key() of the arguments. The wrapper gets a ``stats`` attribute
+    with the number of cache hits and misses in all requests, and
+    ``cache_clear()`` to forget the results of the current request.
 
-    Based on the same wrapper i Cerebrum.utils.funcwrap.
-    Caching is done via flask.g and will be removed when the session ends.
+    Without an app context, the callable is called without caching.
     """
+    stats = memoize_stats[f'{f.__module__}.{f.__qualname__}'] = MemoizeStats()
+
+    def get_cache():
+        caches = g.setdefault('_memoize_caches', {})
+        return caches.setdefault(f, {})
+
     @wraps(f)
     def wrapper(*args, **kwargs):
-        arg_string = f'{f.__name__}{args}{kwargs}'
-        if arg_string not in g:
-            setattr(g, arg_string, f(*args, **kwargs))
-        return getattr(g, arg_string)
+        if not has_app_context():
+            return f(*args, **kwargs)
+        key = tuple(memoize_key(arg) for arg in args)
+        if kwargs:
+            key = (key, tuple(sorted((name, memoize_key(value))
+                                     for name, value in kwargs.items())))
+        cache = get_cache()
+        try:
+            result = cache[key]
+        except KeyError:
+            stats.misses += 1
+            result = cache[key] = f(*args, **kwargs)
+        else:
+            stats.hits += 1
+        return result
+
+    def cache_clear():
+        if has_app_context():
+            get_cache().clear()
+
+    wrapper.stats = stats
+    wrapper.cache_clear = cache_clear
     return wrapper
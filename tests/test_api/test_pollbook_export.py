@@ -0,0 +1,88 @@
+import csv
+import io
+import json
+import uuid
+
+import pytest
+from werkzeug.exceptions import Forbidden, NotFound
+
+import evalg.api.pollbook
+from evalg.api.pollbook import make_voter_export
+
+
+@pytest.fixture
+def export_pollbook(election_group_generator):
+    election_group = election_group_generator(owner=True,
+                                              running=True,
+                                              election_type='uio_stv',
+                                              with_self_added_voters=True,
+                                              voters_with_votes=True)
+    return election_group.elections[0].pollbooks[0]
+
+
+def read_export(db_session, user, pollbook, export_format):
+    """Read the streamed body of an export, one chunk at a time."""
+    response = make_voter_export(db_session, user, pollbook.id, export_format)
+    assert response.is_streamed
+    return response, list(response.response)
+
+
+def get_expected_voters(pollbook):
+    return sorted(
+        [x.id_type, x.id_value, x.has_voted, x.verified_status.value]
+        for x in pollbook.voters)
+
+
+def test_export_voters_csv(db_session,
+                           logged_in_user,
+                           export_pollbook,
+                           monkeypatch):
+    monkeypatch.setattr(evalg.api.pollbook, 'CHUNK_SIZE', 3)
+    expected = get_expected_voters(export_pollbook)
+    assert any(x[2] for x in expected)
+    assert any(not x[2] for x in expected)
+
+    response, chunks = read_export(
+        db_session, logged_in_user, export_pollbook, 'csv')
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'] == (
+        'attachment; filename="voters-{}.csv"'.format(export_pollbook.id))
+    assert len(chunks) > 1
+    rows = list(csv.reader(io.StringIO("".join(chunks))))
+    assert rows[0] == ['id_type', 'id_value', 'has_voted', 'verified_status']
+    assert sorted(rows[1:]) == sorted(
+        [id_type, id_value, str(has_voted), status]
+        for id_type, id_value, has_voted, status in expected)
+
+
+def test_export_voters_ndjson(db_session,
+                              logged_in_user,
+                              export_pollbook,
+                              monkeypatch):
+    monkeypatch.setattr(evalg.api.pollbook, 'CHUNK_SIZE', 3)
+    expected = get_expected_voters(export_pollbook)
+
+    response, chunks = read_export(
+        db_session, logged_in_user, export_pollbook, 'ndjson')
+    assert response.mimetype == 'application/x-ndjson'
+    assert len(chunks) > 1
+    assert all(x.endswith('\n') for x in chunks)
+    lines = "".join(chunks).splitlines()
+    assert len(lines) == len(expected)
+    assert sorted(
+        [x['id_type'], x['id_value'], x['has_voted'], x['verified_status']]
+        for x in map(json.loads, lines)) == expected
+
+
+def test_export_voters_denied(db_session,
+                              logged_in_user,
+                              election_group_generator):
+    election_group = election_group_generator(owner=False)
+    pollbook = election_group.elections[0].pollbooks[0]
+    with pytest.raises(Forbidden):
+        make_voter_export(db_session, logged_in_user, pollbook.id, 'csv')
+
+
+def test_export_voters_not_found(db_session, logged_in_user):
+    with pytest.raises(NotFound):
+        make_voter_export(db_session, logged_in_user, uuid.uuid4(), 'csv')
@@ -49,3 +49,43 @@ def test_object_types_permission_controlled(app):
                             object_type_name])
         assert (object_type._meta.default_resolver.__name__ ==
                 permissions.permission_controlled_default_resolver.__name__)
+
+
+def test_compile_permissions():
+    compiled = permissions.compile_permissions({
+        'Voter': {
+            'id_value': 'can_view_voter',
+            'reason': 'allow',
+            'tag': 'no_such_permission',
+        },
+        'Group': None,
+    })
+    voter = compiled['Voter']
+    assert voter['idValue'] is permissions.can_view_voter
+    assert voter['reason'] is permissions.allow
+    assert voter['tag'] is permissions.deny
+    assert voter['pollbookId'] is permissions.deny
+    assert compiled['Group']['name'] is permissions.deny
+
+
+def test_check_permission_memoized(app, db_session, persons):
+    person = next(iter(persons.values()))
+    calls = []
+
+    def checker(session, user, source, **kwargs):
+        calls.append(source)
+        return True
+
+    with app.app_context():
+        for path in (['a'], ['b']):
+            assert permissions.check_permission(
+                checker, db_session, None, person, path=path)
+        assert len(calls) == 1
+        assert permissions.check_permission(
+            checker, db_session, None, person, path=['c'], arg=1)
+        assert len(calls) == 2
+        # objects that are not database objects are not memoized
+        source = {'id': 1}
+        for _ in range(2):
+            permissions.check_permission(checker, db_session, None, source)
+        assert len(calls) == 4
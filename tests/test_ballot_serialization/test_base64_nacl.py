@@ -1,11 +1,19 @@
 """Tests for the base64-nacl serializer."""
+import concurrent.futures
 import json
+import logging
+import pickle
+
 import pytest
 
 from nacl.exceptions import CryptoError
 from nacl.public import PublicKey, PrivateKey
 from nacl.utils import EncryptedMessage
 
+from evalg.ballot_serializer.ballot_serializer_base import (
+    init_deserialize_worker,
+)
+
 
 def test_base64_nacl_encoding(ballot_serializer):
     """Test correct encoding and decoding."""
@@ -108,3 +116,42 @@ def test_base64_nacl_corrupt_data(ballot_serializer, ballot):
     corrupt_ballot = EncryptedMessage(tmp)
     with pytest.raises(CryptoError):
         ballot_serializer.deserialize(corrupt_ballot)
+
+
+def test_base64_nacl_serialize_many(ballot_serializer, ballot):
+    """Test serializing/deserializing a batch of ballots."""
+    ballots = [dict(ballot, n=n) for n in range(10)]
+    serialized = [bytes(data) for data in
+                  ballot_serializer.serialize_many(
+                      [b.copy() for b in ballots])]
+    assert len(serialized) == len(ballots)
+    deserialized = list(
+        ballot_serializer.deserialize_many(serialized, chunk_size=3))
+    assert deserialized == ballots
+
+
+def test_base64_nacl_deserialize_many_executor(ballot_serializer, ballot,
+                                               caplog):
+    """Test deserializing a batch of ballots in an executor."""
+    ballots = [dict(ballot, n=n) for n in range(10)]
+    serialized = [bytes(ballot_serializer.serialize(b.copy()))
+                  for b in ballots]
+    caplog.set_level(logging.DEBUG,
+                     logger='evalg.ballot_serializer.ballot_serializer_base')
+    with concurrent.futures.ThreadPoolExecutor(
+            max_workers=2,
+            initializer=init_deserialize_worker,
+            initargs=(ballot_serializer,)) as executor:
+        deserialized = list(ballot_serializer.deserialize_many(
+            serialized, executor=executor, chunk_size=3))
+    assert deserialized == ballots
+    # one timing record per chunk
+    assert len([r for r in caplog.records
+                if r.getMessage().startswith('Deserialized chunk')]) == 4
+
+
+def test_base64_nacl_pickle(ballot_serializer, ballot):
+    """Test that a serializer can be sent to a worker process."""
+    serialized = bytes(ballot_serializer.serialize(ballot.copy()))
+    unpickled_serializer = pickle.loads(pickle.dumps(ballot_serializer))
+    assert unpickled_serializer.deserialize(serialized) == ballot
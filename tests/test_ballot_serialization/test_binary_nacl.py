@@ -0,0 +1,70 @@
+"""Tests for the binary-nacl serializer."""
+import io
+
+import pytest
+
+from nacl.exceptions import CryptoError
+
+from evalg.ballot_serializer.binary_nacl import (
+    BinaryNaClSerializer,
+    decode_value,
+    encode_value,
+)
+
+
+@pytest.fixture
+def binary_serializer(config, election_keys):
+    return BinaryNaClSerializer(
+        envelope_padded_len=config.ENVELOPE_PADDED_LEN,
+        **election_keys
+    )
+
+
+@pytest.mark.parametrize('value', [
+    None,
+    True,
+    False,
+    0,
+    -1,
+    2 ** 40,
+    -300,
+    1.5,
+    '',
+    'Test 123 øæå £$@đðþß',
+    '583cb3dd-676c-43c5-8811-431be577d26c',
+    '583CB3DD-676C-43C5-8811-431BE577D26C',
+    [1, 'a', [None]],
+    {'a': {'b': [True, '1c93109b-54eb-48d0-aa01-02c5d3bc0599']}},
+])
+def test_binary_encoding(value):
+    buffer = io.BytesIO()
+    encode_value(buffer, value)
+    assert decode_value(io.BytesIO(buffer.getvalue())) == value
+
+
+def test_binary_nacl_padding(binary_serializer, ballot, config):
+    encoded = binary_serializer._pad(binary_serializer._encode(ballot))
+    assert len(encoded) == config.ENVELOPE_PADDED_LEN
+    assert binary_serializer._decode(encoded) == ballot
+
+
+def test_binary_nacl_serializer(binary_serializer, ballot, config):
+    ballot_serialized = binary_serializer.serialize(ballot)
+    assert isinstance(ballot_serialized, bytes)
+    # nonce, padded ballot and MAC, without any base64 encoding
+    assert len(ballot_serialized) == 24 + config.ENVELOPE_PADDED_LEN + 16
+    assert binary_serializer.deserialize(ballot_serialized) == ballot
+
+
+def test_binary_nacl_smaller_than_base64(binary_serializer,
+                                         ballot_serializer,
+                                         ballot):
+    assert (len(binary_serializer.serialize(ballot)) <
+            len(bytes(ballot_serializer.serialize(ballot.copy()))))
+
+
+def test_binary_nacl_corrupt_data(binary_serializer, ballot):
+    tmp = bytearray(binary_serializer.serialize(ballot))
+    tmp[-10] = 65 if tmp[-10] != 65 else 66
+    with pytest.raises(CryptoError):
+        binary_serializer.deserialize(bytes(tmp))
@@ -0,0 +1,84 @@
+"""Tests for the ballot serializer factory."""
+import pytest
+from nacl.public import PrivateKey
+
+from evalg.ballot_serializer import base64_nacl
+from evalg.ballot_serializer.base64_nacl import Base64NaClSerializer
+from evalg.ballot_serializer.factory import (
+    UnknownEnvelopeTypeError,
+    get_serializer,
+    invalidate_public_key,
+)
+
+
+def test_get_serializer(election_keys, ballot, config):
+    serializer = get_serializer('base64-nacl',
+                                envelope_padded_len=config.ENVELOPE_PADDED_LEN,
+                                **election_keys)
+    assert isinstance(serializer, Base64NaClSerializer)
+    assert serializer.envelope_type == 'base64-nacl'
+    ballot_serialized = serializer.serialize(ballot.copy())
+    assert serializer.deserialize(bytes(ballot_serialized)) == ballot
+
+
+def test_get_serializer_unknown_envelope_type(election_keys):
+    with pytest.raises(UnknownEnvelopeTypeError):
+        get_serializer('rot13', **election_keys)
+
+
+@pytest.fixture
+def box_cache():
+    base64_nacl.invalidate_boxes()
+    yield base64_nacl._box_cache
+    base64_nacl.invalidate_boxes()
+
+
+def test_serializers_share_encryption_boxes(election_keys, box_cache):
+    serializer = get_serializer('base64-nacl', **election_keys)
+    other_serializer = get_serializer('base64-nacl', **election_keys)
+    assert serializer._encryption_box is other_serializer._encryption_box
+    # boxes made from election private keys are never cached
+    assert serializer._decryption_box is not other_serializer._decryption_box
+    assert len(box_cache) == 1
+
+
+def test_invalidate_public_key(election_keys, box_cache):
+    serializer = get_serializer('base64-nacl', **election_keys)
+    invalidate_public_key(election_keys['election_public_key'])
+    assert not box_cache
+    other_serializer = get_serializer('base64-nacl', **election_keys)
+    assert serializer._encryption_box is not other_serializer._encryption_box
+
+
+def test_cached_box_does_not_load_backend_private_key(election_keys,
+                                                      box_cache,
+                                                      monkeypatch):
+    keys = {'election_public_key': election_keys['election_public_key'],
+            'backend_private_key': election_keys['backend_private_key']}
+    get_serializer('base64-nacl', **keys)
+    loaded = []
+    load_key = base64_nacl.load_key
+
+    def counting_load_key(key, key_class):
+        loaded.append(key_class)
+        return load_key(key, key_class)
+
+    monkeypatch.setattr(base64_nacl, 'load_key', counting_load_key)
+    serializer = get_serializer('base64-nacl', **keys)
+    assert serializer.serialize({'isBlankVote': True})
+    assert PrivateKey not in loaded
+
+
+def test_box_cache_evicts_least_recently_used(election_keys,
+                                              box_cache,
+                                              monkeypatch):
+    monkeypatch.setattr(base64_nacl, 'BOX_CACHE_SIZE', 2)
+    backend_private_key = election_keys['backend_private_key']
+    public_keys = [PrivateKey.generate().public_key for _ in range(3)]
+    box = base64_nacl.get_encryption_box(backend_private_key, public_keys[0])
+    base64_nacl.get_encryption_box(backend_private_key, public_keys[1])
+    assert base64_nacl.get_encryption_box(backend_private_key,
+                                          public_keys[0]) is box
+    base64_nacl.get_encryption_box(backend_private_key, public_keys[2])
+    assert [cache_key[0] for cache_key in box_cache] == [
+        bytes(public_keys[0]), bytes(public_keys[2])]
@@ -327,3 +327,29 @@ def test_uid_non_posix(uid_not_posix_txt_builder):
     file = uid_not_posix_txt_builder.files['file']
     with pytest.raises(ValueError):
         cparser.CensusFileParser.factory(file.read(), file.mimetype)
+
+
+def test_parse_large_file():
+    """Test that ids after the sample are deduplicated."""
+    ids = ['user{}'.format(i) for i in range(cparser.SAMPLE_SIZE * 2)]
+    ids.extend(['User1', 'user2'])
+    parser = cparser.CensusFileParser.factory('\n'.join(ids).encode(),
+                                              'text/plain')
+    assert parser.id_type == 'feide_id'
+    result = list(parser.parse())
+    assert len(result) == cparser.SAMPLE_SIZE * 2
+    assert len(set(result)) == len(result)
+
+
+def test_ids_mix_after_sample():
+    """Test that a mix of id types after the sample is rejected."""
+    ids = ['user{}'.format(i) for i in range(cparser.SAMPLE_SIZE * 2)]
+    ids.extend(['pederaas@uio.no', 'user2'])
+    census_file = '\n'.join(ids).encode()
+    with pytest.raises(ValueError):
+        cparser.CensusFileParser.factory(census_file, 'text/plain')
+
+    parser = cparser.CensusFileParser.factory(census_file, 'text/plain',
+                                              validate=False)
+    with pytest.raises(ValueError):
+        list(parser.parse())
@@ -0,0 +1,36 @@
+"""Tests for the ballot profile used by the counting algorithms"""
+import decimal
+
+from evalg.counting import profile
+from evalg.counting.standalone import Ballot, Candidate, Pollbook
+
+
+def test_get_ballot_profile():
+    pollbook_a = Pollbook('a', 'A', decimal.Decimal(1))
+    pollbook_b = Pollbook('b', 'B', decimal.Decimal(1))
+    cand_1 = Candidate('1', 'Candidate 1')
+    cand_2 = Candidate('2', 'Candidate 2')
+    ballots = [
+        Ballot(pollbook_a, [cand_1, cand_2]),
+        Ballot(pollbook_a, [cand_2, cand_1]),
+        Ballot(pollbook_a, [cand_1, cand_2]),
+        Ballot(pollbook_b, [cand_1, cand_2]),
+        Ballot(pollbook_a, []),
+        Ballot(pollbook_a, [cand_1, cand_2]),
+    ]
+    ballot_profile = profile.get_ballot_profile(ballots)
+
+    # identical (pollbook, ranking) ballots are collapsed in first-seen order
+    assert [(b.pollbook, b.candidates, b.multiplicity)
+            for b in ballot_profile] == [
+        (pollbook_a, (cand_1, cand_2), 3),
+        (pollbook_a, (cand_2, cand_1), 1),
+        (pollbook_b, (cand_1, cand_2), 1),
+        (pollbook_a, (), 1),
+    ]
+    assert profile.count_ballots(ballot_profile) == len(ballots)
+    assert profile.count_ballots(ballots) == len(ballots)
+
+    # collapsing a profile again merges the counts
+    merged = profile.get_ballot_profile(ballot_profile + ballot_profile)
+    assert [b.multiplicity for b in merged] == [6, 2, 2, 2]
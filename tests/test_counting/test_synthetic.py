@@ -0,0 +1,38 @@
+"""Tests for the synthetic elections"""
+import pytest
+
+from evalg.counting import synthetic
+
+
+def test_get_election_dict_is_reproducible():
+    election_dict = synthetic.get_election_dict('uio_stv',
+                                                nr_of_ballots=50,
+                                                quotas=True,
+                                                pollbook_weights=(53, 47),
+                                                seed=1)
+    assert election_dict == synthetic.get_election_dict(
+        'uio_stv',
+        nr_of_ballots=50,
+        quotas=True,
+        pollbook_weights=(53, 47),
+        seed=1)
+    assert len(election_dict['ballots']) == 50
+    assert len(election_dict['pollbookWeights']) == 2
+    assert len(election_dict['quotas']) == 2
+
+
+@pytest.mark.parametrize('ballot_length', synthetic.BALLOT_LENGTHS)
+def test_ballot_length(ballot_length):
+    election_dict = synthetic.get_election_dict(nr_of_ballots=100,
+                                                nr_of_candidates=5,
+                                                ballot_length=ballot_length,
+                                                blank_ratio=0)
+    lengths = {len(ballot['rankedCandidateIds'])
+               for ballot in election_dict['ballots']}
+    assert lengths
+    assert all(1 <= length <= 5 for length in lengths)
+    if ballot_length == 'full':
+        assert lengths == {5}
+    elif ballot_length == 'single':
+        assert lengths == {1}
+
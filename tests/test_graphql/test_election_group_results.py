@@ -5,6 +5,8 @@ Election Group Count and Election Results.
 """
 
 from evalg.graphql import get_context
+from evalg.models.election_group_count import ElectionGroupCount
+from evalg.proc.count import ElectionGroupCounter
 
 
 # Election Group Count
@@ -22,6 +24,7 @@ def test_query_election_group_count_by_id(client,
         electionGroupCount(id: $id) {
             id
             groupId
+            metrics
             electionGroup {
                 id
             }
@@ -34,6 +37,7 @@ def test_query_election_group_count_by_id(client,
     response = execution['data']['electionGroupCount']
     assert str(election_group_count.id) == response['id']
     assert str(election_group_count.group_id) == response['groupId']
+    assert response['metrics'] == election_group_count.metrics
 
 
 def test_mutation_start_election_group_count(client,
@@ -64,6 +68,74 @@ def test_mutation_start_election_group_count(client,
     assert result['success']
 
 
+def test_mutation_start_election_group_count_async(app,
+                                                   client,
+                                                   db_session,
+                                                   election_group_generator,
+                                                   election_keys,
+                                                   celery_app,
+                                                   monkeypatch):
+    """The count is handed to a celery task when COUNT_ASYNC is set."""
+    tasks = []
+    monkeypatch.setitem(app.config, 'COUNT_ASYNC', True)
+    monkeypatch.setattr(
+        'evalg.tasks.flask_celery.make_celery', lambda a: celery_app)
+    monkeypatch.setattr(
+        'evalg.tasks.celery_worker.count_election_group_task.delay',
+        lambda *args: tasks.append(args))
+
+    election_group = election_group_generator(owner=True,
+                                              countable=True,
+                                              with_key=True)
+    variables = {
+        'id': str(election_group.id),
+        'electionKey': election_keys['private']
+    }
+    mutation = """
+        mutation startElectionGroupCount($id: UUID!, $electionKey: String!) {
+            startElectionGroupCount(id: $id, electionKey: $electionKey) {
+                success
+                electionGroupCountId
+            }
+        }
+        """
+    context = get_context()
+    execution = client.execute(mutation, variables=variables, context=context)
+    assert not execution.get('errors')
+    result = execution['data']['startElectionGroupCount']
+    assert result['success']
+
+    election_group_count = db_session.query(ElectionGroupCount).get(
+        result['electionGroupCountId'])
+    assert election_group_count.phase == 'queued'
+    assert election_group_count.status == 'ongoing'
+    assert len(tasks) == 1
+    assert tasks[0][0] == result['electionGroupCountId']
+    assert election_keys['private'] not in tasks[0][1]
+    assert tasks[0][3] is False
+
+
+def test_count_election_group_task_invalid_key(app,
+                                               db_session,
+                                               election_group_generator,
+                                               election_keys,
+                                               celery_app,
+                                               monkeypatch):
+    """A count task that cannot unseal the election key fails the count."""
+    monkeypatch.setattr(
+        'evalg.tasks.flask_celery.make_celery', lambda a: celery_app)
+    from evalg.tasks.celery_worker import count_election_group_task
+
+    election_group = election_group_generator(owner=True, countable=True)
+    count = ElectionGroupCounter(
+        db_session, election_group.id, election_keys['private']
+    ).log_start_count()
+    result = count_election_group_task.apply(args=(str(count.id), 'invalid'))
+    assert result.failed()
+    db_session.refresh(count)
+    assert count.status == 'failed'
+
+
 def test_mutation_start_election_group_count_responses(
         client,
         db_session,
@@ -887,7 +887,7 @@ def test_auth_upload_census_file(db_session,
         'evalg.tasks.flask_celery.make_celery', lambda a: celery_app)
     monkeypatch.setattr(
         'evalg.tasks.celery_worker.import_census_file_task.delay',
-        lambda x, y: f"Patched {x}-{y}")
+        lambda x: f"Patched {x}")
 
     election_group = election_group_generator(owner=is_owner)
     pollbook = election_group.elections[0].pollbooks[0]
@@ -1,6 +1,9 @@
 
 
-from evalg.graphql import get_context
+import sqlalchemy.event
+
+from evalg.graphql import get_context, get_test_context
+from evalg.proc.pollbook import ElectionVoterPolicy
 
 
 def test_pollbook_voting_report(client,
@@ -61,3 +64,77 @@ def test_pollbook_voting_report(client,
     for voter in pollbook_res['votersWithoutVote']:
         assert voter['id'] not in voters_with_vote_ids
         assert voter['id'] in voters_without_vote_ids
+
+
+def test_voter_fields_batched(client,
+                              db_session,
+                              logged_in_user,
+                              election_group_generator,
+                              person_generator):
+    """Test that hasVoted and person are loaded in one query per level."""
+    election_group = election_group_generator(owner=True,
+                                              countable=True,
+                                              election_type='uio_stv',
+                                              voters_with_votes=True)
+    pollbook = election_group.elections[0].pollbooks[0]
+    variables = {'id': str(election_group.id)}
+    query = """
+    query electionGroup($id: UUID!) {
+      electionGroup(id: $id) {
+        elections {
+          pollbooks {
+            voters {
+              id
+              hasVoted
+              person {
+                id
+              }
+            }
+          }
+        }
+      }
+    }
+    """
+
+    def execute():
+        statements = []
+
+        def record_statement(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        # the request runs in the test session, on the connection of the
+        # test transaction
+        connection = db_session.connection()
+        sqlalchemy.event.listen(connection, 'before_cursor_execute',
+                                record_statement)
+        try:
+            execution = client.execute(query,
+                                       variables=variables,
+                                       context=get_test_context(db_session))
+        finally:
+            sqlalchemy.event.remove(connection, 'before_cursor_execute',
+                                    record_statement)
+        assert not execution.get('errors')
+        voters = execution['data']['electionGroup']['elections'][0][
+            'pollbooks'][0]['voters']
+        return voters, len(statements)
+
+    # warm up the request caches
+    execute()
+    db_session.expire_all()
+    voters, nr_of_statements = execute()
+    # loading the fields of every voter one by one would need at least two
+    # statements per voter
+    assert 0 < nr_of_statements < 2 * len(voters)
+    has_voted = {str(x.id): x.has_voted for x in pollbook.voters}
+    assert {x['id']: x['hasVoted'] for x in voters} == has_voted
+    assert all(x['person'] for x in voters)
+
+    voter_policy = ElectionVoterPolicy(db_session)
+    for _ in range(len(voters)):
+        voter_policy.add_voter(pollbook, person_generator(), self_added=False)
+    db_session.expire_all()
+    more_voters, more_statements = execute()
+    assert len(more_voters) == 2 * len(voters)
+    assert all(x['person'] for x in more_voters)
+    assert more_statements == nr_of_statements
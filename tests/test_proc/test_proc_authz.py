@@ -1,7 +1,11 @@
 from evalg.models.authorization import PersonPrincipal
-from evalg.proc.authz import (get_or_create_principal,
+from evalg.proc.authz import (find_principals_for_person,
+                              get_or_create_principal,
                               get_person_identifier_principals,
                               get_principals_for_person)
+from evalg.proc.role_cache import (PrincipalCache,
+                                   get_cached_principals,
+                                   principal_cache)
 
 
 def test_get_or_create_principal(db_session, person_generator):
@@ -69,3 +73,51 @@ def test_get_principals_for_person(db_session, person_generator):
     db_session.flush()
     principals = get_principals_for_person(db_session, person)
     assert len(principals) == 2
+
+
+def test_cached_principals(db_session,
+                           person_generator,
+                           group_generator,
+                           make_group_membership,
+                           make_group_principal,
+                           make_role,
+                           election_group_generator):
+    person = person_generator()
+    principal = get_or_create_principal(
+        session=db_session,
+        principal_type='person',
+        person_id=person.id)
+    db_session.flush()
+    principal_cache.invalidate()
+
+    principals = get_cached_principals(db_session, person,
+                                       find_principals_for_person)
+    assert principals == [principal]
+    assert principal_cache.get(person.id) == (principal.id, )
+    assert get_cached_principals(
+        db_session, person, find_principals_for_person) == [principal]
+
+    # a new group membership drops the cached principals of the person
+    group = group_generator(db_session, 'test_cached_principals')
+    group_principal = make_group_principal(group)
+    make_group_membership(db_session, group, person)
+    assert principal_cache.get(person.id) is None
+    principals = get_cached_principals(db_session, person,
+                                       find_principals_for_person)
+    assert principals == [principal, group_principal]
+
+    # so does a new role
+    election_group = election_group_generator()
+    get_cached_principals(db_session, person, find_principals_for_person)
+    assert principal_cache.get(person.id)
+    make_role(election_group, group_principal)
+    assert principal_cache.get(person.id) is None
+
+
+def test_principal_cache_size():
+    cache = PrincipalCache(size=2)
+    for person_id in range(3):
+        cache.set(person_id, [person_id])
+    assert cache.get(0) is None
+    assert cache.get(1) == (1, )
+    assert cache.get(2, ttl=0) is None
@@ -0,0 +1,47 @@
+from evalg.models.candidate import Candidate
+from evalg.proc.ballot_context import (
+    BallotValidationContextCache,
+    get_validation_context,
+    validation_contexts,
+)
+
+
+def test_validation_context(db_session, list_election_group):
+    election = list_election_group.elections[0]
+    context = get_validation_context(db_session, election.id)
+
+    assert context.election_id == election.id
+    assert context.ballot_rules == election.meta["ballot_rules"]
+    assert set(context.list_candidates) == {str(x.id) for x in election.lists}
+    for election_list in election.lists:
+        assert context.list_candidates[str(election_list.id)] == {
+            str(candidate.id) for candidate in election_list.candidates
+        }
+    assert context.candidate_ids == {
+        str(candidate.id) for candidate in election.candidates
+    }
+    assert get_validation_context(db_session, election.id) is context
+
+
+def test_validation_context_ttl(db_session, list_election_group):
+    election = list_election_group.elections[0]
+    cache = BallotValidationContextCache()
+    context = cache.get(db_session, election.id)
+
+    assert cache.get(db_session, election.id) is context
+    assert cache.get(db_session, election.id, ttl=0) is not context
+
+
+def test_validation_context_invalidated(db_session, list_election_group):
+    election = list_election_group.elections[0]
+    election_list = election.lists[0]
+    context = get_validation_context(db_session, election.id)
+
+    candidate = Candidate(name="New candidate")
+    election_list.candidates.append(candidate)
+    db_session.flush()
+
+    new_context = get_validation_context(db_session, election.id)
+    assert new_context is not context
+    assert str(candidate.id) in new_context.candidate_ids
+    validation_contexts.invalidate()
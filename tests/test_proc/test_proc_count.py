@@ -1,6 +1,20 @@
+import concurrent.futures
 
+import evalg.proc.count
+from evalg.ballot_serializer.base64_nacl import Base64NaClSerializer
+from evalg.ballot_serializer.factory import get_serializer
+from evalg.models.election_group_count import COUNT_METRIC_PHASES
 from evalg.models.election_result import ElectionResult
-from evalg.proc.count import ElectionGroupCounter
+from evalg.counting.profile import get_ballot_profile
+from evalg.proc.count import (Ballot,
+                              BallotDecrypter,
+                              BallotIndex,
+                              ElectionGroupCounter,
+                              ListBallot,
+                              seal_election_key,
+                              unseal_election_key)
+from evalg.proc.pollbook import (get_verified_voters_count,
+                                 get_verified_voters_counts)
 
 
 def test_election_group_counter(db_session,
@@ -35,3 +49,274 @@ def test_election_group_counter(db_session,
     assert election_result.result.get('regular_candidates')[0]
     election_group_counter.log_finalize_count(count)
     assert count.status == 'finished'
+
+
+def test_ballot_from_ballot_data():
+    pollbook, candidate_a, candidate_b = object(), object(), object()
+    index = BallotIndex({'p': pollbook}, {'a': candidate_a, 'b': candidate_b})
+    ballots_data = [
+        {'voteType': 'prefElectVote',
+         'isBlankVote': False,
+         'pollbookId': 'p',
+         'rankedCandidateIds': ['b', 'a']},
+        {'voteType': 'prefElectVote',
+         'isBlankVote': False,
+         'pollbookId': 'p',
+         'rankedCandidateIds': ['b', 'a']},
+    ]
+    ballots = [Ballot.from_ballot_data(data, index) for data in ballots_data]
+    assert ballots[0].pollbook is pollbook
+    assert ballots[0].candidates == (candidate_b, candidate_a)
+    assert [ballot.ballot_data for ballot in ballots] == ballots_data
+    # equal rankings and layouts are shared between ballots
+    assert ballots[0][2] is ballots[1][2]
+    assert ballots[0][3] is ballots[1][3]
+    # tuple ballots are collapsed into one profile ballot
+    ballot_profile = get_ballot_profile(ballots)
+    assert [b.multiplicity for b in ballot_profile] == [2]
+
+
+def test_list_ballot_from_ballot_data():
+    pollbook, candidate, election_list = object(), object(), object()
+    index = BallotIndex({'p': pollbook}, {'c': candidate}, {'l': election_list})
+    ballot_data = {
+        'voteType': 'SPListElecVote',
+        'chosenListId': 'l',
+        'isBlankVote': False,
+        'personalVotesOtherParty': [],
+        'personalVotesSameParty': [{'candidate': 'c', 'cumulated': True}],
+        'pollbookId': 'p',
+    }
+    ballot = ListBallot.from_ballot_data(ballot_data, index)
+    assert ballot.chosen_list is election_list
+    assert ballot.candidates
+    assert ballot.personal_votes_same == [
+        {'candidate': candidate, 'cumulated': True}]
+    assert ballot.ballot_data == ballot_data
+
+    blank_ballot_data = dict(ballot_data,
+                             chosenListId='',
+                             isBlankVote=True,
+                             personalVotesSameParty=[])
+    blank_ballot = ListBallot.from_ballot_data(blank_ballot_data, index)
+    assert blank_ballot.chosen_list is None
+    assert not blank_ballot.candidates
+    assert blank_ballot.ballot_data == blank_ballot_data
+
+
+def test_ballot_decrypter_pool_keeps_order(config, election_keys):
+    serializer_args = dict(
+        election_private_key=election_keys['private'],
+        election_public_key=election_keys['public'],
+        backend_private_key=config.BACKEND_PRIVATE_KEY,
+        backend_public_key=config.BACKEND_PUBLIC_KEY,
+        envelope_padded_len=config.ENVELOPE_PADDED_LEN,
+    )
+    serializer = Base64NaClSerializer(**serializer_args)
+    envelope_data = [serializer.serialize({'n': n}) for n in range(25)]
+
+    with BallotDecrypter(serializer,
+                         serializer_args,
+                         processes=2,
+                         chunk_size=4) as decrypter:
+        ballots = decrypter.decrypt(envelope_data)
+
+    with BallotDecrypter(serializer, serializer_args) as decrypter:
+        serial_ballots = decrypter.decrypt(envelope_data)
+
+    assert [ballot['n'] for ballot in ballots] == list(range(25))
+    assert ballots == serial_ballots
+
+
+def test_election_group_counter_ballot_data_batches(db_session,
+                                                    election_group_generator,
+                                                    election_keys):
+    election_group = election_group_generator(owner=True,
+                                              countable=True,
+                                              voters_with_votes=True)
+    election_group_counter = ElectionGroupCounter(db_session,
+                                                  election_group.id,
+                                                  election_keys['private'],
+                                                  test_mode=True)
+    election = election_group_counter.group.elections[0]
+    pollbook_ids = set(pollbook.id for pollbook in election.pollbooks)
+    all_data = list(
+        election_group_counter.get_ballot_data_batches(election))
+    batches = list(
+        election_group_counter.get_ballot_data_batches(election, 2))
+
+    assert len(all_data) == 1
+    assert all(0 < len(batch) <= 2 for batch in batches)
+    assert all(pollbook_id in pollbook_ids for pollbook_id, *_ in all_data[0])
+    assert sorted(row for batch in batches for row in batch) == sorted(
+        all_data[0])
+
+
+def test_get_verified_voters_counts(db_session, election_group_generator):
+    election_group = election_group_generator(multiple=True,
+                                              voters_with_votes=True)
+    pollbooks = [pollbook
+                 for election in election_group.elections
+                 for pollbook in election.pollbooks]
+    counts = get_verified_voters_counts(
+        db_session, [pollbook.id for pollbook in pollbooks])
+
+    for pollbook in pollbooks:
+        assert counts.get(pollbook.id, 0) == get_verified_voters_count(
+            db_session, pollbook.id)
+
+
+def test_election_group_counter_count(db_session,
+                                      election_group_generator,
+                                      election_keys):
+    election_group = election_group_generator(owner=True,
+                                              multiple=True,
+                                              countable=True,
+                                              voters_with_votes=True)
+    election_group_counter = ElectionGroupCounter(db_session,
+                                                  election_group.id,
+                                                  election_keys['private'],
+                                                  test_mode=True)
+    count = election_group_counter.log_start_count()
+    assert count.phase == 'queued'
+    assert count.progress == 0
+
+    election_group_counter.count(count, 'Test Runner')
+    assert count.status == 'finished'
+    assert count.phase == 'finished'
+    assert count.progress == 100
+    assert count.election_results
+
+    metrics = count.metrics
+    assert metrics['ballots_count'] == sum(
+        len(election.ballots)
+        for election in election_group_counter.get_closed_elections())
+    assert set(metrics['phases']) == set(COUNT_METRIC_PHASES)
+    for result in count.election_results:
+        election_metrics = metrics['elections'][str(result.election_id)]
+        assert election_metrics['phases']['tally'] >= 0
+        assert election_metrics['phases']['persist'] >= 0
+        assert 'memory_growth_kib' in election_metrics
+
+
+def test_seal_election_key(config, election_keys):
+    sealed_key = seal_election_key(election_keys['private'],
+                                   config.BACKEND_PUBLIC_KEY)
+    assert election_keys['private'] not in sealed_key
+    assert unseal_election_key(
+        sealed_key, config.BACKEND_PRIVATE_KEY) == election_keys['private']
+
+
+def test_election_group_counter_count_parallel_fallback(
+        app,
+        db_session,
+        election_group_generator,
+        election_keys,
+        monkeypatch):
+    """
+    Elections that fail in a worker process are counted in-process.
+
+    The workers can't see the in-memory test database, so every election
+    is recounted by the parent.
+    """
+    monkeypatch.setitem(app.config, 'COUNT_ELECTION_PROCESSES', 2)
+    election_group = election_group_generator(owner=True,
+                                              multiple=True,
+                                              countable=True,
+                                              voters_with_votes=True)
+    election_group_counter = ElectionGroupCounter(db_session,
+                                                  election_group.id,
+                                                  election_keys['private'],
+                                                  test_mode=True)
+    count = election_group_counter.log_start_count()
+    election_group_counter.count(count, 'Test Runner')
+
+    closed_elections = election_group_counter.get_closed_elections()
+    assert count.status == 'finished'
+    assert (sorted(result.election_id for result in count.election_results) ==
+            sorted(election.id for election in closed_elections))
+
+
+class InlineExecutor(concurrent.futures.Executor):
+    """
+    Runs the election count jobs in the test process and session.
+
+    The worker processes can't see the in-memory test database.
+    """
+
+    session = None
+    submitted = []
+
+    def __init__(self, max_workers, mp_context, initializer, initargs):
+        config, group_id, election_key, test_mode = initargs
+        evalg.proc.count._count_worker.update(group_id=group_id,
+                                              election_key=election_key,
+                                              test_mode=test_mode)
+
+    def submit(self, fn, election_id):
+        self.submitted.append(election_id)
+        future = concurrent.futures.Future()
+        future.set_result(evalg.proc.count._count_election(
+            self.session, election_id))
+        return future
+
+
+def test_election_group_counter_count_parallel(
+        app,
+        db_session,
+        election_group_generator,
+        election_keys,
+        monkeypatch):
+    """Elections counted by the workers are stored by the count process."""
+    monkeypatch.setitem(app.config, 'COUNT_ELECTION_PROCESSES', 2)
+    monkeypatch.setattr(evalg.proc.count, '_count_worker', {})
+    monkeypatch.setattr(InlineExecutor, 'session', db_session)
+    monkeypatch.setattr(InlineExecutor, 'submitted', [])
+    monkeypatch.setattr(concurrent.futures, 'ProcessPoolExecutor',
+                        InlineExecutor)
+    election_group = election_group_generator(owner=True,
+                                              multiple=True,
+                                              countable=True,
+                                              voters_with_votes=True)
+    election_group_counter = ElectionGroupCounter(db_session,
+                                                  election_group.id,
+                                                  election_keys['private'],
+                                                  test_mode=True)
+
+    def recount(*args, **kwargs):
+        raise AssertionError('election recounted in-process')
+
+    monkeypatch.setattr(election_group_counter, 'generate_results', recount)
+    count = election_group_counter.log_start_count()
+    election_group_counter.count(count, 'Test Runner')
+
+    closed_elections = election_group_counter.get_closed_elections()
+    assert len(closed_elections) > 1
+    assert (sorted(InlineExecutor.submitted) ==
+            sorted(election.id for election in closed_elections))
+    assert count.status == 'finished'
+    assert (sorted(result.election_id for result in count.election_results) ==
+            sorted(election.id for election in closed_elections))
+    assert set(count.metrics['elections']) == set(
+        str(election.id) for election in closed_elections)
+
+
+def test_ballot_decrypter_envelope_types(config, election_keys):
+    serializer_args = dict(
+        election_private_key=election_keys['private'],
+        election_public_key=election_keys['public'],
+        backend_private_key=config.BACKEND_PRIVATE_KEY,
+        backend_public_key=config.BACKEND_PUBLIC_KEY,
+        envelope_padded_len=config.ENVELOPE_PADDED_LEN,
+    )
+    serializers = [get_serializer(envelope_type, **serializer_args)
+                   for envelope_type in ('base64-nacl', 'binary-nacl')]
+    envelopes = [
+        (serializers[n % 2].envelope_type,
+         bytes(serializers[n % 2].serialize({'n': n})))
+        for n in range(10)]
+
+    with BallotDecrypter(serializers[0], serializer_args) as decrypter:
+        ballots = decrypter.decrypt_envelopes(envelopes)
+
+    assert [ballot['n'] for ballot in ballots] == list(range(10))
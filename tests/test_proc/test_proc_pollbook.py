@@ -0,0 +1,161 @@
+import json
+
+from sqlalchemy_continuum import version_class
+
+from evalg.file_parser.parser import CensusFileParser
+from evalg.models.census_file_import import CensusFileImport
+from evalg.models.pollbook import Pollbook
+from evalg.models.voter import Voter
+from evalg.proc.pollbook import (
+    CachedPollbookVoterPolicy,
+    add_census_voters,
+    get_election_pollbook_stats,
+    get_pollbook_stats,
+    import_census_file,
+)
+
+
+def test_pollbook_stats(db_session, election_group_generator):
+    """The aggregated counts match the voters of the pollbooks."""
+    election_group = election_group_generator(
+        owner=True,
+        running=True,
+        election_type="uio_stv",
+        with_self_added_voters=True,
+        voters_with_votes=True,
+    )
+    election = election_group.elections[0]
+    stats = get_election_pollbook_stats(db_session, election)
+    assert set(stats) == set(x.id for x in election.pollbooks)
+    assert any(x.self_added for x in stats.values())
+    assert any(x.verified_with_vote for x in stats.values())
+    assert stats == get_pollbook_stats(db_session,
+                                       [x.id for x in election.pollbooks])
+
+    for pollbook in election.pollbooks:
+        pollbook_stats = stats[pollbook.id]
+        valid_voters = [x for x in pollbook.voters if x.is_valid_voter()]
+        assert pollbook_stats.voters == len(pollbook.voters)
+        assert pollbook_stats.self_added == len(
+            [x for x in pollbook.voters if x.self_added])
+        assert pollbook_stats.admin_added == len(pollbook.voters_admin_added)
+        assert pollbook_stats.verified == len(valid_voters)
+        assert pollbook_stats.verified_with_vote == len(
+            [x for x in valid_voters if x.votes])
+        assert pollbook_stats.verified_without_vote == len(
+            pollbook.valid_voters_without_vote)
+        assert (set(x.id for x in pollbook.valid_voters) ==
+                set(x.id for x in valid_voters))
+
+
+def test_pollbook_stats_empty(db_session, election_group_generator):
+    """Pollbooks without voters are counted as empty."""
+    election_group = election_group_generator(owner=True)
+    election = election_group.elections[0]
+    pollbook = Pollbook(name={'nb': 'empty', 'en': 'empty'})
+    election.pollbooks.append(pollbook)
+    db_session.flush()
+
+    stats = get_pollbook_stats(db_session, [pollbook.id])
+    assert stats[pollbook.id].voters == 0
+    assert stats[pollbook.id].verified_without_vote == 0
+    assert get_election_pollbook_stats(
+        db_session, election)[pollbook.id] == stats[pollbook.id]
+    assert get_pollbook_stats(db_session, []) == {}
+
+
+def test_add_census_voters(db_session, election_group_generator):
+    """Census ids are deduplicated, and inserted with version history."""
+    election_group = election_group_generator(owner=True)
+    pollbook = election_group.elections[0].pollbooks[0]
+    existing = pollbook.voters[0]
+    nr_of_voters = len(pollbook.voters)
+    id_values = ['new1@uio.no', existing.id_value, 'new2@uio.no',
+                 'new1@uio.no', 'new3@uio.no']
+
+    voter_policy = CachedPollbookVoterPolicy(db_session, pollbook)
+    results = add_census_voters(db_session, voter_policy, existing.id_type,
+                                id_values, chunk_size=2)
+    assert results['added_nr'] == 3
+    assert results['already_in_pollbook_nr'] == 2
+    assert sorted(results['already_in_pollbook']) == sorted(
+        [existing.id_value, 'new1@uio.no'])
+
+    db_session.expire(pollbook)
+    assert len(pollbook.voters) == nr_of_voters + 3
+    added = [x for x in pollbook.voters if x.id_value.startswith('new')]
+    assert all(x.verified and not x.self_added and not x.reviewed
+               for x in added)
+    VoterVersion = version_class(Voter)
+    assert db_session.query(VoterVersion).filter(
+        VoterVersion.id.in_([x.id for x in added])).count() == 3
+
+
+def test_import_census_file_resume(db_session, election_group_generator):
+    """An interrupted import continues after the committed entries."""
+    election_group = election_group_generator(owner=True)
+    pollbook = election_group.elections[0].pollbooks[0]
+    uids = ['censususer{}'.format(i) for i in range(5)]
+    feide_ids = ['{}@uio.no'.format(x) for x in uids]
+
+    # the first chunk was committed before the import was interrupted
+    add_census_voters(db_session,
+                      CachedPollbookVoterPolicy(db_session, pollbook),
+                      'feide_id',
+                      feide_ids[:2])
+    census_file = CensusFileImport(pollbook_id=pollbook.id,
+                                   census_file='\n'.join(uids).encode(),
+                                   mime_type='text/plain',
+                                   processed_nr=2,
+                                   added_nr=2,
+                                   already_in_pollbook_nr=0)
+    db_session.add(census_file)
+    db_session.flush()
+
+    parser = CensusFileParser.factory(census_file.census_file, 'text/plain')
+    results = import_census_file(db_session, census_file, parser,
+                                 chunk_size=2)
+    assert results['processed_nr'] == 5
+    assert results['added_nr'] == 5
+    assert results['already_in_pollbook_nr'] == 0
+
+    db_session.refresh(census_file)
+    assert census_file.processed_nr == 5
+    assert census_file.added_nr == 5
+    assert db_session.query(Voter).filter(
+        Voter.pollbook_id == pollbook.id,
+        Voter.id_value.in_(feide_ids)).count() == 5
+
+
+def test_import_census_file_task_invalid_id(app,
+                                            db_session,
+                                            election_group_generator,
+                                            celery_app,
+                                            monkeypatch):
+    """An import that stops at an invalid id is finished as failed."""
+    monkeypatch.setattr(
+        'evalg.tasks.flask_celery.make_celery', lambda a: celery_app)
+    monkeypatch.setitem(app.config, 'CENSUS_IMPORT_CHUNK_SIZE', 50)
+    from evalg.tasks.celery_worker import import_census_file_task
+
+    election_group = election_group_generator(owner=True)
+    pollbook = election_group.elections[0].pollbooks[0]
+    # the id type is found from the first 100 ids, which are valid
+    uids = ['censususer{}'.format(i) for i in range(100)]
+    census_file = CensusFileImport(
+        pollbook_id=pollbook.id,
+        census_file='\n'.join(uids + ['not-a-uid@']).encode(),
+        mime_type='text/plain')
+    db_session.add(census_file)
+    db_session.flush()
+
+    result = import_census_file_task.apply(args=(str(census_file.id), ))
+    assert result.successful()
+    db_session.refresh(census_file)
+    assert census_file.finished_at
+    results = json.loads(census_file.import_results)
+    assert results['status'] == 'failed'
+    assert 'not-a-uid@' in results['error']
+    # the chunks before the invalid id are kept
+    assert results['processed_nr'] == 100
+    assert results['added_nr'] == 100
@@ -1,7 +1,16 @@
+import re
+
 import pytest
+import sqlalchemy.event
 
-from evalg.proc.vote import BallotException
+from evalg.proc.vote import (
+    BallotException,
+    get_election_vote_counts,
+    get_pollbook_vote_counts,
+    rebuild_vote_counts,
+)
 from evalg.models.ballot import Envelope
+from evalg.models.vote_count import PollbookVoteCount
 from evalg.models.votes import Vote
 from evalg.ballot_serializer.base64_nacl import Base64NaClSerializer
 
@@ -85,3 +94,171 @@ def test_vote_validation(
     ballot_data = ballot_data_generator(pollbook, candidates=candidates[:4])
     election_vote_policy = election_vote_policy_generator(voter.id)
     assert not election_vote_policy.verify_ballot_content(ballot_data.copy())
+
+
+def test_add_vote_statements(
+    db_session,
+    election_group_generator,
+    ballot_data_generator,
+    election_vote_policy_generator,
+):
+    """Test that recording a vote only needs a few statements."""
+    election_group = election_group_generator(
+        owner=True,
+        countable=True,
+        election_type="uio_stv",
+        voters_with_votes=False,
+    )
+    pollbook = election_group.elections[0].pollbooks[0]
+    voter = pollbook.voters[0]
+    ballot_data = ballot_data_generator(pollbook)
+    election_vote_policy = election_vote_policy_generator(voter.id)
+
+    statements = []
+
+    def record_statement(conn, cursor, statement, *args):
+        # the version tables of the audit log are not counted
+        if re.search(r"\b(ballots|vote|vote_log)\b", statement):
+            statements.append(statement.split(None, 1)[0].upper())
+
+    # the connection of the test transaction, get_bind() is a mock engine
+    connection = db_session.connection()
+    sqlalchemy.event.listen(connection, "before_cursor_execute",
+                            record_statement)
+    try:
+        first_vote = election_vote_policy.add_vote(ballot_data.copy())
+        first_statements = list(statements)
+        statements.clear()
+        second_vote = election_vote_policy.add_vote(ballot_data.copy())
+        second_statements = list(statements)
+    finally:
+        sqlalchemy.event.remove(connection, "before_cursor_execute",
+                                record_statement)
+
+    # look up the previous vote, insert the envelope, record and vote
+    assert first_statements == ["SELECT", "INSERT", "INSERT", "INSERT"]
+    # the vote is known by the session, and is updated
+    assert sorted(second_statements) == ["INSERT", "INSERT", "UPDATE"]
+    assert second_vote is first_vote
+
+
+def test_add_vote_concurrent_first_vote(
+    db_session,
+    election_group_generator,
+    ballot_data_generator,
+    election_vote_policy_generator,
+    monkeypatch,
+):
+    """Test that a first vote stored by another request is updated."""
+    election_group = election_group_generator(
+        owner=True,
+        countable=True,
+        election_type="uio_stv",
+        voters_with_votes=False,
+    )
+    pollbook = election_group.elections[0].pollbooks[0]
+    voter = pollbook.voters[0]
+    ballot_data = ballot_data_generator(pollbook)
+    election_vote_policy = election_vote_policy_generator(voter.id)
+    other_vote = election_vote_policy.add_vote(ballot_data.copy())
+    other_ballot_id = other_vote.ballot_id
+    # the other vote was stored by another request, and is not in the session
+    db_session.expunge(other_vote)
+
+    make_vote = election_vote_policy.make_vote
+    lookups = []
+
+    def make_vote_after_race(envelope):
+        lookups.append(envelope.id)
+        if len(lookups) == 1:
+            return Vote(voter_id=voter.id, ballot_id=envelope.id)
+        return make_vote(envelope)
+
+    monkeypatch.setattr(election_vote_policy, "make_vote", make_vote_after_race)
+    vote = election_vote_policy.add_vote(ballot_data.copy())
+
+    assert len(lookups) == 2
+    assert vote.ballot_id == lookups[0]
+    assert vote.ballot_id != other_ballot_id
+    assert Envelope.query.get(vote.ballot_id)
+    assert db_session.query(Vote).filter(Vote.voter_id == voter.id).count() == 1
+    assert get_pollbook_vote_counts(db_session, pollbook)["total"] == 1
+
+
+def test_vote_counts(
+    db_session,
+    election_group_generator,
+    ballot_data_generator,
+    election_vote_policy_generator,
+):
+    """Test that the vote counts follow new votes and voter reviews."""
+    election_group = election_group_generator(
+        owner=True,
+        running=True,
+        election_type="uio_stv",
+        with_self_added_voters=True,
+        voters_with_votes=False,
+    )
+    election = election_group.elections[0]
+    pollbook = election.pollbooks[0]
+    self_added_voter = next(v for v in pollbook.voters if v.self_added)
+    census_voter = next(v for v in pollbook.voters if not v.self_added)
+    ballot_data = ballot_data_generator(pollbook)
+
+    assert get_pollbook_vote_counts(db_session, pollbook) == {"total": 0}
+
+    for voter in (self_added_voter, census_voter, census_voter):
+        election_vote_policy_generator(voter.id).add_vote(ballot_data.copy())
+    assert get_pollbook_vote_counts(db_session, pollbook) == {
+        "self_added_not_reviewed": 1,
+        "admin_added_auto_verified": 1,
+        "total": 2,
+    }
+
+    self_added_voter.reviewed = True
+    self_added_voter.verified = True
+    db_session.flush()
+    assert get_election_vote_counts(db_session, election) == {
+        "self_added_verified": 1,
+        "admin_added_auto_verified": 1,
+        "total": 2,
+    }
+
+    vote = db_session.query(Vote).get(census_voter.id)
+    db_session.delete(vote)
+    db_session.flush()
+    # a deleted instance can not be restored when the test is rolled back
+    db_session.expunge(vote)
+    assert get_election_vote_counts(db_session, election) == {
+        "self_added_verified": 1,
+        "total": 1,
+    }
+
+
+def test_rebuild_vote_counts(
+    db_session,
+    election_group_generator,
+):
+    """Test that rebuilding the vote counts corrects them."""
+    election_group = election_group_generator(
+        owner=True,
+        countable=True,
+        election_type="uio_stv",
+        voters_with_votes=True,
+    )
+    election = election_group.elections[0]
+    pollbook = election.pollbooks[0]
+    counts = get_pollbook_vote_counts(db_session, pollbook)
+    assert counts["total"] == len(pollbook.voters) // 2
+
+    db_session.query(PollbookVoteCount).filter(
+        PollbookVoteCount.pollbook_id == pollbook.id
+    ).update({"votes": 0})
+    assert get_pollbook_vote_counts(db_session, pollbook) == {"total": 0}
+
+    corrections = rebuild_vote_counts(db_session, [pollbook.id])
+    assert corrections == [
+        (pollbook.id, "admin_added_auto_verified", 0, counts["total"])
+    ]
+    assert get_pollbook_vote_counts(db_session, pollbook) == counts
+    assert rebuild_vote_counts(db_session) == []
@@ -0,0 +1,36 @@
+"""Tests for evalg.utils."""
+from evalg.utils import flask_request_memoize, memoize_key
+
+
+def test_memoize_key_database_objects(db_session, persons):
+    """Database objects are keyed by primary key, not by repr."""
+    person = next(iter(persons.values()))
+    assert memoize_key(person) == memoize_key(
+        db_session.query(type(person)).get(person.id))
+    assert memoize_key([person]) != memoize_key(person)
+    assert hash(memoize_key({'people': [person], 'ids': {1, 2}}))
+
+
+def test_flask_request_memoize(app):
+    calls = []
+
+    @flask_request_memoize
+    def double(value, factor=2):
+        calls.append(value)
+        return value * factor
+
+    with app.app_context():
+        assert double(2) == 4
+        assert double(2) == 4
+        assert double(2, factor=3) == 6
+        assert double([1]) == [1, 1]
+        assert double([1]) == [1, 1]
+        assert calls == [2, 2, [1]]
+        assert (double.stats.hits, double.stats.misses) == (2, 3)
+        double.cache_clear()
+        assert double(2) == 4
+        assert len(calls) == 4
+
+    with app.app_context():
+        assert double(2) == 4
+        assert len(calls) == 5
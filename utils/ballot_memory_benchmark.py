@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Ballot memory benchmark for eValg
+
+Measures the memory used by the ballots of a synthetic election, for the
+ballot types in evalg.proc.count and for the dict-backed ballot types they
+replaced.
+
+python utils/ballot_memory_benchmark.py -n 100000 -c 15
+"""
+import argparse
+import gc
+import json
+import random
+import sys
+import tracemalloc
+import uuid
+
+from evalg.proc.count import Ballot, BallotIndex, ListBallot
+
+
+class DictBallot:
+    """The previous preferential ballot, keeping the decrypted ballot data"""
+
+    def __init__(self, ballot_data, id2pollbook, id2candidate):
+        self.ballot_data = ballot_data
+        self.pollbook = id2pollbook[ballot_data['pollbookId']]
+        self.candidates = [id2candidate[id] for id in
+                           ballot_data['rankedCandidateIds']]
+
+
+class DictListBallot:
+    """The previous list ballot, keeping the decrypted ballot data"""
+
+    def __init__(self, ballot_data, id2pollbook, id2list, id2candidate):
+        self.ballot_data = ballot_data
+        self.pollbook = id2pollbook[ballot_data['pollbookId']]
+        if ballot_data['chosenListId']:
+            self.chosen_list = id2list[ballot_data['chosenListId']]
+        else:
+            self.chosen_list = None
+        self.personal_votes_same = [
+            {'candidate': id2candidate[vote['candidate']],
+             'cumulated': vote['cumulated']}
+            for vote in ballot_data['personalVotesSameParty']]
+        self.personal_votes_other = [
+            {'candidate': id2candidate[vote['candidate']],
+             'list': id2list[vote['list']]}
+            for vote in ballot_data['personalVotesOtherParty']]
+        self.candidates = [1] if self.chosen_list else []
+
+
+def get_id2objects(number):
+    """
+    :return: `number` objects by their (uuid) id string
+    :rtype: dict
+    """
+    return {str(uuid.uuid4()): object() for _ in range(number)}
+
+
+def get_serialized_ballots(nr_of_ballots,
+                           pollbook_ids,
+                           candidate_ids,
+                           list_ids,
+                           distinct,
+                           seed):
+    """
+    Generates JSON serialized ballots, as they are before decryption
+
+    Preferential ballots are drawn from `distinct` random rankings. List
+    ballots are generated if `list_ids` is given.
+
+    :return: The serialized ballots
+    :rtype: list
+    """
+    rnd = random.Random(seed)
+    candidate_ids = list(candidate_ids)
+    ballots = []
+    if list_ids:
+        for _ in range(distinct):
+            ballots.append({
+                'voteType': 'SPListElecVote',
+                'chosenListId': rnd.choice(list_ids),
+                'isBlankVote': False,
+                'personalVotesOtherParty': [
+                    {'candidate': candidate_id,
+                     'list': rnd.choice(list_ids)}
+                    for candidate_id in rnd.sample(candidate_ids, 2)],
+                'personalVotesSameParty': [
+                    {'candidate': candidate_id, 'cumulated': rnd.random() < .5}
+                    for candidate_id in rnd.sample(candidate_ids, 3)],
+            })
+    else:
+        for _ in range(distinct):
+            ranking = rnd.sample(candidate_ids,
+                                 rnd.randint(0, len(candidate_ids)))
+            ballots.append({
+                'voteType': 'prefElectVote',
+                'isBlankVote': not ranking,
+                'rankedCandidateIds': ranking,
+            })
+    return [json.dumps(dict(rnd.choice(ballots),
+                            pollbookId=rnd.choice(pollbook_ids)))
+            for _ in range(nr_of_ballots)]
+
+
+def measure(make_ballot, serialized_ballots):
+    """
+    Measures the memory kept by the ballots made from `serialized_ballots`
+
+    :return: Size of the ballots in bytes
+    :rtype: int
+    """
+    gc.collect()
+    tracemalloc.start()
+    ballots = [make_ballot(json.loads(data)) for data in serialized_ballots]
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del ballots
+    return size
+
+
+def main(args=None):
+    """Main runtime"""
+    parser = argparse.ArgumentParser(
+        description='The following options are available')
+    parser.add_argument(
+        '-n', '--ballots',
+        metavar='<number>',
+        type=int,
+        dest='ballots',
+        default=100000,
+        help='Number of ballots (default: 100000)')
+    parser.add_argument(
+        '-c', '--candidates',
+        metavar='<number>',
+        type=int,
+        dest='candidates',
+        default=15,
+        help='Number of candidates (default: 15)')
+    parser.add_argument(
+        '-d', '--distinct',
+        metavar='<number>',
+        type=int,
+        dest='distinct',
+        default=500,
+        help='Number of distinct ballots (default: 500)')
+    parser.add_argument(
+        '-l', '--list-election',
+        action='store_true',
+        dest='list_election',
+        default=False,
+        help='Measure list election ballots')
+    parser.add_argument(
+        '-s', '--seed',
+        metavar='<seed>',
+        type=int,
+        dest='seed',
+        default=0,
+        help='Random seed (default: 0)')
+    args = parser.parse_args(args)
+
+    id2pollbook = get_id2objects(2)
+    id2candidate = get_id2objects(args.candidates)
+    id2list = get_id2objects(4) if args.list_election else {}
+    serialized_ballots = get_serialized_ballots(args.ballots,
+                                                list(id2pollbook),
+                                                list(id2candidate),
+                                                list(id2list),
+                                                args.distinct,
+                                                args.seed)
+    index = BallotIndex(id2pollbook, id2candidate, id2list)
+    if args.list_election:
+        old_size = measure(
+            lambda data: DictListBallot(data,
+                                        id2pollbook,
+                                        id2list,
+                                        id2candidate),
+            serialized_ballots)
+        new_size = measure(
+            lambda data: ListBallot.from_ballot_data(data, index),
+            serialized_ballots)
+    else:
+        old_size = measure(
+            lambda data: DictBallot(data, id2pollbook, id2candidate),
+            serialized_ballots)
+        new_size = measure(
+            lambda data: Ballot.from_ballot_data(data, index),
+            serialized_ballots)
+    json.dump({'ballots': args.ballots,
+               'candidates': args.candidates,
+               'distinct': args.distinct,
+               'list_election': args.list_election,
+               'dict_ballots_bytes': old_size,
+               'tuple_ballots_bytes': new_size,
+               'dict_bytes_per_ballot': round(old_size / args.ballots, 1),
+               'tuple_bytes_per_ballot': round(new_size / args.ballots, 1)},
+              sys.stdout,
+              indent=2)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Counting benchmark for eValg
+
+python utils/counting_benchmark.py
+python utils/counting_benchmark.py -t uio_stv -t mntv -n 1000 -n 10000 \
+    --pollbook-weights 53,22,25 --quotas -o benchmark.json
+
+Every run counts a generated election (see evalg.counting.synthetic) once
+for the wall time, and once more with tracemalloc for the peak memory
+allocated by the count. The results are written as JSON, with one entry per
+election type and number of ballots, so that results from different
+revisions can be compared.
+"""
+import argparse
+import datetime
+import gc
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+
+from evalg.counting import synthetic
+from evalg.counting.algorithms import party_list, positional_voting, uitstv
+from evalg.counting.count import Counter
+
+DEFAULT_BALLOTS = (1000, 10000, 100000)
+DEFAULT_LOG_FORMAT = "%(levelname)s: %(message)s"
+DEFAULT_LOG_LEVEL = logging.INFO
+logger = logging.getLogger(__name__)
+
+
+def count_election(election):
+    """
+    Counts an election with its counting algorithm
+
+    :return: The result and protocol dicts
+    :rtype: tuple
+    """
+    if election.type_str in synthetic.LIST_ELECTION_TYPES:
+        result, protocol = party_list.get_result(election)
+    elif election.type_str == 'uit_stv':
+        result, protocol = uitstv.get_result(election)
+    elif election.type_str == 'positional_voting':
+        result, protocol = positional_voting.get_result(election)
+    else:
+        counter = Counter(election, election.ballots, test_mode=True)
+        election_path = counter.count().default_path
+        result = election_path.get_result().to_dict()
+        protocol = election_path.get_protocol()
+    return result, protocol.to_dict()
+
+
+def measure(election, memory=True):
+    """
+    Measures the wall time and peak memory of counting an election
+
+    :param election: The election
+    :type election: object
+
+    :param memory: Also measure the peak memory
+    :type memory: bool
+
+    :return: wall_time_s and peak_memory_bytes
+    :rtype: dict
+    """
+    gc.collect()
+    start = time.perf_counter()
+    count_election(election)
+    wall_time = time.perf_counter() - start
+    peak_memory = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            count_election(election)
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {
+        'wall_time_s': round(wall_time, 4),
+        'peak_memory_bytes': peak_memory,
+    }
+
+
+def run(election_types, ballots, memory=True, **kwargs):
+    """
+    Benchmarks the counting algorithms
+
+    :param election_types: The election types to benchmark
+    :type election_types: collections.abc.Sequence
+
+    :param ballots: The numbers of ballots to benchmark with
+    :type ballots: collections.abc.Sequence
+
+    :param memory: Also measure the peak memory
+    :type memory: bool
+
+    :param kwargs: Arguments for synthetic.get_election()
+
+    :return: One entry per election type and number of ballots
+    :rtype: list
+    """
+    results = []
+    for election_type in election_types:
+        for nr_of_ballots in ballots:
+            election = synthetic.get_election(election_type,
+                                              nr_of_ballots=nr_of_ballots,
+                                              **kwargs)
+            result = {'election_type': election_type,
+                      'ballots': nr_of_ballots}
+            result.update(measure(election, memory=memory))
+            results.append(result)
+            logger.info('%s election with %d ballots: %.3fs',
+                        election_type,
+                        nr_of_ballots,
+                        result['wall_time_s'])
+    return results
+
+
+def main(args=None):
+    """Main runtime"""
+    parser = argparse.ArgumentParser(
+        description='The following options are available')
+    parser.add_argument(
+        '-t', '--type',
+        action='append',
+        choices=synthetic.ELECTION_TYPES,
+        dest='election_types',
+        help='Election type to benchmark (default: all)')
+    parser.add_argument(
+        '-n', '--ballots',
+        action='append',
+        type=int,
+        dest='ballots',
+        help='Number of ballots (default: {})'.format(
+            ', '.join(map(str, DEFAULT_BALLOTS))))
+    parser.add_argument(
+        '-c', '--candidates',
+        type=int,
+        dest='nr_of_candidates',
+        default=10,
+        help='Number of candidates, per list for list elections '
+             '(default: 10)')
+    parser.add_argument(
+        '-s', '--seats',
+        type=int,
+        dest='nr_of_seats',
+        default=2,
+        help='Number of seats (default: 2)')
+    parser.add_argument(
+        '-S', '--substitutes',
+        type=int,
+        dest='nr_of_substitutes',
+        default=0,
+        help='Number of substitutes (default: 0)')
+    parser.add_argument(
+        '-q', '--quotas',
+        action='store_true',
+        dest='quotas',
+        default=False,
+        help='Use gender quotas')
+    parser.add_argument(
+        '-w', '--pollbook-weights',
+        type=lambda value: value.split(','),
+        dest='pollbook_weights',
+        default=['1'],
+        help='Comma separated pollbook weights (default: 1)')
+    parser.add_argument(
+        '-l', '--ballot-length',
+        choices=synthetic.BALLOT_LENGTHS,
+        dest='ballot_length',
+        default='uniform',
+        help='Distribution of the number of ranked candidates '
+             '(default: uniform)')
+    parser.add_argument(
+        '-d', '--distinct-rankings',
+        type=int,
+        dest='distinct_rankings',
+        default=None,
+        help='Draw the rankings from this many distinct rankings')
+    parser.add_argument(
+        '--skew',
+        type=float,
+        dest='skew',
+        default=1.0,
+        help='Popularity skew of the candidates (default: 1.0)')
+    parser.add_argument(
+        '--blank-ratio',
+        type=float,
+        dest='blank_ratio',
+        default=0.02,
+        help='Share of blank ballots (default: 0.02)')
+    parser.add_argument(
+        '--seed',
+        type=int,
+        dest='seed',
+        default=0,
+        help='Random seed (default: 0)')
+    parser.add_argument(
+        '--no-memory',
+        action='store_false',
+        dest='memory',
+        default=True,
+        help='Do not measure peak memory (halves the run time)')
+    parser.add_argument(
+        '-o', '--output',
+        metavar='<filename>',
+        type=str,
+        dest='output',
+        default='',
+        help='Optional .json file to store the results in '
+             '(default: print to stdout)')
+    args = parser.parse_args(args)
+
+    logging.basicConfig(level=DEFAULT_LOG_LEVEL, format=DEFAULT_LOG_FORMAT)
+    # the algorithms log every round at level INFO or DEBUG
+    logging.getLogger('evalg.counting').setLevel(logging.WARNING)
+    parameters = {
+        'nr_of_candidates': args.nr_of_candidates,
+        'nr_of_seats': args.nr_of_seats,
+        'nr_of_substitutes': args.nr_of_substitutes,
+        'quotas': args.quotas,
+        'pollbook_weights': args.pollbook_weights,
+        'ballot_length': args.ballot_length,
+        'distinct_rankings': args.distinct_rankings,
+        'skew': args.skew,
+        'blank_ratio': args.blank_ratio,
+        'seed': args.seed,
+    }
+    started_at = datetime.datetime.now()
+    results = run(args.election_types or synthetic.ELECTION_TYPES,
+                  args.ballots or DEFAULT_BALLOTS,
+                  memory=args.memory,
+                  **parameters)
+    output = {
+        'meta': {
+            'started_at': started_at.isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'parameters': parameters,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(output, output_file, indent=2)
+    else:
+        json.dump(output, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Field permission benchmark for eValg
+
+Resolves the voters of a pollbook through the GraphQL schema as an election
+group admin. The permissions of every field are checked with:
+
+- before: the PERMISSIONS config and the permission registry are looked up,
+  and the permission evaluated, for every field
+- after: the precompiled field permission tables, with the checks memoized
+  per object in the request
+
+and reports the time per run as JSON. Uses an in-memory SQLite database.
+
+python utils/permission_benchmark.py -n 5000 -r 3
+"""
+import argparse
+import datetime
+import json
+import logging
+import platform
+import sys
+import time
+
+DEFAULT_LOG_FORMAT = "%(levelname)s: %(message)s"
+DEFAULT_LOG_LEVEL = logging.INFO
+logger = logging.getLogger(__name__)
+
+QUERY = """
+query ($id: UUID!) {
+    electionGroup(id: $id) {
+        elections {
+            pollbooks {
+                voters {
+                    idType
+                    idValue
+                    pollbookId
+                    selfAdded
+                    reviewed
+                    verified
+                    verifiedStatus
+                    reason
+                }
+            }
+        }
+    }
+}
+"""
+
+
+def legacy_can_access_field(source, info, **kwargs):
+    """can_access_field() before the permission tables"""
+    from flask import current_app
+    from flask_sqlalchemy.model import camel_to_snake_case
+    from evalg.graphql.nodes.utils import permissions
+
+    session = permissions.get_session(info)
+    user = permissions.get_current_user(info)
+    config = current_app.config.get('PERMISSIONS').get(str(info.parent_type))
+    if config is None:
+        return False
+    permission = config.get(camel_to_snake_case(info.field_name))
+    if permissions.all_permissions.get(permission, permissions.deny)(
+            session, user, source, path=info.path, **kwargs):
+        return True
+    return False
+
+
+def seed(session, nr_of_voters):
+    """
+    Create an election group with one pollbook, and an admin.
+
+    :return: The election group id and the admin
+    """
+    from evalg.models.election import Election, ElectionGroup
+    from evalg.models.person import Person
+    from evalg.models.pollbook import Pollbook
+    from evalg.models.voter import Voter
+    from evalg.proc.authz import (add_election_group_role,
+                                  get_or_create_principal)
+
+    name = {'nb': 'benchmark', 'nn': 'benchmark', 'en': 'benchmark'}
+    now = datetime.datetime.now(datetime.timezone.utc)
+    group = ElectionGroup(name=name, type='single_election')
+    election = Election(name=name,
+                        election_group=group,
+                        active=True,
+                        start=now,
+                        end=now + datetime.timedelta(days=1))
+    pollbook = Pollbook(name=name, election=election)
+    admin = Person(display_name='Admin', email='admin@example.org')
+    session.add_all([group, election, pollbook, admin])
+    session.flush()
+    session.bulk_insert_mappings(Voter, [
+        {'pollbook_id': pollbook.id,
+         'id_type': 'feide_id',
+         'id_value': 'voter{}@example.org'.format(i),
+         'self_added': False,
+         'reviewed': False,
+         'verified': True}
+        for i in range(nr_of_voters)])
+    principal = get_or_create_principal(session,
+                                         principal_type='person',
+                                         person_id=admin.id)
+    add_election_group_role(session, group, principal, 'admin')
+    session.commit()
+    return group.id, admin
+
+
+def resolve(schema, session, user, election_group_id):
+    """:return: Seconds spent resolving the voters, number of voters"""
+    start = time.perf_counter()
+    result = schema.execute(
+        QUERY,
+        variables={'id': str(election_group_id)},
+        context_value={'session': session,
+                       'request': None,
+                       'user': user})
+    duration = time.perf_counter() - start
+    if result.errors:
+        raise RuntimeError(result.errors)
+    voters = result.data['electionGroup']['elections'][0][
+        'pollbooks'][0]['voters']
+    assert all(voter['idValue'] for voter in voters)
+    return duration, len(voters)
+
+
+def main(args=None):
+    """Main runtime"""
+    parser = argparse.ArgumentParser(
+        description='The following options are available')
+    parser.add_argument(
+        '-n', '--voters',
+        type=int,
+        dest='nr_of_voters',
+        default=5000,
+        help='Number of voters (default: 5000)')
+    parser.add_argument(
+        '-r', '--repeat',
+        type=int,
+        dest='repeat',
+        default=3,
+        help='Number of runs of each variant (default: 3)')
+    args = parser.parse_args(args)
+
+    logging.basicConfig(level=DEFAULT_LOG_LEVEL, format=DEFAULT_LOG_FORMAT)
+
+    from evalg import create_app, db
+    from evalg.authentication import user
+    from evalg.graphql import schema
+    from evalg.graphql.nodes.utils import permissions
+
+    app = create_app(config={'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+                             'AUTH_ENABLED': False})
+    with app.app_context():
+        db.create_all()
+        election_group_id, admin = seed(db.session, args.nr_of_voters)
+        admin_id = admin.id
+
+    def resolve_as_admin():
+        from evalg.models.person import Person
+
+        with app.test_request_context():
+            user._person = db.session.query(Person).get(admin_id)
+            user._auth_finished = True
+            try:
+                return resolve(schema, db.session, user, election_group_id)
+            finally:
+                db.session.remove()
+
+    can_access_field = permissions.can_access_field
+    variants = (('before', legacy_can_access_field),
+                ('after', can_access_field))
+    results = {}
+    try:
+        for name, implementation in variants:
+            permissions.can_access_field = implementation
+            # warm up the schema and caches
+            resolve_as_admin()
+            times = []
+            for _ in range(args.repeat):
+                duration, nr_of_voters = resolve_as_admin()
+                times.append(duration)
+            results[name] = {
+                'voters': nr_of_voters,
+                'best_s': round(min(times), 3),
+                'mean_s': round(sum(times) / len(times), 3),
+            }
+            logger.info('%s: %.3fs', name, results[name]['best_s'])
+    finally:
+        permissions.can_access_field = can_access_field
+    results['speedup'] = round(
+        results['before']['best_s'] / results['after']['best_s'], 2)
+
+    json.dump({
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'parameters': {
+                'voters': args.nr_of_voters,
+                'repeat': args.repeat,
+            },
+        },
+        'results': results,
+    }, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
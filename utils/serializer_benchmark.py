@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Ballot serializer benchmark for eValg
+
+python utils/serializer_benchmark.py
+python utils/serializer_benchmark.py -e binary-nacl -c 30 -n 5000
+
+Serializes and deserializes sample ballots with every envelope type, and
+reports the stored envelope size and the time per ballot as JSON, so that
+results from different revisions can be compared.
+"""
+import argparse
+import json
+import logging
+import platform
+import sys
+import time
+import uuid
+
+import nacl.encoding
+import nacl.public
+
+from evalg.ballot_serializer.factory import SERIALIZERS, get_serializer
+
+DEFAULT_LOG_FORMAT = "%(levelname)s: %(message)s"
+DEFAULT_LOG_LEVEL = logging.INFO
+logger = logging.getLogger(__name__)
+
+
+def get_sample_ballots(nr_of_candidates):
+    """
+    :return: Sample ballots by ballot kind, as made by the voting clients
+    :rtype: dict
+    """
+    candidate_ids = [str(uuid.uuid4()) for _ in range(nr_of_candidates)]
+    return {
+        'blank': {
+            'voteType': 'prefElecVote',
+            'isBlankVote': True,
+            'rankedCandidateIds': [],
+        },
+        'ranked': {
+            'voteType': 'prefElecVote',
+            'isBlankVote': False,
+            'rankedCandidateIds': candidate_ids,
+        },
+        'list': {
+            'voteType': 'SPListElecVote',
+            'chosenListId': str(uuid.uuid4()),
+            'isBlankVote': False,
+            'personalVotesOtherParty': [
+                {'candidate': candidate_ids[0], 'list': str(uuid.uuid4())}],
+            'personalVotesSameParty': [
+                {'candidate': candidate_id, 'cumulated': i % 3 == 0}
+                for i, candidate_id in enumerate(candidate_ids[1:])],
+        },
+    }
+
+
+def get_keys():
+    """:return: Serializer arguments with new election and backend keys"""
+    election_key = nacl.public.PrivateKey.generate()
+    backend_key = nacl.public.PrivateKey.generate()
+    encoder = nacl.encoding.Base64Encoder
+    return {
+        'election_private_key': election_key.encode(encoder),
+        'election_public_key': election_key.public_key.encode(encoder),
+        'backend_private_key': backend_key.encode(encoder),
+        'backend_public_key': backend_key.public_key.encode(encoder),
+    }
+
+
+def measure(serializer, ballot, repeat):
+    """
+    Measures the envelope size and serialization time of a ballot
+
+    :return: envelope_bytes, serialize_us and deserialize_us
+    :rtype: dict
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        envelope = bytes(serializer.serialize(dict(ballot)))
+    serialize_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(repeat):
+        serializer.deserialize(envelope)
+    deserialize_time = time.perf_counter() - start
+    return {
+        'envelope_bytes': len(envelope),
+        'serialize_us': round(serialize_time / repeat * 1e6, 2),
+        'deserialize_us': round(deserialize_time / repeat * 1e6, 2),
+    }
+
+
+def run(envelope_types, nr_of_candidates=10, padded_len=1000, repeat=2000):
+    """
+    Benchmarks the serializers
+
+    :return: One entry per envelope type and ballot kind
+    :rtype: list
+    """
+    keys = get_keys()
+    ballots = get_sample_ballots(nr_of_candidates)
+    results = []
+    for envelope_type in envelope_types:
+        serializer = get_serializer(envelope_type,
+                                    envelope_padded_len=padded_len,
+                                    **keys)
+        for kind, ballot in ballots.items():
+            result = {'envelope_type': envelope_type, 'ballot': kind}
+            result.update(measure(serializer, ballot, repeat))
+            results.append(result)
+            logger.info('%s %s ballot: %d bytes, %.1fus, %.1fus',
+                        envelope_type,
+                        kind,
+                        result['envelope_bytes'],
+                        result['serialize_us'],
+                        result['deserialize_us'])
+    return results
+
+
+def main(args=None):
+    """Main runtime"""
+    parser = argparse.ArgumentParser(
+        description='The following options are available')
+    parser.add_argument(
+        '-e', '--envelope-type',
+        action='append',
+        choices=sorted(SERIALIZERS),
+        dest='envelope_types',
+        help='Envelope type to benchmark (default: all)')
+    parser.add_argument(
+        '-c', '--candidates',
+        type=int,
+        dest='nr_of_candidates',
+        default=10,
+        help='Number of candidates on the sample ballots (default: 10)')
+    parser.add_argument(
+        '-p', '--padded-len',
+        type=int,
+        dest='padded_len',
+        default=1000,
+        help='ENVELOPE_PADDED_LEN (default: 1000)')
+    parser.add_argument(
+        '-n', '--repeat',
+        type=int,
+        dest='repeat',
+        default=2000,
+        help='Number of times to serialize each ballot (default: 2000)')
+    args = parser.parse_args(args)
+
+    logging.basicConfig(level=DEFAULT_LOG_LEVEL, format=DEFAULT_LOG_FORMAT)
+    parameters = {
+        'nr_of_candidates': args.nr_of_candidates,
+        'padded_len': args.padded_len,
+        'repeat': args.repeat,
+    }
+    results = run(args.envelope_types or sorted(SERIALIZERS), **parameters)
+    json.dump({
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'parameters': parameters,
+        },
+        'results': results,
+    }, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()